@@ -432,6 +432,49 @@ doc = {
             ],
             "title": "Anomaly"
         },
+        {
+            "@id": "vocab:TickUpdate",
+            "@type": "hydra:Class",
+            "description": "Class for the drone and datastream updates of a mechanics tick",
+            "supportedOperation": [
+                {
+                    "@type": "http://schema.org/UpdateAction",
+                    "expects": "vocab:TickUpdate",
+                    "method": "POST",
+                    "possibleStatus": [
+                        {
+                            "description": "Drone and Datastream updated",
+                            "statusCode": 200
+                        },
+                        {
+                            "description": "Nothing updated",
+                            "statusCode": 400
+                        }
+                    ],
+                    "returns": "null",
+                    "title": "UpdateTick"
+                }
+            ],
+            "supportedProperty": [
+                {
+                    "@type": "SupportedProperty",
+                    "property": "vocab:Drone",
+                    "readonly": "false",
+                    "required": "true",
+                    "title": "Drone",
+                    "writeonly": "false"
+                },
+                {
+                    "@type": "SupportedProperty",
+                    "property": "vocab:Datastream",
+                    "readonly": "false",
+                    "required": "true",
+                    "title": "Datastream",
+                    "writeonly": "false"
+                }
+            ],
+            "title": "TickUpdate"
+        },
         {
             "@id": "http://www.w3.org/ns/hydra/core#Collection",
             "@type": "hydra:Class",
@@ -714,6 +757,42 @@ doc = {
                     "required": "null",
                     "writeonly": "false"
                 },
+                {
+                    "hydra:description": "The TickUpdate Class",
+                    "hydra:title": "tickupdate",
+                    "property": {
+                        "@id": "vocab:EntryPoint/TickUpdate",
+                        "@type": "hydra:Link",
+                        "description": "Class for the drone and datastream updates of a mechanics tick",
+                        "domain": "vocab:EntryPoint",
+                        "label": "TickUpdate",
+                        "range": "vocab:TickUpdate",
+                        "supportedOperation": [
+                            {
+                                "@id": "updatetick",
+                                "@type": "http://schema.org/UpdateAction",
+                                "description": "null",
+                                "expects": "vocab:TickUpdate",
+                                "label": "UpdateTick",
+                                "method": "POST",
+                                "returns": "null",
+                                "statusCodes": [
+                                    {
+                                        "description": "Drone and Datastream updated",
+                                        "statusCode": 200
+                                    },
+                                    {
+                                        "description": "Nothing updated",
+                                        "statusCode": 400
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    "readonly": "true",
+                    "required": "null",
+                    "writeonly": "false"
+                },
                 {
                     "hydra:description": "The CommandCollection collection",
                     "hydra:title": "commandcollection",
@@ -159,11 +159,29 @@ def doc_gen(API, BASE_URL):
                                           None,
                                           [{"statusCode": 201, "description": "Anomaly updated successfully"}]))
 
+    # TickUpdate class
+    # NOTE: Composite of the drone and its datastream written by the mechanics each tick.
+    # POST applies both updates in one request and one database transaction, /api/TickUpdate
+    # is handled by flock_drone/tick_update.py in front of hydrus.
+    tick_update = HydraClass("TickUpdate", "TickUpdate",
+                             "Class for the drone and datastream updates of a mechanics tick", endpoint=True)
+    tick_update.add_supported_prop(HydraClassProp(
+        "vocab:Drone", "Drone", False, False, True))
+    tick_update.add_supported_prop(HydraClassProp(
+        "vocab:Datastream", "Datastream", False, False, True))
+    tick_update.add_supported_op(HydraClassOp("UpdateTick",
+                                              "POST",
+                                              "vocab:TickUpdate",
+                                              None,
+                                              [{"statusCode": 200, "description": "Drone and Datastream updated"},
+                                               {"statusCode": 400, "description": "Nothing updated"}]))
+
     api_doc.add_supported_class(state, collection=False)
     api_doc.add_supported_class(drone, collection=False)
     api_doc.add_supported_class(command, collection=True)
     api_doc.add_supported_class(datastream, collection=False)
     api_doc.add_supported_class(anomaly, collection=False)
+    api_doc.add_supported_class(tick_update, collection=False)
 
     api_doc.add_baseCollection()
     api_doc.add_baseResource()
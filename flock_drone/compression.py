@@ -0,0 +1,111 @@
+"""gzip and deflate bodies between the drones and the controller.
+
+GzipMiddleware wraps the hydrus app of flock_drone/main.py, it decodes
+compressed request bodies and compresses responses for clients accepting
+it. The mechanics side is CompressedTransport in mechanics/transport.py.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+sys.path.insert(0, parentDir)
+
+import gzip
+import io
+import zlib
+from flock_drone.settings import COMPRESS_MIN_SIZE, COMPRESS_LEVEL
+
+ENCODINGS = ("gzip", "deflate")
+
+
+def compress(data, encoding, level=COMPRESS_LEVEL):
+    """Compress data with encoding, "gzip" or "deflate"."""
+    if encoding == "gzip":
+        return gzip.compress(data, level)
+    return zlib.compress(data, level)
+
+
+def decompress(data, encoding):
+    """Decompress data encoded with encoding, "gzip" or "deflate"."""
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    try:
+        return zlib.decompress(data)
+    except zlib.error:
+        # Some servers send raw deflate data without the zlib header.
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+def accepted_encoding(accept_encoding):
+    """Return the first of ENCODINGS accepted by an Accept-Encoding header, None if none is."""
+    accepted = dict()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class GzipMiddleware(object):
+    """Decode compressed request bodies and compress responses of a WSGI app."""
+
+    def __init__(self, app, min_size=COMPRESS_MIN_SIZE, compress_responses=True):
+        self.app = app
+        self.min_size = min_size
+        # Compressed request bodies are decoded either way.
+        self.compress_responses = compress_responses
+
+    def decode_request(self, environ):
+        """Replace a compressed request body by its decompressed content."""
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding not in ENCODINGS:
+            return
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = decompress(environ["wsgi.input"].read(length), encoding)
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ["CONTENT_LENGTH"] = str(len(body))
+        del environ["HTTP_CONTENT_ENCODING"]
+
+    def __call__(self, environ, start_response):
+        try:
+            self.decode_request(environ)
+        except (OSError, EOFError, zlib.error):
+            start_response("400 Bad Request", [("Content-Type", "text/plain")])
+            return [b"Invalid compressed request body"]
+
+        encoding = accepted_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None or not self.compress_responses:
+            return self.app(environ, start_response)
+
+        started = dict()
+
+        def buffer_response(status, headers, exc_info=None):
+            started["status"] = status
+            started["headers"] = headers
+
+        result = self.app(environ, buffer_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+        headers = started["headers"]
+        names = set(name.lower() for name, _ in headers)
+        if len(body) >= self.min_size and "content-encoding" not in names:
+            body = compress(body, encoding)
+            headers = [(name, value) for name, value in headers
+                       if name.lower() != "content-length"]
+            headers += [("Content-Encoding", encoding), ("Content-Length", str(len(body))),
+                        ("Vary", "Accept-Encoding")]
+        start_response(started["status"], headers)
+        return [body]
@@ -6,6 +6,9 @@ curDir = os.path.dirname(__file__)
 parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 sys.path.insert(0, parentDir)
 
+import gevent
+from contextlib import contextmanager
+from gevent import socket
 from hydrus.app_factory import app_factory
 from hydrus.utils import set_session, set_doc, set_hydrus_server_url
 from hydrus.utils import set_authentication, set_token
@@ -13,34 +16,44 @@ from hydrus.utils import set_authentication, set_token
 from hydrus.data import doc_parse
 from hydra_python_core import doc_maker
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from hydrus.data.db_models import Base
 from flock_drone.settings import DB_URL, PORT, HYDRUS_SERVER_URL, API_NAME
+from flock_drone.settings import UNIX_SOCKET, SERVE_TCP, COMPRESS_RESPONSES
 from flock_drone.api_docs.doc import doc
+from flock_drone.compression import GzipMiddleware
+from flock_drone.tick_update import TickUpdateMiddleware
 from gevent.pywsgi import WSGIServer
 
 
-if __name__ == "__main__":
+@contextmanager
+def hydrus_app(reset=True):
+    """Set up the flock_drone hydrus app, reset drops and recreates the database first.
+
+    The app yielded serves the composite TickUpdate endpoint in front of hydrus.
+    """
     engine = create_engine(DB_URL)
 
-    print("Droping database if exist")
-    Base.metadata.drop_all(engine)
+    apidoc = doc_maker.create_doc(doc, HYDRUS_SERVER_URL, API_NAME)
 
-    print("Creating models....")
-    Base.metadata.create_all(engine)
+    # One session per request, requests are served by their own greenlet.
+    session = scoped_session(sessionmaker(bind=engine), scopefunc=gevent.getcurrent)
 
-    print("Done")
+    if reset:
+        print("Droping database if exist")
+        Base.metadata.drop_all(engine)
 
-    apidoc = doc_maker.create_doc(doc, HYDRUS_SERVER_URL, API_NAME)
+        print("Creating models....")
+        Base.metadata.create_all(engine)
 
-    session = sessionmaker(bind=engine)()
+        print("Done")
 
-    classes = doc_parse.get_classes(apidoc.generate())
+        classes = doc_parse.get_classes(apidoc.generate())
 
-    properties = doc_parse.get_all_properties(classes)
+        properties = doc_parse.get_all_properties(classes)
 
-    doc_parse.insert_classes(classes, session)
-    doc_parse.insert_properties(properties, session)
+        doc_parse.insert_classes(classes, session)
+        doc_parse.insert_properties(properties, session)
 
     app = app_factory(API_NAME)
 
@@ -49,5 +62,28 @@ if __name__ == "__main__":
             with set_token(app, False):
                 with set_hydrus_server_url(app, HYDRUS_SERVER_URL):
                     with set_session(app, session):
-                        http_server = WSGIServer(('', PORT), app)
-                        http_server.serve_forever()
+                        yield TickUpdateMiddleware(app, session)
+
+
+def unix_listener(path):
+    """Return a socket listening at the Unix socket path, replacing a stale one."""
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(256)
+    return listener
+
+
+if __name__ == "__main__":
+    with hydrus_app() as app:
+        app = GzipMiddleware(app, compress_responses=COMPRESS_RESPONSES)
+        servers = []
+        if SERVE_TCP:
+            servers.append(WSGIServer(('', PORT), app))
+        if UNIX_SOCKET is not None:
+            servers.append(WSGIServer(unix_listener(UNIX_SOCKET), app))
+            print("Serving on %s" % UNIX_SOCKET)
+        for http_server in servers:
+            http_server.start()
+        gevent.wait()
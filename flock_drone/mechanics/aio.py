@@ -0,0 +1,119 @@
+"""asyncio variant of the mechanics requests to the drone and central servers.
+
+hydra-py requests are blocking, each coroutine runs its request on a shared
+pool of IO_WORKERS threads so independent requests of a tick run concurrently.
+Effects are performed stage after stage, see effects.STAGES, all the effects
+of a stage run concurrently, e.g. the drone and datastream updates, local
+and at the controller, of a tick.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from flock_drone.settings import IO_WORKERS
+from flock_drone.mechanics import main, datastream, anomaly, commands, logs, effects
+from flock_drone.mechanics.core import gen_TickInputs, get_command_ids, DELETE_COMMANDS
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS)
+
+
+def asynchronous(func):
+    """Return a coroutine function running the blocking func on the executor.
+
+    func runs in a copy of the caller context, so it shares the tick cache.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            EXECUTOR, functools.partial(context.run, func, *args))
+    return wrapper
+
+
+# Drone
+get_drone = asynchronous(main.get_drone)
+get_controller_location = asynchronous(main.get_controller_location)
+update_drone = asynchronous(main.update_drone)
+update_drone_at_controller = asynchronous(main.update_drone_at_controller)
+
+# Datastream
+send_datastream = asynchronous(datastream.send_datastream)
+update_datastream = asynchronous(datastream.update_datastream)
+add_datastream = asynchronous(datastream.add_datastream)
+get_datastream = asynchronous(datastream.get_datastream)
+
+# Anomaly
+get_anomaly = asynchronous(anomaly.get_anomaly)
+send_anomaly = asynchronous(anomaly.send_anomaly)
+update_anomaly_at_controller = asynchronous(anomaly.update_anomaly_at_controller)
+update_anomaly_locally = asynchronous(anomaly.update_anomaly_locally)
+
+# Commands
+get_command_collection = asynchronous(commands.get_command_collection)
+add_command = asynchronous(commands.add_command)
+get_command = asynchronous(commands.get_command)
+delete_command = asynchronous(commands.delete_command)
+
+# Logs
+send_dronelog = asynchronous(logs.send_dronelog)
+send_http_api_log = asynchronous(logs.send_http_api_log)
+
+
+async def delete_commands(command_ids):
+    """Delete a list of commands concurrently."""
+    return await asyncio.gather(*(delete_command(id_) for id_ in command_ids))
+
+
+HANDLERS = {kind: asynchronous(handler) for kind, handler in effects.HANDLERS.items()}
+HANDLERS[DELETE_COMMANDS] = delete_commands
+
+replay_spool = asynchronous(effects.replay_spool)
+
+
+async def execute_effect(effect):
+    """Perform a single effect."""
+    try:
+        await HANDLERS[effect.kind](*effect.args)
+    except Exception as e:
+        LOGGER.warning("execute_effect failed: %s", e)
+
+
+async def execute_stage(stage):
+    """Perform the batches of effects of a stage concurrently."""
+    await asyncio.gather(*(execute_effect(effect) for batch in stage for effect in batch))
+
+
+async def execute_effects(effects_, skip=()):
+    """Perform effects stage after stage, effects of the kinds in skip are dropped.
+
+    The spooled messages are replayed first, the tick's messages are newer.
+    """
+    await replay_spool()
+    effects_ = effects.merge_updates([effect for effect in effects_ if effect.kind not in skip])
+    for stage in effects.group_stages(effects_):
+        await execute_stage(stage)
+
+
+async def get_tick_inputs(controller_location, drone_bounds, loop_time):
+    """Get everything the drone needs from the drone server for one iteration."""
+    command_collection, anomaly_ = await asyncio.gather(get_command_collection(), get_anomaly())
+    command_ids = get_command_ids(command_collection)
+    command = None
+    if len(command_ids) > 0:
+        command = await get_command(command_ids[-1])
+
+    return gen_TickInputs(command_ids, command, anomaly_,
+                          controller_location, drone_bounds, loop_time)
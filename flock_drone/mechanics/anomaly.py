@@ -8,109 +8,141 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-import json
-from hydra import SCHEMA, Resource
-from flock_drone.settings import CENTRAL_SERVER_URL, DRONE_URL
-from flock_drone.mechanics.main import RES_CS, CENTRAL_SERVER, RES_DRONE, DRONE
+from hydra import SCHEMA
+from flock_drone.settings import CENTRAL_SERVER_URL
+from flock_drone.mechanics.main import RES_CS, CENTRAL_SERVER, get_drone_resource, get_drone_namespace, get_drone_url
 from flock_drone.mechanics.logs import (send_http_api_log, gen_HttpApiLog,
                                         send_dronelog, gen_DroneLog)
+from flock_drone.mechanics.objects import gen_Anomaly
+from flock_drone.mechanics.tick_cache import cached, invalidates
+from flock_drone.mechanics.resources import get_resource, find_operation
+from flock_drone.mechanics.codec import decode, loads
+from flock_drone.mechanics.core import SEND_ANOMALY, UPDATE_ANOMALY_AT_CONTROLLER
+from flock_drone.mechanics.spool import spool_message, message_sent
+from flock_drone.mechanics.transport import check_response
+from flock_drone.mechanics.local_log import get_logger, fields
 
-
-def gen_Anomaly(location, id_):
-    """Generate an anomaly object."""
-    anomaly = {
-        "@type": "Anomaly",
-        "Location": location,
-        "DroneID": id_,
-        "Status": "To be Confirmed",
-        "AnomalyID": "-1"
-    }
-
-    return anomaly
+LOGGER = get_logger(__name__)
 
 
+@cached
 def get_anomaly():
     """Get the anomaly from drone server."""
     try:
-        get_anomaly_ = RES_DRONE.find_suitable_operation(
-            operation_type=None, input_type=None, output_type=DRONE.Anomaly)
+        get_anomaly_ = find_operation(
+            get_drone_resource(),
+            operation_type=None, input_type=None, output_type=get_drone_namespace().Anomaly)
         resp, body = get_anomaly_()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        anomaly = json.loads(body.decode('utf-8'))
-        anomaly.pop("@context", None)
-        anomaly.pop("@id", None)
+        anomaly = decode(body)
         return anomaly
     except Exception as e:
-        print(e)
+        LOGGER.warning("get_anomaly failed: %s", e)
         return None
 
 
-def send_anomaly(anomaly, drone_identifier):
-    """Send the detected anomaly to the central server."""
-    post_anomaly = RES_CS.find_suitable_operation(
-        operation_type=SCHEMA.AddAction, input_type=CENTRAL_SERVER.Anomaly)
-    resp, body = post_anomaly(anomaly)
-    assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-    print("Anomaly added successfully.")
-    body = json.loads(body.decode('utf-8'))
-    http_api_log = gen_HttpApiLog("Drone %s" % (
-        str(drone_identifier)), "PUT Anomaly", "Controller")
-    send_http_api_log(http_api_log)
+def post_anomaly(anomaly):
+    """Post the detected anomaly to the central server and return the response body.
+
+    Raise if the post failed, the anomaly was then not created.
+    """
+    post_anomaly_ = find_operation(
+        RES_CS, operation_type=SCHEMA.AddAction, input_type=CENTRAL_SERVER.Anomaly)
+    resp, body = post_anomaly_(anomaly)
+    check_response(resp)
+    LOGGER.debug("Anomaly added successfully.")
+    return body
+
+
+def register_anomaly(anomaly, body, drone_identifier):
+    """Set the ID the controller assigned to a posted anomaly, never raises.
 
+    body is the response to the post, the anomaly exists at the controller
+    whatever fails here, so nothing is retried by posting it again.
+    """
     try:
+        http_api_log = gen_HttpApiLog("Drone %s" % (
+            str(drone_identifier)), "PUT Anomaly", "Controller")
+        send_http_api_log(http_api_log)
+
         # Get the anomaly_id from body
+        body = loads(body)
         anomaly_id = body[list(body.keys())[0]].split(" ")[3]
-        print("ID assigned to anomaly is", anomaly_id)
-        # Update the anomalyID at central controller
-        anomaly["AnomalyID"] = anomaly_id
-        update_anomaly_at_controller(anomaly, anomaly_id, drone_identifier)
+        LOGGER.info("ID assigned to anomaly", extra=fields(AnomalyID=anomaly_id))
     except Exception as e:
-        print(e)
+        LOGGER.warning("Reading the ID of the posted anomaly failed: %s", e)
         return None
 
-    dronelog = gen_DroneLog("Drone %s" % (str(drone_identifier),),
-                            "detected anomaly at %s" % (str(anomaly["Location"])))
-    send_dronelog(dronelog)
+    # Update the anomalyID at central controller, spooled if it fails.
+    anomaly["AnomalyID"] = anomaly_id
+    update_anomaly_at_controller(anomaly, anomaly_id, drone_identifier)
 
+    try:
+        dronelog = gen_DroneLog("Drone %s" % (str(drone_identifier),),
+                                "detected anomaly at %s" % (str(anomaly["Location"])))
+        send_dronelog(dronelog)
+    except Exception as e:
+        LOGGER.warning("register_anomaly failed: %s", e)
+    return anomaly_id
 
-def update_anomaly_at_controller(anomaly, anomaly_id, drone_identifier):
-    """Update the anomaly object at central controller."""
-    id_ = "/api/AnomalyCollection/" + str(anomaly_id)
+
+def deliver_anomaly(anomaly, drone_identifier):
+    """Post the anomaly and register it, raise only if the post failed."""
+    body = post_anomaly(anomaly)
+    return register_anomaly(anomaly, body, drone_identifier)
+
+
+def send_anomaly(anomaly, drone_identifier):
+    """Send the detected anomaly to the central server, spooling it if the post failed."""
     try:
-        print("Updating anomaly")
-        RES = Resource.from_iri(CENTRAL_SERVER_URL + id_)
-        operation = RES.find_suitable_operation(
-            operation_type=SCHEMA.UpdateAction)
-        assert operation is not None
-        print(anomaly)
-        resp, body = operation(anomaly)
-        assert resp.status in [200, 201]
-        return resp
+        body = post_anomaly(anomaly)
     except Exception as e:
-        print(e)
+        spool_message(get_drone_url(), SEND_ANOMALY, (anomaly, drone_identifier), e)
         return None
+    return register_anomaly(anomaly, body, drone_identifier)
 
-    http_api_log = gen_HttpApiLog("Drone %s" % (
-        str(drone_identifier)), "POST Anomaly", "Controller")
-    send_http_api_log(http_api_log)
+
+def put_anomaly_at_controller(anomaly, anomaly_id, drone_identifier):
+    """Update the anomaly object at central controller, raise if the update failed."""
+    id_ = "/api/AnomalyCollection/" + str(anomaly_id)
+    LOGGER.debug("Updating anomaly at controller", extra=fields(Anomaly=anomaly))
+    RES = get_resource(CENTRAL_SERVER_URL + id_)
+    operation = find_operation(
+        RES, operation_type=SCHEMA.UpdateAction)
+    assert operation is not None
+    resp, body = operation(anomaly)
+    check_response(resp)
+    return resp
+
+
+def update_anomaly_at_controller(anomaly, anomaly_id, drone_identifier):
+    """Update the anomaly object at central controller, spooling it if the update failed."""
+    args = (anomaly, anomaly_id, drone_identifier)
+    try:
+        resp = put_anomaly_at_controller(*args)
+    except Exception as e:
+        spool_message(get_drone_url(), UPDATE_ANOMALY_AT_CONTROLLER, args, e)
+        return None
+    message_sent(get_drone_url(), UPDATE_ANOMALY_AT_CONTROLLER, args)
+    return resp
 
 
+@invalidates("get_anomaly")
 def update_anomaly_locally(anomaly, drone_identifier):
     """Update the anomaly object at local drone server."""
     id_ = "/api/Anomaly"
     try:
-        print("Updating anomaly")
-        RES = Resource.from_iri(DRONE_URL + id_)
-        operation = RES.find_suitable_operation(
-            operation_type=SCHEMA.UpdateAction)
+        LOGGER.debug("Updating anomaly locally", extra=fields(Anomaly=anomaly))
+        RES = get_resource(get_drone_url() + id_)
+        operation = find_operation(
+            RES, operation_type=SCHEMA.UpdateAction)
         assert operation is not None
-        print(anomaly)
         resp, body = operation(anomaly)
         assert resp.status in [200, 201]
         return resp
     except Exception as e:
-        print(e)
+        LOGGER.warning("update_anomaly_locally failed: %s", e)
         return None
 
     http_api_log = gen_HttpApiLog("Drone %s" % (
@@ -0,0 +1,108 @@
+"""Time budget of a tick, shedding non critical requests once it is spent.
+
+Requests decorated with @non_critical (logs and datastreams) are deferred or
+dropped, as set by TICK_BUDGET_POLICY, when they are made after the budget of
+the running tick is exhausted. Deferred requests are kept by drone, the key
+given to tick_budget(), and replayed by flush_deferred() in a later tick of
+the same drone with budget left.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flock_drone.settings import TICK_BUDGET_POLICY, DEFERRED_LIMIT
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Budget and drone of the running tick, context local like the tick cache.
+_budget = contextvars.ContextVar("tick_budget", default=None)
+_drone = contextvars.ContextVar("tick_drone", default=None)
+
+# Deferred (func, args) requests by drone.
+_deferred = dict()
+_lock = threading.Lock()
+
+# Number of deferred, dropped and replayed requests, by request name.
+SHED_STATS = dict()
+
+
+def count(name, outcome):
+    """Count a shed request, the caller holds the lock."""
+    stats = SHED_STATS.setdefault(name, {"Deferred": 0, "Dropped": 0, "Replayed": 0})
+    stats[outcome] += 1
+
+
+@contextmanager
+def tick_budget(seconds, drone=None):
+    """Give the requests made inside the block seconds to run, None for no limit.
+
+    drone keys the requests deferred in the block, e.g. the drone server URL.
+    """
+    deadline = None if seconds is None else time.monotonic() + seconds
+    token = _budget.set(deadline)
+    drone_token = _drone.set(drone)
+    try:
+        yield deadline
+    finally:
+        _drone.reset(drone_token)
+        _budget.reset(token)
+
+
+def budget_exhausted():
+    """Check if the budget of the running tick is spent."""
+    deadline = _budget.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def shed(func, args):
+    """Defer or drop a request made after the budget was spent."""
+    with _lock:
+        if TICK_BUDGET_POLICY != "defer":
+            count(func.__name__, "Dropped")
+            return
+        deferred = _deferred.setdefault(_drone.get(), deque())
+        if len(deferred) >= DEFERRED_LIMIT:
+            # Keep the most recent requests.
+            old_func, _ = deferred.popleft()
+            count(old_func.__name__, "Dropped")
+        deferred.append((func, args))
+        count(func.__name__, "Deferred")
+
+
+def non_critical(func):
+    """Shed the request func when it is made after the budget of the tick is spent."""
+    @functools.wraps(func)
+    def wrapper(*args):
+        if budget_exhausted():
+            shed(func, args)
+            return None
+        return func(*args)
+    return wrapper
+
+
+def flush_deferred():
+    """Replay the deferred requests of the tick's drone, oldest first, while its budget lasts."""
+    drone = _drone.get()
+    while not budget_exhausted():
+        with _lock:
+            deferred = _deferred.get(drone)
+            if not deferred:
+                return
+            func, args = deferred.popleft()
+            count(func.__name__, "Replayed")
+        try:
+            func(*args)
+        except Exception as e:
+            LOGGER.warning("flush_deferred failed: %s", e)
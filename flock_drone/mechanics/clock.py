@@ -0,0 +1,64 @@
+"""Clocks used to drive the drone main loop in real or simulated time."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import threading
+import time
+
+
+class WallClock(object):
+    """Clock following the real monotonic time."""
+
+    def now(self):
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def wait(self, seconds, event=None):
+        """Wait for seconds or until event is set, return True if event is set."""
+        if event is None:
+            event = threading.Event()
+        return event.wait(max(0.0, seconds))
+
+
+class SimClock(object):
+    """Clock following simulated time, running speedup times faster than real time.
+
+    A speedup of 0 (or None) runs as fast as possible: waiting only moves the
+    simulated time forward and returns at once.
+    """
+
+    def __init__(self, speedup=0, start=0.0):
+        self.speedup = float(speedup or 0)
+        self._sim_start = float(start)
+        self._real_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def now(self):
+        """Return the current simulated time in seconds."""
+        if not self.speedup:
+            return self._sim_start
+        return self._sim_start + (time.monotonic() - self._real_start) * self.speedup
+
+    def wait(self, seconds, event=None):
+        """Wait for simulated seconds or until event is set, return True if event is set."""
+        seconds = max(0.0, seconds)
+        if self.speedup:
+            if event is None:
+                event = threading.Event()
+            return event.wait(seconds / self.speedup)
+        with self._lock:
+            self._sim_start += seconds
+        return event is not None and event.is_set()
+
+
+def get_clock(speedup):
+    """Return the clock for a simulation speedup, real time for a speedup of 1."""
+    if speedup == 1:
+        return WallClock()
+    return SimClock(speedup)
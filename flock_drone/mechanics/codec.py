@@ -0,0 +1,62 @@
+"""JSON codec of the mechanics payloads.
+
+Bodies are parsed with orjson when it is installed and JSON_CODEC allows it,
+and with the standard json module otherwise. decode() parses a response body
+and strips its JSON-LD envelope keys in one call.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import json
+from flock_drone.settings import JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Keys hydrus adds around the objects it returns.
+ENVELOPE = ("@context", "@id")
+
+
+def get_backend(name=JSON_CODEC):
+    """Return the backend for name, "json", "orjson" or "auto" for the fastest installed one."""
+    if name == "orjson" and orjson is None:
+        raise ImportError("JSON_CODEC is orjson but orjson is not installed")
+    if name == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+
+BACKEND = get_backend()
+
+
+def loads(body, backend=None):
+    """Parse a JSON body, bytes or str."""
+    if (backend or BACKEND) == "orjson":
+        return orjson.loads(body)
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return json.loads(body)
+
+
+def dumps(obj, backend=None):
+    """Serialize obj to JSON bytes."""
+    if (backend or BACKEND) == "orjson":
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def decode(body, strip=ENVELOPE, backend=None):
+    """Parse a response body and remove the strip keys of the top level object."""
+    obj = loads(body, backend)
+    if isinstance(obj, dict):
+        for key in strip:
+            obj.pop(key, None)
+    return obj
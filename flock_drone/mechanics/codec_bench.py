@@ -0,0 +1,79 @@
+"""Microbenchmark of the JSON backends of mechanics/codec.py on drone server bodies."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import argparse
+import copy
+import json
+import timeit
+from flock_drone.settings import DRONE_DEFAULT, API_NAME
+from flock_drone.mechanics.codec import decode, orjson
+
+
+def gen_drone_body():
+    """Generate a GET /api/Drone response body as returned by hydrus."""
+    drone = copy.deepcopy(DRONE_DEFAULT)
+    drone["@context"] = "/%s/contexts/Drone.jsonld" % API_NAME
+    drone["@id"] = "/%s/Drone" % API_NAME
+    drone["DroneID"] = "12"
+    drone["State"]["@id"] = "/%s/State/12" % API_NAME
+    return json.dumps(drone).encode("utf-8")
+
+
+def gen_command_collection_body(commands):
+    """Generate a GET /api/CommandCollection response body with commands members."""
+    collection = {
+        "@context": "/%s/contexts/CommandCollection.jsonld" % API_NAME,
+        "@id": "/%s/CommandCollection/" % API_NAME,
+        "@type": "CommandCollection",
+        "members": [{"@id": "/%s/CommandCollection/%d" % (API_NAME, i), "@type": "Command"}
+                    for i in range(commands)],
+    }
+    return json.dumps(collection).encode("utf-8")
+
+
+def baseline(body):
+    """Decode body the way the mechanics did before the codec."""
+    obj = json.loads(body.decode('utf-8'))
+    obj.pop("@context", None)
+    obj.pop("@id", None)
+    return obj
+
+
+def benchmark(bodies, number):
+    """Return the microseconds per decode of each body with each backend."""
+    decoders = [("json.loads + pop", baseline),
+                ("codec json", lambda body: decode(body, backend="json"))]
+    if orjson is not None:
+        decoders.append(("codec orjson", lambda body: decode(body, backend="orjson")))
+
+    results = []
+    for body_name, body in bodies:
+        expected = baseline(body)
+        for decoder_name, decoder in decoders:
+            assert decoder(body) == expected, decoder_name
+            seconds = min(timeit.repeat(lambda: decoder(body), number=number, repeat=5))
+            results.append((body_name, len(body), decoder_name, 1e6 * seconds / number))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=50,
+                        help="members of the CommandCollection body")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    bodies = [
+        ("Drone", gen_drone_body()),
+        ("CommandCollection", gen_command_collection_body(args.commands)),
+    ]
+    print("%-18s %7s %-18s %10s" % ("Body", "Bytes", "Decoder", "us/decode"))
+    for body_name, size, decoder_name, micros in benchmark(bodies, args.number):
+        print("%-18s %7d %-18s %10.2f" % (body_name, size, decoder_name, micros))
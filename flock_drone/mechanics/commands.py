@@ -8,12 +8,15 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-import json
-import re
-from hydra import Resource, SCHEMA
+from hydra import SCHEMA
 
-from flock_drone.mechanics.main import DRONE, RES_DRONE
-from flock_drone.settings import DRONE_URL
+from flock_drone.mechanics.main import get_drone_resource, get_drone_namespace, get_drone_url
+from flock_drone.mechanics.tick_cache import cached, invalidates
+from flock_drone.mechanics.resources import get_resource, find_operation, invalidate
+from flock_drone.mechanics.codec import decode, loads
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
 
 
 def gen_Command(drone_id, state):
@@ -26,66 +29,71 @@ def gen_Command(drone_id, state):
     return command
 
 
+@cached
 def get_command_collection():
     """Get command collection from the drone server."""
     try:
-        get_command_collection_ = RES_DRONE.find_suitable_operation(
-            None, None, DRONE.CommandCollection)
+        get_command_collection_ = find_operation(
+            get_drone_resource(), None, None, get_drone_namespace().CommandCollection)
         resp, body = get_command_collection_()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        body = json.loads(body.decode('utf-8'))
+        body = loads(body)
 
         return body["members"]
     except Exception as e:
-        print(e)
+        LOGGER.warning("get_command_collection failed: %s", e)
         return None
 
 
+@invalidates("get_command_collection")
 def add_command(command):
     """Add command to drone server."""
     try:
-        add_command_ = RES_DRONE.find_suitable_operation(
-            SCHEMA.AddAction, DRONE.Command)
+        add_command_ = find_operation(
+            get_drone_resource(), SCHEMA.AddAction, get_drone_namespace().Command)
         resp, body = add_command_(command)
 
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        new_command = Resource.from_iri(resp['location'])
-        print("Command posted successfully.")
+        new_command = get_resource(resp['location'])
+        LOGGER.debug("Command posted successfully.")
         return new_command
     except Exception as e:
-        print(e)
+        LOGGER.warning("add_command failed: %s", e)
         return None
 
 
+@cached
 def get_command(id_):
     """Get the command using @id."""
     try:
-        i = Resource.from_iri(DRONE_URL + "/api/CommandCollection/" + str(id_))
+        i = get_resource(get_drone_url() + "/api/CommandCollection/" + str(id_))
 
-        resp, body = i.find_suitable_operation(operation_type=None, input_type=None,
-                                               output_type=DRONE.Command)()
+        resp, body = find_operation(i, operation_type=None, input_type=None,
+                                    output_type=get_drone_namespace().Command)()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        body = json.loads(body.decode('utf-8'))
-        body.pop("@context")
-        body.pop("@type")
+        body = decode(body, strip=("@context", "@type"))
         return body
     except Exception as e:
-        print(e)
+        LOGGER.warning("get_command failed: %s", e)
         return None
 
 
+@invalidates("get_command_collection", "get_command")
 def delete_command(id_):
     """Delete a command from the collection given command @id attribute."""
     try:
-        i = Resource.from_iri(DRONE_URL + "/api/CommandCollection/" + str(id_))
-        resp, _ = i.find_suitable_operation(SCHEMA.DeleteAction)()
+        iri = get_drone_url() + "/api/CommandCollection/" + str(id_)
+        i = get_resource(iri)
+        resp, _ = find_operation(i, SCHEMA.DeleteAction)()
+        # The command is gone, don't keep its resource in the pool.
+        invalidate(iri)
         if resp.status // 100 != 2:
             return "error deleting <%s>" % i.identifier
         else:
             return "deleted <%s>" % i.identifier
     except Exception as e:
-        print(e)
+        LOGGER.warning("delete_command failed: %s", e)
         return None
 
 
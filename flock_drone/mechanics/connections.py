@@ -0,0 +1,183 @@
+"""Keep-alive HTTP connection pool shared by all the mechanics requests.
+
+PooledHttp is the HTTP transport of mechanics/transport.py, it keeps up to
+pool_size idle connections per host open between requests instead of
+opening a new one for each of them. A request failing on an idle connection
+the server closed is sent again on a new one, unless it may have reached the
+server and its method is not in RETRY_METHODS.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import http.client
+import queue
+import socket
+import threading
+from urllib.parse import urlsplit
+from flock_drone.settings import HTTP_POOL_SIZE
+from flock_drone.mechanics.transport import Response, Transport, encode_body
+
+# Methods safe to send again when the first try may have reached the server,
+# hydrus adds objects with PUT and updates them with POST.
+RETRY_METHODS = ("GET", "POST", "DELETE")
+
+# Errors of a kept alive connection the server closed in the meantime.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                           BrokenPipeError, ConnectionResetError)
+
+
+def gen_PoolStats():
+    """Generate an empty connection pool statistics object."""
+    stats = {
+        "Requests": 0,
+        "Connections": 0,
+        "Reused": 0,
+        "Closed": 0,
+        "Retried": 0,
+    }
+    return stats
+
+
+class PooledHttp(Transport):
+    """HTTP transport reusing keep-alive connections per host."""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.stats = gen_PoolStats()
+        self._pools = dict()
+        self._lock = threading.Lock()
+
+    def count(self, key, value=1):
+        """Add value to the statistic key."""
+        with self._lock:
+            self.stats[key] += value
+
+    def _pool(self, scheme, netloc):
+        """Return the queue of idle connections for a host."""
+        with self._lock:
+            return self._pools.setdefault((scheme, netloc), queue.LifoQueue(self.pool_size))
+
+    def new_connection(self, scheme, netloc):
+        """Open a new connection to a host."""
+        self.count("Connections")
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def get_connection(self, scheme, netloc):
+        """Return an idle connection to a host and whether it is reused."""
+        try:
+            return self._pool(scheme, netloc).get_nowait(), True
+        except queue.Empty:
+            return self.new_connection(scheme, netloc), False
+
+    def release(self, scheme, netloc, connection):
+        """Put a connection back in its pool, close it if the pool is full."""
+        try:
+            self._pool(scheme, netloc).put_nowait(connection)
+        except queue.Full:
+            self.close_connection(connection)
+
+    def close_connection(self, connection):
+        """Close a connection instead of reusing it."""
+        self.count("Closed")
+        connection.close()
+
+    def send(self, connection, method, path, body, headers):
+        """Send a request on connection and read the whole response."""
+        connection.request(method, path, body=body, headers=headers)
+        return self.receive(connection)
+
+    def receive(self, connection):
+        """Read the whole response to the request sent on connection."""
+        response = connection.getresponse()
+        content = response.read()
+        return response, content
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        parts = urlsplit(uri)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        body = encode_body(body) if body is not None else None
+        headers = dict(headers or {})
+
+        self.count("Requests")
+        connection, reused = self.get_connection(parts.scheme, parts.netloc)
+        sent = False
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            sent = True
+            response, content = self.receive(connection)
+        except STALE_CONNECTION_ERRORS:
+            connection.close()
+            if not reused or (sent and method not in RETRY_METHODS):
+                raise
+            # The server closed the idle connection, retry once on a new one.
+            self.count("Retried")
+            connection = self.new_connection(parts.scheme, parts.netloc)
+            response, content = self.send(connection, method, path, body, headers)
+            reused = False
+        except Exception:
+            self.close_connection(connection)
+            raise
+
+        if reused:
+            self.count("Reused")
+        if response.will_close:
+            self.close_connection(connection)
+        else:
+            self.release(parts.scheme, parts.netloc, connection)
+        return Response(response.status, response.reason, response.getheaders()), content
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = dict()
+        for pool in pools:
+            while True:
+                try:
+                    self.close_connection(pool.get_nowait())
+                except queue.Empty:
+                    break
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over the Unix domain socket at path."""
+
+    def __init__(self, host, path, timeout=None):
+        super(UnixHTTPConnection, self).__init__(host, timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+
+class UnixHttp(PooledHttp):
+    """HTTP transport sending every request to the server listening at a Unix socket."""
+
+    def __init__(self, path, pool_size=HTTP_POOL_SIZE, timeout=None):
+        super(UnixHttp, self).__init__(pool_size, timeout)
+        self.path = path
+
+    def new_connection(self, scheme, netloc):
+        """Open a new connection to the Unix socket, netloc is only sent as Host."""
+        self.count("Connections")
+        return UnixHTTPConnection(netloc, self.path, timeout=self.timeout)
+
+
+# HTTP transport shared by the mechanics requests
+HTTP = PooledHttp()
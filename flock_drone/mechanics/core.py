@@ -0,0 +1,427 @@
+"""Drone state transitions, separated from the requests to the servers.
+
+step() returns the new drone object together with a list of effects, the
+requests the drone has to make, as data. mechanics/effects.py performs them.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import copy
+import logging
+import random
+import re
+from collections import namedtuple
+from flock_drone.mechanics.objects import gen_DroneLog, gen_HttpApiLog, gen_Anomaly, gen_Datastream
+from flock_drone.mechanics.distance import get_new_coordinates, deg2num, is_valid_location, drone_reached_destination, get_direction
+from flock_drone.mechanics.local_log import get_logger, fields
+
+LOGGER = get_logger(__name__)
+
+# An effect is the name of a request and the arguments to make it with.
+Effect = namedtuple("Effect", ["kind", "args"])
+
+DRONE_LOG = "DroneLog"
+HTTP_API_LOG = "HttpApiLog"
+UPDATE_DRONE = "UpdateDrone"
+UPDATE_DRONE_AT_CONTROLLER = "UpdateDroneAtController"
+DELETE_COMMANDS = "DeleteCommands"
+SEND_ANOMALY = "SendAnomaly"
+UPDATE_ANOMALY_LOCALLY = "UpdateAnomalyLocally"
+UPDATE_ANOMALY_AT_CONTROLLER = "UpdateAnomalyAtController"
+SEND_DATASTREAM = "SendDatastream"
+UPDATE_DATASTREAM = "UpdateDatastream"
+
+
+def gen_TickInputs(command_ids, command, anomaly, controller_location, drone_bounds, loop_time):
+    """Generate the inputs of a tick, everything step() needs from the servers."""
+    inputs = {
+        "CommandIDs": command_ids,
+        "Command": command,
+        "Anomaly": anomaly,
+        "ControllerLocation": controller_location,
+        "DroneBounds": drone_bounds,
+        "LoopTime": loop_time,
+    }
+    return inputs
+
+
+def drone_log(drone, log_string, effects):
+    """Add a DroneLog effect for the drone."""
+    dronelog = gen_DroneLog("Drone %s" % (str(drone["DroneID"]),), log_string)
+    effects.append(Effect(DRONE_LOG, (dronelog,)))
+
+
+def http_api_log(drone, action, target, effects):
+    """Add a HttpApiLog effect for the drone."""
+    httpapilog = gen_HttpApiLog("Drone %s" % (str(drone["DroneID"])), action, target)
+    effects.append(Effect(HTTP_API_LOG, (httpapilog,)))
+
+
+# Command related functions
+def get_command_ids(commands):
+    """Return the sorted identifiers of the commands in a command collection."""
+    temp_list = list()
+    for command in commands or []:
+        regex = r'/(.*)/(\d*)'
+        matchObj = re.match(regex, command["@id"])
+        if matchObj:
+            temp_list.append(matchObj.group(2))
+    temp_list.sort()
+    return temp_list
+
+
+def handle_drone_commands(drone, command_ids, command, effects):
+    """Execute the latest command and delete all the commands from the drone server."""
+    # Using the latest command, not following previously stored ones, server will ensure order
+    if len(command_ids) > 0 and command is not None:
+        drone_log(drone, "executing command with id %s" % (str(command_ids[-1])), effects)
+        http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+        # Execute the latest command
+        drone = execute_command(command, drone, effects)
+        # Delete after execution
+        effects.append(Effect(DELETE_COMMANDS, (command_ids,)))
+
+    return drone
+
+
+def execute_command(command, drone, effects):
+    """Execute the command on the drone."""
+    if command["DroneID"] == drone["DroneID"]:
+        for prop in command["State"]:
+            if prop != "@type" and prop in drone["State"].keys():
+                prop_val = command["State"][prop]
+
+                # Handle direction prop
+                if prop == "Direction":
+                    drone["State"]["Direction"] = prop_val
+                    drone_log(drone, "changed direction to %s after command execution." % (
+                        str(prop_val)), effects)
+
+                # Handle speed prop
+                if prop == "Speed":
+                    if float(prop_val) <= float(drone["MaxSpeed"]):
+                        drone["State"]["Speed"] = prop_val
+                    else:
+                        drone["State"]["Speed"] = drone["MaxSpeed"]
+                    drone_log(drone, "changed speed to %s after command execution." % (
+                        str(drone["State"]["Speed"])), effects)
+
+                # Handle status prop
+                if prop == "Status":
+                    if prop_val in ["Active", "Off"]:
+                        drone["State"]["Status"] = prop_val
+                    drone_log(drone, "changed status to %s after command execution." % (
+                        str(prop_val)), effects)
+
+    http_api_log(drone, "PUT DroneLog", "Controller", effects)
+    return drone
+
+
+# Drone state related functions
+def is_charging(drone):
+    """Check if the drone status is charging."""
+    return drone["State"]["Status"] == "Charging"
+
+
+def is_not_off(drone):
+    """Check if drone status is not off."""
+    return drone["State"]["Status"] != "Off"
+
+
+def is_confirming(drone):
+    """Check if the drone is in confirmation state."""
+    return drone["State"]["Status"] == "Confirming"
+
+
+def is_inactive(drone):
+    """Check if the drone is in inactive state."""
+    return drone["State"]["Status"] == "Inactive"
+
+
+def is_active(drone):
+    """Check if the drone is in active state."""
+    return drone["State"]["Status"] == "Active"
+
+
+# Battery related functions
+def discharge_drone_battery(drone, effects):
+    """Handle drone battery discharging."""
+    battery_level = drone["State"]["Battery"]
+    if float(battery_level) > 20:
+        drone["State"]["Battery"] = int(
+            drone["State"]["Battery"]) - 1
+    elif float(battery_level) <= 20 and float(battery_level) > 3:
+        # Drone in inactive state will take less battery per iteration (1/4 of normal battery usage).
+        drone["State"]["Battery"] = float(
+            drone["State"]["Battery"]) - 0.25
+
+    if float(battery_level) == 20.0:
+        drone["State"]["Status"] = "Inactive"
+        drone["State"]["Battery"] = int(
+            drone["State"]["Battery"]) - 1
+
+        drone_log(drone, "battery Low %s, changing to Inactive state" % (
+            str(drone["State"]["Battery"])), effects)
+        http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+    elif float(battery_level) <= 4.0:
+        # Battery level critical change drone status to OFF
+        drone["State"]["Status"] = "Off"
+
+        drone_log(drone, "Battery level critical, shutting down!", effects)
+        http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+    return drone
+
+
+def charge_drone_battery(drone, effects):
+    """Handle the drone battery charging operation."""
+    battery_level = drone["State"]["Battery"]
+    if float(battery_level) < 95:
+        # Increase battery level
+        drone["State"]["Battery"] = float(battery_level) + 5
+    else:
+        # If battery >= 95 set battery level to 100%
+        drone["State"]["Battery"] = 100
+        drone_log(drone, "charging complete, returning to Active state", effects)
+        drone["State"]["Status"] = "Active"
+        http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+    return drone
+
+
+def handle_drone_battery(drone, effects):
+    """Handle the drone battery status."""
+    if is_charging(drone):
+        drone = charge_drone_battery(drone, effects)
+    else:
+        drone = discharge_drone_battery(drone, effects)
+    return drone
+
+
+# Distance related functions
+def get_new_direction_for_drone(current_direction):
+    """Return a new direction for drone."""
+    directions = ["N", "E", "S", "W"]
+    directions.pop(directions.index(current_direction))
+
+    return random.choice(directions)
+
+
+def calculate_dis_travelled(speed, time):
+    """Calculate the distance travelled(in Km) in a give amount of time(s)."""
+    return (speed * time) / 3600.0
+
+
+def handle_invalid_pos(drone, distance_travelled, drone_bounds):
+    """Handle invalid position update for drone."""
+    current_direction = drone["State"]["Direction"]
+
+    direction = get_new_direction_for_drone(current_direction)
+    drone["State"]["Direction"] = direction
+
+    drone_position = tuple(float(a)
+                           for a in drone["State"]["Position"].split(","))
+    new_drone_position = get_new_coordinates(
+        drone_position, distance_travelled, direction)
+    if is_valid_location(new_drone_position, drone_bounds):
+        drone["State"]["Position"] = ",".join(
+            map(str, new_drone_position))
+        return drone
+    else:
+        return handle_invalid_pos(drone, distance_travelled, drone_bounds)
+
+
+def update_drone_position(drone, distance_travelled, direction, drone_bounds):
+    """Update the drone position given the distance travelled and direction of travel."""
+    drone_position = tuple(float(a)
+                           for a in drone["State"]["Position"].split(","))
+    new_drone_position = get_new_coordinates(
+        drone_position, distance_travelled, direction)
+    if is_valid_location(new_drone_position, drone_bounds):
+        drone["State"]["Position"] = ",".join(
+            map(str, new_drone_position))
+    else:
+        drone = handle_invalid_pos(drone, distance_travelled, drone_bounds)
+    return drone
+
+
+def handle_drone_position(drone, loop_time, drone_bounds, effects):
+    """Handle the drone position changes."""
+    if not is_charging(drone):
+        drone_speed = float(drone["State"]["Speed"])
+        distance_travelled = calculate_dis_travelled(drone_speed, loop_time)
+        drone_direction = str(drone["State"]["Direction"])
+        drone = update_drone_position(
+            drone, distance_travelled, drone_direction, drone_bounds)
+
+        if drone["State"]["Direction"] != drone_direction:
+            drone_log(drone, "changed direction to %s" % (
+                str(drone["State"]["Direction"])), effects)
+            http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+    return drone
+
+
+# Datastream related functions
+def gen_normal_sensor_data():
+    """Generate normal sensor data for drone datastream."""
+    normal_range = range(25, 40)
+    return random.choice(normal_range)
+
+
+def gen_abnormal_sensor_data():
+    """Generate abnormal sensor data for drone datastream."""
+    abnormal_range = range(45, 60)
+    return random.choice(abnormal_range)
+
+
+# Anomaly related functions
+def gen_grid_anomaly(drone):
+    """Generate an anomaly using drone location and a set of probabilities."""
+    drone_location = tuple(float(a)
+                           for a in drone["State"]["Position"].split(","))
+
+    xtile, ytile = deg2num(drone_location[0], drone_location[1], 17)
+
+    ## Test for anomaly genration test = 5x + 7y + 2
+    test = (5*int(xtile)) + (7*(ytile)) + 2
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("Anomaly grid test", extra=fields(Test=test, Mod5=test % 5, Mod7=test % 7))
+
+    if test % 35 == 0:
+        ## if mod 35 == 0 then probability of anomaly = 1/2
+        option = random.choice([True, True, False, False, False, True])
+    else:
+        option = False
+
+    if option:
+        anomaly = gen_Anomaly(
+            drone["State"]["Position"], drone["DroneID"])
+        return anomaly
+    return None
+
+
+def handle_anomaly(drone, anomaly, loop_time, effects):
+    """Handle the anomaly that the drone needs to check on."""
+    if anomaly is not None:
+        anomaly = copy.deepcopy(anomaly)
+        destination = tuple(float(a) for a in anomaly["Location"].split(","))
+        if not drone_reached_destination(drone, destination, loop_time):
+            LOGGER.debug("Drone moving toward anomaly")
+            source = tuple(float(a)
+                           for a in drone["State"]["Position"].split(","))
+            new_direction = get_direction(source, destination)
+            LOGGER.debug("New direction", extra=fields(Direction=new_direction))
+            if new_direction != drone["State"]["Direction"]:
+                drone["State"]["Direction"] = new_direction
+                drone_log(drone, "changed direction to %s" % (str(new_direction)), effects)
+
+        else:
+            # if reached destination
+            LOGGER.debug("Drone reached destination")
+            drone_log(drone, "reached anomaly location, scanning", effects)
+            ## Check if anomaly exists at that location
+            confirm_anomaly = gen_grid_anomaly(drone)
+            if confirm_anomaly is not None:
+                anomaly["Status"] = "Positive"
+                drone_log(drone, "detected POSITIVE anomaly.", effects)
+            else:
+                anomaly["Status"] = "Negative"
+                drone_log(drone, "detected NEGATIVE anomaly.", effects)
+
+            effects.append(Effect(UPDATE_ANOMALY_LOCALLY, (anomaly, drone["DroneID"])))
+            effects.append(Effect(UPDATE_ANOMALY_AT_CONTROLLER,
+                                  (anomaly, anomaly["AnomalyID"], drone["DroneID"])))
+
+            drone["State"]["Status"] = "Active"
+
+        http_api_log(drone, "PUT DroneLog", "Controller", effects)
+
+    return drone
+
+
+def handle_drone_low_battery(drone, controller_location, loop_time, effects):
+    """Handle the drone inactive state ( when 3< battery < 20)."""
+    destination = controller_location
+    if not drone_reached_destination(drone, destination, loop_time):
+        LOGGER.debug("Drone moving toward central controller")
+        source = tuple(float(a)
+                       for a in drone["State"]["Position"].split(","))
+        new_direction = get_direction(source, destination)
+        if new_direction != drone["State"]["Direction"]:
+            drone["State"]["Direction"] = new_direction
+            drone_log(drone, "changed direction to %s" % (str(new_direction)), effects)
+
+    else:
+        # if reached destination
+        drone_log(drone, "reached central controller, charging.", effects)
+        LOGGER.debug("Drone reached destination")
+        drone["State"]["Status"] = "Charging"
+    return drone
+
+
+def step(drone, inputs):
+    """Run one iteration of the drone mechanics.
+
+    Return the new drone object and the list of effects of the iteration,
+    the drone object passed in is left unchanged.
+    """
+    drone = copy.deepcopy(drone)
+    effects = list()
+    drone_identifier = drone["DroneID"]
+    datastream = None
+
+    # Commands will be executed in any state
+    drone = handle_drone_commands(drone, inputs["CommandIDs"], inputs["Command"], effects)
+
+    if is_not_off(drone):
+
+        ## Handle drone battery change
+        drone = handle_drone_battery(drone, effects)
+
+        ## Handle drone general behaviour
+        anomaly = inputs["Anomaly"]
+        if anomaly is not None:
+            if anomaly["Status"] == "Confirming" and drone["State"]["Status"] == "Active":
+                drone["State"]["Status"] = "Confirming"
+
+        if is_confirming(drone):
+            LOGGER.debug("Drone handling anomaly")
+            drone = handle_anomaly(drone, anomaly, inputs["LoopTime"], effects)
+
+        elif is_inactive(drone):
+            LOGGER.info("Drone battery low, needs to charge")
+            drone = handle_drone_low_battery(
+                drone, inputs["ControllerLocation"], inputs["LoopTime"], effects)
+
+        elif is_active(drone):
+            anomaly = gen_grid_anomaly(drone)
+            if anomaly is not None:
+                LOGGER.info("New anomaly created")
+                effects.append(Effect(SEND_ANOMALY, (anomaly, drone_identifier)))
+                datastream = gen_Datastream(gen_abnormal_sensor_data(
+                ), drone["State"]["Position"], drone_identifier)
+            else:
+                datastream = gen_Datastream(gen_normal_sensor_data(
+                ), drone["State"]["Position"], drone_identifier)
+
+        # Handle positions change
+        drone = handle_drone_position(drone, inputs["LoopTime"], inputs["DroneBounds"], effects)
+
+    # update the drone both locally and on the controller
+    effects.append(Effect(UPDATE_DRONE, (drone,)))
+    effects.append(Effect(UPDATE_DRONE_AT_CONTROLLER, (drone, drone_identifier)))
+
+    if datastream is not None:
+        effects.append(Effect(SEND_DATASTREAM, (datastream,)))
+        effects.append(Effect(UPDATE_DATASTREAM, (datastream,)))
+
+    return drone, effects
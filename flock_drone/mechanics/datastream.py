@@ -8,87 +8,152 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-import json
-from flock_drone.mechanics.main import (RES_CS, RES_DRONE,
-                                        CENTRAL_SERVER, DRONE)
+from flock_drone.mechanics.main import (RES_CS, get_drone_resource, get_drone_url,
+                                        CENTRAL_SERVER, get_drone_namespace, update_drone)
 from flock_drone.mechanics.logs import send_http_api_log, gen_HttpApiLog
-from hydra import SCHEMA, Resource
+from flock_drone.mechanics.objects import gen_Datastream, gen_TickUpdate
+from flock_drone.mechanics.tick_cache import cached, invalidates
+from flock_drone.mechanics.budget import non_critical
+from flock_drone.mechanics.resources import get_resource, find_operation
+from flock_drone.mechanics.codec import decode
+from flock_drone.mechanics.publisher import DRONE_PUBLISHER
+from flock_drone.mechanics.core import SEND_DATASTREAM, UPDATE_DRONE_AT_CONTROLLER
+from flock_drone.mechanics.spool import spool_message, message_sent
+from flock_drone.mechanics.transport import RequestError, check_response
+from hydra import SCHEMA
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
 
 
 # Datastream related methods
-def gen_Datastream(temperature, position, drone_id):
-    """Generate a datastream objects."""
-    datastream = {
-        "@type": "Datastream",
-        "Temperature": temperature,
-        "Position": position,
-        "DroneID": drone_id,
-    }
+def post_datastream(datastream):
+    """Post the drone current datastream to the central server, raise if the post failed."""
+    drone_identifier = datastream["DroneID"]
+    post_datastream_ = find_operation(
+        RES_CS, SCHEMA.AddAction, CENTRAL_SERVER.Datastream)
+    resp, body = post_datastream_(datastream)
+
+    check_response(resp)
+    LOGGER.debug("Datastream posted successfully.")
 
-    return datastream
+    http_api_log = gen_HttpApiLog("Drone %s" % (
+        str(drone_identifier)), "PUT Datastream", "Controller")
+    send_http_api_log(http_api_log)
 
 
+@non_critical
 def send_datastream(datastream):
-    """Post the drone current datastream to the central server."""
+    """Post the drone current datastream to the central server, spooling it if the post failed."""
     try:
-        drone_identifier = datastream["DroneID"]
-        post_datastream = RES_CS.find_suitable_operation(
-            SCHEMA.AddAction, CENTRAL_SERVER.Datastream)
-        resp, body = post_datastream(datastream)
-
-        assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        print("Datastream posted successfully.")
-
-        http_api_log = gen_HttpApiLog("Drone %s" % (
-            str(drone_identifier)), "PUT Datastream", "Controller")
-        send_http_api_log(http_api_log)
-
+        post_datastream(datastream)
     except Exception as e:
-        print(e)
+        spool_message(get_drone_url(), SEND_DATASTREAM, (datastream,), e)
         return None
 
 
+@non_critical
+@invalidates("get_datastream")
 def update_datastream(datastream):
     """Update the drone datastream on drone server."""
     try:
-        update_datastream_ = RES_DRONE.find_suitable_operation(
-            operation_type=SCHEMA.UpdateAction, input_type=DRONE.Datastream)
+        update_datastream_ = find_operation(
+            get_drone_resource(),
+            operation_type=SCHEMA.UpdateAction, input_type=get_drone_namespace().Datastream)
         resp, body = update_datastream_(datastream)
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        return Resource.from_iri(resp['location'])
+        return get_resource(resp['location'])
     except Exception as e:
-        print(e)
+        LOGGER.warning("update_datastream failed: %s", e)
         return None
 
 
+@invalidates("get_drone", "get_datastream")
+def update_tick(drone, datastream):
+    """Update the drone and its datastream on drone server in one request.
+
+    Fall back to separate updates when the server has no TickUpdate endpoint
+    or the update failed.
+    """
+    try:
+        update_tick_ = find_operation(
+            get_drone_resource(),
+            operation_type=SCHEMA.UpdateAction, input_type=get_drone_namespace().TickUpdate)
+        assert update_tick_ is not None, "Drone server has no TickUpdate endpoint"
+        resp, body = update_tick_(gen_TickUpdate(drone, datastream))
+        assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
+        return True
+    except Exception as e:
+        LOGGER.warning("update_tick failed: %s", e)
+
+    update_drone(drone)
+    update_datastream(datastream)
+    return False
+
+
+@invalidates("get_drone", "get_datastream")
+def publish_drone(drone, datastream=None):
+    """Send the drone to its server, the controller and the mirrors, encoding it once.
+
+    The datastream, if any, is sent to the drone server with the drone in a
+    TickUpdate. Return the deliveries by target.
+    """
+    drone_identifier = drone["DroneID"]
+    deliveries = DRONE_PUBLISHER.publish(
+        drone, {"DroneURL": get_drone_url(), "Datastream": datastream})
+    for delivery in deliveries.values():
+        if delivery["Error"] is not None:
+            LOGGER.warning("Publishing drone to %s failed: %s", delivery["Target"], delivery["Error"])
+
+    if deliveries["Local"]["Error"] is not None and datastream is not None:
+        # The drone server may not have the TickUpdate endpoint.
+        update_drone(drone)
+        update_datastream(datastream)
+    if deliveries["Controller"]["Error"] is None:
+        http_api_log = gen_HttpApiLog("Drone %s" % (
+            str(drone_identifier)), "POST Drone", "Controller")
+        send_http_api_log(http_api_log)
+        message_sent(get_drone_url(), UPDATE_DRONE_AT_CONTROLLER, (drone, drone_identifier))
+    else:
+        controller = deliveries["Controller"]
+        if controller["Status"] is not None:
+            error = RequestError(controller["Status"], controller["Error"])
+        else:
+            error = ConnectionError(controller["Error"])
+        spool_message(get_drone_url(), UPDATE_DRONE_AT_CONTROLLER, (drone, drone_identifier), error)
+    return deliveries
+
+
+@invalidates("get_datastream")
 def add_datastream(datastream):
     """Update the drone datastream on drone server."""
     try:
-        update_datastream_ = RES_DRONE.find_suitable_operation(
-            operation_type=SCHEMA.AddAction, input_type=DRONE.Datastream)
+        update_datastream_ = find_operation(
+            get_drone_resource(),
+            operation_type=SCHEMA.AddAction, input_type=get_drone_namespace().Datastream)
         resp, body = update_datastream_(datastream)
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        return Resource.from_iri(resp['location'])
+        return get_resource(resp['location'])
     except Exception as e:
-        print(e)
+        LOGGER.warning("add_datastream failed: %s", e)
         return None
 
 
+@cached
 def get_datastream():
     """Get the drone datastream from drone server."""
     try:
-        get_datastream_ = RES_DRONE.find_suitable_operation(
-            operation_type=None, input_type=None, output_type=DRONE.Datastream)
+        get_datastream_ = find_operation(
+            get_drone_resource(),
+            operation_type=None, input_type=None, output_type=get_drone_namespace().Datastream)
         resp, body = get_datastream_()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        datastream = json.loads(body.decode('utf-8'))
         # remove extra contexts from datastream
-        datastream.pop("@context", None)
-        datastream.pop("@id", None)
+        datastream = decode(body)
         return datastream
     except Exception as e:
-        print(e)
+        LOGGER.warning("get_datastream failed: %s", e)
         return None
@@ -130,11 +130,11 @@ def calculate_drone_range(speed, loop_time=15):
     return drone_range
 
 
-def drone_reached_destination(drone, destination):
+def drone_reached_destination(drone, destination, loop_time=15):
     """Check if the drone has reached its destination."""
     drone_position = tuple(float(a)
                            for a in drone["State"]["Position"].split(","))
-    drone_range = calculate_drone_range(drone["State"]["Speed"])
+    drone_range = calculate_drone_range(drone["State"]["Speed"], loop_time)
 
     # Generate a square bound for destination location
     bounds_square_path = gen_square_path(destination, drone_range)
@@ -0,0 +1,152 @@
+"""On-disk cache of the API documentation fetched by Resource.from_iri.
+
+DocCacheTransport keeps the responses to GET requests of entrypoints, API
+docs and JSON-LD contexts in DOC_CACHE_DIR, keyed by IRI. Cached responses
+are revalidated with If-None-Match / If-Modified-Since, and served as is
+when the server can't be reached, so drones can start while the controller
+is down.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import hashlib
+import json
+import re
+import tempfile
+import threading
+from urllib.parse import urlsplit
+from flock_drone.settings import API_NAME, DOC_CACHE_DIR
+from flock_drone.mechanics.transport import Transport, Response
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Paths of the entrypoint, the API doc and the JSON-LD contexts.
+DOC_PATH = re.compile(r"^/%s(/?|/vocab|/contexts/.*)$" % re.escape(API_NAME))
+
+
+def gen_DocCacheStats():
+    """Generate empty API doc cache statistics."""
+    stats = {
+        "Fetched": 0,
+        "Revalidated": 0,
+        "Stale": 0,
+        "Misses": 0,
+    }
+    return stats
+
+
+def is_doc(uri):
+    """Check if uri is an entrypoint, API doc or context IRI."""
+    return DOC_PATH.match(urlsplit(uri).path) is not None
+
+
+class DocCache(object):
+    """Responses stored in directory as <key>.json metadata and <key>.body content."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, iri, extension):
+        """Return the path of a file of the entry of iri."""
+        key = hashlib.sha1(iri.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + extension)
+
+    def load(self, iri):
+        """Return the (metadata, content) cached for iri, None if there is none."""
+        try:
+            with open(self.path(iri, ".json")) as f:
+                metadata = json.load(f)
+            with open(self.path(iri, ".body"), "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        if metadata.get("IRI") != iri:
+            return None
+        return metadata, content
+
+    def write(self, path, data):
+        """Replace the file at path by data atomically."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def store(self, iri, response, content):
+        """Cache a response to a GET of iri."""
+        headers = [(name, value) for name, value in response.items() if name != "status"]
+        metadata = {
+            "IRI": iri,
+            "Status": response.status,
+            "Reason": response.reason,
+            "Headers": headers,
+        }
+        self.write(self.path(iri, ".body"), content)
+        self.write(self.path(iri, ".json"), json.dumps(metadata).encode("utf-8"))
+
+
+class DocCacheTransport(Transport):
+    """Cache the API doc responses of transport on disk."""
+
+    def __init__(self, transport, directory=DOC_CACHE_DIR):
+        self.transport = transport
+        self.cache = DocCache(directory)
+        self.stats = gen_DocCacheStats()
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        """Add one to the statistic key."""
+        with self._lock:
+            self.stats[key] += 1
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        if method != "GET" or not is_doc(uri):
+            return self.transport.request(uri, method, body, headers, **kwargs)
+
+        cached = self.cache.load(uri)
+        headers = dict(headers or {})
+        if cached is not None:
+            metadata, cached_content = cached
+            cached_headers = dict(metadata["Headers"])
+            if "etag" in cached_headers:
+                headers["If-None-Match"] = cached_headers["etag"]
+            if "last-modified" in cached_headers:
+                headers["If-Modified-Since"] = cached_headers["last-modified"]
+
+        try:
+            response, content = self.transport.request(uri, method, body, headers, **kwargs)
+        except Exception as e:
+            if cached is None:
+                self.count("Misses")
+                raise
+            LOGGER.warning("Using cached %s: %s", uri, e)
+            self.count("Stale")
+            return self.cached_response(cached)
+
+        if response.status == 304 and cached is not None:
+            self.count("Revalidated")
+            return self.cached_response(cached)
+        if response.status == 200:
+            self.count("Fetched")
+            self.cache.store(uri, response, content)
+        elif response.status >= 500 and cached is not None:
+            self.count("Stale")
+            return self.cached_response(cached)
+        return response, content
+
+    def cached_response(self, cached):
+        """Return the cached (response, content)."""
+        metadata, content = cached
+        return Response(metadata["Status"], metadata["Reason"], metadata["Headers"]), content
+
+    def close(self):
+        """Release the resources held by the transport."""
+        self.transport.close()
@@ -8,11 +8,16 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-from flock_drone.mechanics.main import CENTRAL_SERVER, RES_CS, RES_DRONE, DRONE
-from hydra import SCHEMA, Resource
+from flock_drone.mechanics.main import CENTRAL_SERVER, RES_CS, get_drone_resource, get_drone_namespace
+from hydra import SCHEMA
 from flock_drone.mechanics.main import get_drone, get_drone_default, update_drone, get_controller_location, update_drone_at_controller
 from flock_drone.mechanics.datastream import gen_Datastream, add_datastream
 from flock_drone.settings import CENTRAL_SERVER_URL
+from flock_drone.mechanics.tick_cache import invalidates
+from flock_drone.mechanics.resources import get_resource, find_operation, invalidate
+from flock_drone.mechanics.local_log import get_logger, fields, configure
+
+LOGGER = get_logger(__name__)
 
 
 def init_drone_locally():
@@ -22,53 +27,53 @@ def init_drone_locally():
 
     drone["State"]["Position"] = location
     add_drone_locally(drone)
-    print("Drone initalized locally!")
+    LOGGER.info("Drone initalized locally!")
 
 
+@invalidates("get_drone")
 def add_drone_locally(drone):
     """Add the drone object to the central server and return Id."""
     try:
-        add_drone_ = RES_DRONE.find_suitable_operation(
-            SCHEMA.AddAction, DRONE.Drone)
+        add_drone_ = find_operation(
+            get_drone_resource(), SCHEMA.AddAction, get_drone_namespace().Drone)
         resp, body = add_drone_(drone)
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
         drone_id = resp['location'].split("/")[-1]
 
         return drone_id
     except Exception as e:
-        print(e)
-        print("Using default id instead")
+        LOGGER.warning("add_drone_locally failed, using default id instead: %s", e)
         return -1000
 
 
 def add_drone(drone):
     """Add the drone object to the central server and return Id."""
     try:
-        add_drone_ = RES_CS.find_suitable_operation(
-            SCHEMA.AddAction, CENTRAL_SERVER.Drone)
+        add_drone_ = find_operation(
+            RES_CS, SCHEMA.AddAction, CENTRAL_SERVER.Drone)
         resp, body = add_drone_(drone)
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
         drone_id = resp['location'].split("/")[-1]
-        print(drone_id)
+        LOGGER.info("Drone added to the central server", extra=fields(DroneID=drone_id))
         return drone_id
     except Exception as e:
-        print(e)
-        print("Using default id instead")
+        LOGGER.warning("add_drone failed, using default id instead: %s", e)
         return -1000
 
 
 def remove_drone(drone_id):
     """Remove previous drone object from the central server."""
     try:
-        i = Resource.from_iri(CENTRAL_SERVER_URL +
-                              "/api/DroneCollection" + str(drone_id))
-        resp, _ = i.find_suitable_operation(SCHEMA.DeleteAction, None)()
+        iri = CENTRAL_SERVER_URL + "/api/DroneCollection" + str(drone_id)
+        i = get_resource(iri)
+        resp, _ = find_operation(i, SCHEMA.DeleteAction, None)()
+        invalidate(iri)
         if resp.status // 100 != 2:
             return "error deleting <%s>" % i.identifier
         else:
             return "successfully deleted <%s>" % i.identifier
     except Exception as e:
-        print(e)
+        LOGGER.warning("remove_drone failed: %s", e)
         return {404: "Resource with Id %s not found!" % (drone_id,)}
 
 
@@ -86,7 +91,7 @@ def init_drone():
     else:
         # Remove old drone
         remove_drone(drone_id)
-        print("Previous drone successfully deleted from the central server.")
+        LOGGER.info("Previous drone successfully deleted from the central server.")
         drone_id = add_drone(drone)
 
     # Update the drone at localhost
@@ -95,7 +100,7 @@ def init_drone():
     update_drone(drone)
     update_drone_at_controller(drone, drone_id)
 
-    print("Drone initialized successfully!")
+    LOGGER.info("Drone initialized successfully!")
 
 
 def init_datastream_locally():
@@ -105,9 +110,10 @@ def init_datastream_locally():
     position = drone["State"]["Position"]
     datastream = gen_Datastream("0", position, id_)
     add_datastream(datastream)
-    print("Datastream initialized locally")
+    LOGGER.info("Datastream initialized locally")
 
 
 if __name__ == "__main__":
+    configure()
     init_drone()
     init_datastream_locally()
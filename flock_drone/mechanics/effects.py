@@ -0,0 +1,158 @@
+"""Perform the effects returned by mechanics/core.py against the servers."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+from collections import OrderedDict
+from flock_drone.settings import TICK_UPDATE, PUBLISH_DRONE
+from flock_drone.mechanics import core
+from flock_drone.mechanics.main import (update_drone, update_drone_at_controller, put_drone_at_controller,
+                                        get_drone_url)
+from flock_drone.mechanics.logs import send_dronelog, send_http_api_log
+from flock_drone.mechanics.datastream import (send_datastream, update_datastream, update_tick,
+                                              publish_drone, post_datastream)
+from flock_drone.mechanics.anomaly import (send_anomaly, update_anomaly_locally, update_anomaly_at_controller,
+                                           deliver_anomaly, put_anomaly_at_controller)
+from flock_drone.mechanics.commands import delete_commands
+from flock_drone.mechanics.budget import budget_exhausted
+from flock_drone.mechanics.spool import get_spool
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# UPDATE_DRONE and UPDATE_DATASTREAM sent together, see merge_tick_update().
+TICK_UPDATE_KIND = "TickUpdate"
+# UPDATE_DRONE and UPDATE_DRONE_AT_CONTROLLER, with UPDATE_DATASTREAM when it is merged
+# too, sent by the drone publisher, see merge_publish_drone().
+PUBLISH_DRONE_KIND = "PublishDrone"
+
+HANDLERS = {
+    PUBLISH_DRONE_KIND: publish_drone,
+    TICK_UPDATE_KIND: update_tick,
+    core.UPDATE_DRONE: update_drone,
+    core.UPDATE_DRONE_AT_CONTROLLER: update_drone_at_controller,
+    core.DELETE_COMMANDS: delete_commands,
+    core.UPDATE_ANOMALY_LOCALLY: update_anomaly_locally,
+    core.UPDATE_ANOMALY_AT_CONTROLLER: update_anomaly_at_controller,
+    core.SEND_ANOMALY: send_anomaly,
+    core.SEND_DATASTREAM: send_datastream,
+    core.UPDATE_DATASTREAM: update_datastream,
+    core.DRONE_LOG: send_dronelog,
+    core.HTTP_API_LOG: send_http_api_log,
+}
+
+# Senders of the spooled messages, raising when the controller can't be reached.
+SPOOL_SENDERS = {
+    core.UPDATE_DRONE_AT_CONTROLLER: put_drone_at_controller,
+    core.SEND_ANOMALY: deliver_anomaly,
+    core.UPDATE_ANOMALY_AT_CONTROLLER: put_anomaly_at_controller,
+    core.SEND_DATASTREAM: post_datastream,
+}
+
+# Stages of independent kinds, performed in this order: the drone and datastream writes, the
+# commands are deleted and the anomaly updated locally once the drone is saved, the anomalies
+# are sent to the controller after their local update, and logs come last.
+STAGES = [
+    [PUBLISH_DRONE_KIND, TICK_UPDATE_KIND, core.UPDATE_DRONE, core.UPDATE_DRONE_AT_CONTROLLER,
+     core.SEND_DATASTREAM, core.UPDATE_DATASTREAM],
+    [core.DELETE_COMMANDS, core.UPDATE_ANOMALY_LOCALLY],
+    [core.UPDATE_ANOMALY_AT_CONTROLLER, core.SEND_ANOMALY],
+    [core.DRONE_LOG, core.HTTP_API_LOG],
+]
+
+# Batches are performed in this order, stage after stage.
+ORDER = [kind for stage in STAGES for kind in stage]
+
+
+def single(effects, kind):
+    """Return the only effect of kind in effects, None if there are none or several."""
+    matches = [effect for effect in effects if effect.kind == kind]
+    return matches[0] if len(matches) == 1 else None
+
+
+def merge_publish_drone(effects, enabled=PUBLISH_DRONE, tick_update=TICK_UPDATE):
+    """Replace the drone updates of a tick, local and at the controller, by one publication.
+
+    The datastream update joins the publication, sent to the drone server
+    in a TickUpdate, under the same conditions as in merge_tick_update().
+    """
+    local = single(effects, core.UPDATE_DRONE)
+    controller = single(effects, core.UPDATE_DRONE_AT_CONTROLLER)
+    if not enabled or local is None or controller is None:
+        return effects
+    datastream = single(effects, core.UPDATE_DATASTREAM)
+    if not tick_update or budget_exhausted():
+        datastream = None
+    merged = core.Effect(PUBLISH_DRONE_KIND,
+                         local.args + (datastream.args[0] if datastream else None,))
+    return [merged if e is local else e for e in effects
+            if e is not controller and e is not datastream]
+
+
+def merge_tick_update(effects, enabled=TICK_UPDATE):
+    """Replace the drone and datastream updates of a tick by a single TickUpdate effect.
+
+    The datastream update is non critical, it is left alone once the budget
+    of the tick is spent so it can still be shed.
+    """
+    drone = single(effects, core.UPDATE_DRONE)
+    datastream = single(effects, core.UPDATE_DATASTREAM)
+    if not enabled or drone is None or datastream is None or budget_exhausted():
+        return effects
+    merged = core.Effect(TICK_UPDATE_KIND, drone.args + datastream.args)
+    return [merged if e is drone else e for e in effects if e is not datastream]
+
+
+def merge_updates(effects):
+    """Merge the drone and datastream updates of a tick as set by PUBLISH_DRONE and TICK_UPDATE."""
+    return merge_tick_update(merge_publish_drone(effects))
+
+
+def group_effects(effects):
+    """Group effects by kind in batch order, keeping the order within each batch."""
+    batches = OrderedDict((kind, list()) for kind in ORDER)
+    for effect in effects:
+        batches[effect.kind].append(effect)
+    return batches
+
+
+def group_stages(effects):
+    """Group effects by stage, then by kind, leaving out empty batches and stages."""
+    batches = group_effects(effects)
+    stages = [[batches[kind] for kind in stage if batches[kind]] for stage in STAGES]
+    return [stage for stage in stages if stage]
+
+
+def execute_batch(kind, effects):
+    """Perform a batch of effects of the same kind."""
+    handler = HANDLERS[kind]
+    for effect in effects:
+        try:
+            handler(*effect.args)
+        except Exception as e:
+            LOGGER.warning("execute_batch failed: %s", e)
+
+
+def replay_spool():
+    """Send a batch of the spooled controller messages, unless the tick is over its budget."""
+    spool = get_spool(get_drone_url())
+    if spool is None or len(spool) == 0 or budget_exhausted():
+        return 0
+    return spool.replay(SPOOL_SENDERS)
+
+
+def execute_effects(effects, skip=()):
+    """Perform effects in batches, effects of the kinds in skip are dropped.
+
+    The spooled messages are replayed first, the tick's messages are newer.
+    """
+    replay_spool()
+    effects = merge_updates([effect for effect in effects if effect.kind not in skip])
+    for kind, batch in group_effects(effects).items():
+        if batch:
+            execute_batch(kind, batch)
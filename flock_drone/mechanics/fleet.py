@@ -0,0 +1,205 @@
+"""Vectorized engine to step the mechanics of a whole fleet of drones at once."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import copy
+import numpy as np
+from flock_drone.mechanics.distance import earth_radius
+
+# Directions are stored as indexes in this tuple, turning clockwise.
+DIRECTIONS = ("N", "E", "S", "W")
+NORTH, EAST, SOUTH, WEST = range(len(DIRECTIONS))
+
+# Status values are stored as indexes in this tuple.
+STATUSES = ("Active", "Inactive", "Confirming", "Charging", "Off")
+ACTIVE, INACTIVE, CONFIRMING, CHARGING, OFF = range(len(STATUSES))
+
+# Give up looking for a valid direction after this many random turns.
+MAX_TURNS = 32
+
+
+def get_new_coordinates(positions, distances, directions):
+    """Vectorized distance.get_new_coordinates for arrays of (lat,lon) positions."""
+    positions = np.asarray(positions, dtype=float)
+    new_positions = positions.copy()
+    # South and East are North and West with a negative distance.
+    sign = np.where((directions == SOUTH) | (directions == EAST), -1.0, 1.0)
+    distances = distances * sign
+
+    north = (directions == NORTH) | (directions == SOUTH)
+    west = ~north
+    new_positions[north, 0] += np.degrees(distances[north] / earth_radius)
+    radius = earth_radius * np.cos(np.radians(positions[west, 0]))
+    new_positions[west, 1] += np.degrees(distances[west] / radius)
+    return new_positions
+
+
+def is_valid_location(positions, bounds):
+    """Vectorized distance.is_valid_location, return a mask of positions in bounds."""
+    positions = np.asarray(positions, dtype=float)
+    lat, lon = positions[:, 0], positions[:, 1]
+    return ((min(bounds[0]) <= lat) & (lat <= max(bounds[0])) &
+            (min(bounds[1]) <= lon) & (lon <= max(bounds[1])))
+
+
+def deg2num(lat_deg, lon_deg, zoom=12):
+    """Vectorized distance.deg2num, convert latitudes and longitudes to map tile indexes."""
+    lat_rad = np.radians(lat_deg)
+    n = 2.0 ** zoom
+    xtile = np.trunc((lon_deg + 180.0) / 360.0 * n).astype(np.int64)
+    ytile = np.trunc((1.0 - np.log(np.tan(lat_rad) + (1 / np.cos(lat_rad))) /
+                      np.pi) / 2.0 * n).astype(np.int64)
+    return xtile, ytile
+
+
+def get_direction(sources, destinations):
+    """Vectorized distance.get_direction, find the directions to move from sources to destinations."""
+    sources = np.asarray(sources, dtype=float)
+    destinations = np.broadcast_to(np.asarray(destinations, dtype=float), sources.shape)
+    lat_diff = np.abs(sources[:, 0] - destinations[:, 0])
+    long_diff = np.abs(sources[:, 1] - destinations[:, 1])
+    by_lat = np.where(sources[:, 0] > destinations[:, 0], SOUTH, NORTH)
+    by_long = np.where(sources[:, 1] > destinations[:, 1], EAST, WEST)
+    return np.where(lat_diff > long_diff, by_lat, by_long)
+
+
+def calculate_dis_travelled(speeds, time):
+    """Calculate the distances travelled(in Km) in a give amount of time(s)."""
+    return (speeds * time) / 3600.0
+
+
+class Fleet(object):
+    """State of N drones kept in NumPy arrays, stepped in batched passes.
+
+    The fleet mirrors the per drone logic of simulate.py, only the parts which
+    need the drone server (commands and confirming anomalies) are left to the caller.
+    """
+
+    def __init__(self, drones, bounds, seed=None):
+        """Load the fleet from a list of drone objects and the drone bounds."""
+        self.drones = [copy.deepcopy(drone) for drone in drones]
+        self.bounds = bounds
+        self.rng = np.random.default_rng(seed)
+
+        states = [drone["State"] for drone in self.drones]
+        self.positions = np.array([[float(a) for a in state["Position"].split(",")]
+                                   for state in states], dtype=float).reshape(-1, 2)
+        self.speeds = np.array([float(state["Speed"]) for state in states], dtype=float)
+        self.directions = np.array([DIRECTIONS.index(state["Direction"])
+                                    for state in states], dtype=np.int8)
+        self.batteries = np.array([float(state["Battery"]) for state in states], dtype=float)
+        self.statuses = np.array([STATUSES.index(state["Status"])
+                                  for state in states], dtype=np.int8)
+
+    def __len__(self):
+        return len(self.drones)
+
+    def to_drone(self, index):
+        """Return the drone object at index with its current state."""
+        drone = self.drones[index]
+        state = drone["State"]
+        state["Position"] = ",".join(map(str, self.positions[index]))
+        state["Direction"] = DIRECTIONS[self.directions[index]]
+        battery = self.batteries[index]
+        state["Battery"] = int(battery) if battery == int(battery) else float(battery)
+        state["Status"] = STATUSES[self.statuses[index]]
+        return drone
+
+    def to_drones(self):
+        """Return all the drone objects with their current state."""
+        return [self.to_drone(i) for i in range(len(self))]
+
+    def handle_battery(self):
+        """Charge or discharge the battery of every drone which is not off."""
+        charging = self.statuses == CHARGING
+        discharging = ~charging & (self.statuses != OFF)
+        battery_level = self.batteries.copy()
+
+        # Charging
+        charged = charging & (battery_level >= 95)
+        self.batteries[charging & (battery_level < 95)] += 5
+        self.batteries[charged] = 100
+        self.statuses[charged] = ACTIVE
+
+        # Discharging, inactive drones take 1/4 of normal battery usage.
+        high = discharging & (battery_level > 20)
+        self.batteries[high] = np.trunc(self.batteries[high]) - 1
+        low = discharging & (battery_level <= 20) & (battery_level > 3)
+        self.batteries[low] -= 0.25
+
+        battery_low = discharging & (battery_level == 20.0)
+        self.statuses[battery_low] = INACTIVE
+        self.batteries[battery_low] = np.trunc(self.batteries[battery_low]) - 1
+
+        # Battery level critical change drone status to OFF
+        critical = discharging & ~battery_low & (battery_level <= 4.0)
+        self.statuses[critical] = OFF
+
+    def handle_low_battery(self, destination, loop_time):
+        """Steer inactive drones toward destination, start charging those which reached it."""
+        inactive = np.flatnonzero(self.statuses == INACTIVE)
+        if not len(inactive):
+            return
+        destination = np.asarray(destination, dtype=float)
+        sources = self.positions[inactive]
+
+        # Same square bounds around destination as distance.drone_reached_destination
+        drone_range = calculate_dis_travelled(self.speeds[inactive], loop_time) / 2
+        lat_change = np.degrees(drone_range / earth_radius)
+        long_change = np.degrees(drone_range / (earth_radius * np.cos(np.radians(destination[0]))))
+        reached = ((np.abs(sources[:, 0] - destination[0]) <= lat_change) &
+                   (np.abs(sources[:, 1] - destination[1]) <= long_change))
+
+        self.statuses[inactive[reached]] = CHARGING
+        moving = inactive[~reached]
+        self.directions[moving] = get_direction(self.positions[moving], destination)
+
+    def handle_position(self, loop_time):
+        """Move every drone which is not charging or off, turning away from the bounds."""
+        moving = np.flatnonzero((self.statuses != CHARGING) & (self.statuses != OFF))
+        distances = calculate_dis_travelled(self.speeds[moving], loop_time)
+        new_positions = get_new_coordinates(self.positions[moving], distances,
+                                            self.directions[moving])
+        invalid = ~is_valid_location(new_positions, self.bounds)
+
+        for _ in range(MAX_TURNS):
+            if not invalid.any():
+                break
+            # Turn the drones which left the bounds in a new random direction.
+            turning = moving[invalid]
+            self.directions[turning] = (self.directions[turning] +
+                                        self.rng.integers(1, 4, len(turning))) % 4
+            new_positions[invalid] = get_new_coordinates(
+                self.positions[turning], distances[invalid], self.directions[turning])
+            invalid[invalid] = ~is_valid_location(new_positions[invalid], self.bounds)
+
+        # Drones that could not find a valid direction keep their position.
+        valid = ~invalid
+        self.positions[moving[valid]] = new_positions[valid]
+
+    def gen_grid_anomaly(self, mask=None):
+        """Return a mask of the drones which detect an anomaly at their location."""
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        xtile, ytile = deg2num(self.positions[:, 0], self.positions[:, 1], 17)
+        ## Test for anomaly genration test = 5x + 7y + 2
+        test = (5 * xtile) + (7 * ytile) + 2
+        ## if mod 35 == 0 then probability of anomaly = 1/2
+        return mask & (test % 35 == 0) & (self.rng.random(len(self)) < 0.5)
+
+    def step(self, loop_time, home):
+        """Step battery, low battery, anomaly test and movement for the whole fleet.
+
+        Return the mask of active drones which detected a new anomaly.
+        """
+        self.handle_battery()
+        self.handle_low_battery(home, loop_time)
+        anomalies = self.gen_grid_anomaly(self.statuses == ACTIVE)
+        self.handle_position(loop_time)
+        return anomalies
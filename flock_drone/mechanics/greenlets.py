@@ -0,0 +1,79 @@
+"""Run the main loop of many drones as gevent greenlets in a single process.
+
+Each greenlet runs simulate.tick() against its own drone server. The requests
+of different drones already overlap while greenlets wait on sockets, so
+CONCURRENT_IO should be left off with this runner.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+from gevent import monkey
+monkey.patch_all()
+
+import argparse
+import gevent
+from flock_drone.settings import SIMULATION_SPEEDUP, TICK_JITTER
+from flock_drone.mechanics import simulate
+from flock_drone.mechanics.main import use_drone_endpoint
+from flock_drone.mechanics.drone_init import init_drone, init_datastream_locally
+from flock_drone.mechanics.scheduler import TickScheduler
+from flock_drone.mechanics.clock import get_clock
+from flock_drone.mechanics.stagger import tick_phase, rate_smoothness
+from flock_drone.mechanics.local_log import configure
+
+
+def run_drone(drone_url, scheduler, init=False):
+    """Run the drone main loop against the drone server at drone_url."""
+    use_drone_endpoint(drone_url)
+    if init:
+        init_drone()
+        init_datastream_locally()
+    scheduler.run()
+
+
+def spawn_drones(drone_urls, init=False):
+    """Spawn one greenlet per drone server URL, return the greenlets and their schedulers."""
+    schedulers = [TickScheduler(simulate.tick, simulate.LOOP_TIME, name=drone_url,
+                                clock=get_clock(SIMULATION_SPEEDUP),
+                                phase=tick_phase(drone_url, simulate.LOOP_TIME),
+                                jitter=TICK_JITTER)
+                  for drone_url in drone_urls]
+    greenlets = [gevent.spawn(run_drone, drone_url, scheduler, init)
+                 for drone_url, scheduler in zip(drone_urls, schedulers)]
+    return greenlets, schedulers
+
+
+def run_drones(drone_urls, init=False):
+    """Run one greenlet per drone server URL until all of them exit."""
+    greenlets, _ = spawn_drones(drone_urls, init)
+    gevent.joinall(greenlets)
+    return greenlets
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("drone_urls", nargs="*", help="drone server URLs")
+    parser.add_argument("--host", default="http://localhost",
+                        help="host of the drone servers given with --ports")
+    parser.add_argument("--ports", default=None,
+                        help="range of drone server ports, e.g. 8081-8180")
+    parser.add_argument("--init", action="store_true",
+                        help="initialize each drone before running its loop")
+    args = parser.parse_args()
+
+    drone_urls = list(args.drone_urls)
+    if args.ports is not None:
+        first, last = (int(port) for port in args.ports.split("-"))
+        drone_urls += ["%s:%d" % (args.host, port) for port in range(first, last + 1)]
+
+    print("Running %d drone main loops as greenlets." % (len(drone_urls),))
+    phases = [tick_phase(drone_url, simulate.LOOP_TIME) for drone_url in drone_urls]
+    print("Controller request rate:", rate_smoothness(phases, simulate.LOOP_TIME, jitter=TICK_JITTER))
+    run_drones(drone_urls, args.init)
@@ -0,0 +1,71 @@
+"""Headless fleet simulation on a simulated clock, without any drone server."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import argparse
+import copy
+import time
+import numpy as np
+from flock_drone.settings import DRONE_DEFAULT
+from flock_drone.mechanics.clock import SimClock
+from flock_drone.mechanics.distance import gen_square_path, gen_pos_limits_from_square_path
+from flock_drone.mechanics.fleet import Fleet, STATUSES
+from flock_drone.mechanics.scheduler import TickScheduler
+from flock_drone.mechanics.local_log import configure
+
+# Same loop time as simulate.py, in simulated seconds.
+LOOP_TIME = 15
+
+
+def gen_fleet(drones, home, seed=None):
+    """Generate a fleet of default drones starting at home."""
+    drone = copy.deepcopy(DRONE_DEFAULT)
+    drone["State"]["Position"] = ",".join(map(str, home))
+    bounds = gen_pos_limits_from_square_path(gen_square_path(home, 10))
+    return Fleet([drone] * drones, bounds, seed)
+
+
+def run(fleet, duration, home, speedup=0, loop_time=LOOP_TIME):
+    """Step fleet every loop_time simulated seconds for duration simulated seconds.
+
+    Return a summary of the run.
+    """
+    clock = SimClock(speedup)
+    summary = {"Anomalies": 0}
+
+    def tick():
+        summary["Anomalies"] += int(fleet.step(loop_time, home).sum())
+
+    scheduler = TickScheduler(tick, loop_time, clock=clock)
+    start = time.monotonic()
+    scheduler.run(until=clock.now() + duration)
+
+    summary["WallTime"] = time.monotonic() - start
+    summary["SimulatedTime"] = scheduler.stats["Ticks"] * loop_time
+    summary["Ticks"] = scheduler.stats["Ticks"]
+    summary["Statuses"] = {status: int(np.sum(fleet.statuses == i))
+                           for i, status in enumerate(STATUSES)}
+    return summary
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drones", type=int, default=1000)
+    parser.add_argument("--hours", type=float, default=1.0,
+                        help="simulated hours of flight")
+    parser.add_argument("--speedup", type=float, default=0,
+                        help="simulated seconds per real second, 0 for as fast as possible")
+    parser.add_argument("--home", default="0,0", help="controller location")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    home = tuple(float(a) for a in args.home.split(","))
+    fleet = gen_fleet(args.drones, home, args.seed)
+    print(run(fleet, args.hours * 3600, home, args.speedup))
@@ -0,0 +1,247 @@
+"""Local append-only journal of the drone tick events.
+
+Each tick the commands executed, state transitions, anomalies and datastream
+samples are appended to the journal of the drone as binary records: a header with the
+length and CRC32 of the payload, the time and the kind of the event,
+followed by the event encoded as JSON. Journals are read back through mmap,
+stopping at the first torn record left by a crash. Once the journal reaches
+JOURNAL_MAX_BYTES it is moved to <path>.1, replacing the previous one.
+
+Every drone has its own journal, JOURNAL_PATH suffixed with its drone server,
+e.g. events-localhost_8081.fdj, as a journal has a single writer.
+
+    python journal.py [--drone-url URL] [--kind Anomaly] [--drone 1] [--since T] [--count]
+
+prints the events, oldest first, as JSON lines.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import argparse
+import mmap
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from flock_drone.settings import JOURNAL_PATH, JOURNAL_MAX_BYTES, DRONE_URL
+from flock_drone.mechanics.codec import dumps, loads
+from flock_drone.mechanics.core import SEND_ANOMALY, UPDATE_ANOMALY_AT_CONTROLLER, SEND_DATASTREAM
+from flock_drone.mechanics.local_log import get_logger, configure
+
+LOGGER = get_logger(__name__)
+
+MAGIC = b"FDJ1"
+# Payload length, payload CRC32, time and kind of a record.
+RECORD = struct.Struct("<IIdB")
+
+COMMAND = "Command"
+STATE = "State"
+ANOMALY = "Anomaly"
+DATASTREAM = "Datastream"
+KINDS = [COMMAND, STATE, ANOMALY, DATASTREAM]
+KIND_CODES = dict((kind, code) for code, kind in enumerate(KINDS))
+
+
+def drone_key(drone_url):
+    """Return a file name safe key for the drone served at drone_url."""
+    return re.sub(r"[^\w.-]", "_", drone_url.split("://")[-1].strip("/"))
+
+
+def journal_path(drone_url, path=JOURNAL_PATH):
+    """Return the path of the journal of the drone served at drone_url."""
+    base, extension = os.path.splitext(path)
+    return "%s-%s%s" % (base, drone_key(drone_url), extension)
+
+
+def gen_Event(kind, timestamp, event):
+    """Generate an event read from the journal."""
+    entry = {
+        "Kind": kind,
+        "Time": timestamp,
+        "Event": event,
+    }
+    return entry
+
+
+def gen_StateTransition(drone_id, before, after):
+    """Generate the event of a drone status change."""
+    transition = {
+        "DroneID": drone_id,
+        "From": before["Status"],
+        "To": after["Status"],
+        "Position": after["Position"],
+        "Battery": after["Battery"],
+    }
+    return transition
+
+
+def tick_events(drone, new_drone, inputs, effects):
+    """Return the (kind, event) pairs of a tick, from step() inputs and results."""
+    events = []
+    if inputs["Command"] is not None and inputs["CommandIDs"]:
+        events.append((COMMAND, inputs["Command"]))
+    if drone["State"]["Status"] != new_drone["State"]["Status"]:
+        events.append((STATE, gen_StateTransition(
+            new_drone["DroneID"], drone["State"], new_drone["State"])))
+    for effect in effects:
+        if effect.kind in (SEND_ANOMALY, UPDATE_ANOMALY_AT_CONTROLLER):
+            events.append((ANOMALY, effect.args[0]))
+        elif effect.kind == SEND_DATASTREAM:
+            events.append((DATASTREAM, effect.args[0]))
+    return events
+
+
+class Journal(object):
+    """Append events to the journal at path, rotating it at max_bytes."""
+
+    def __init__(self, path, max_bytes=JOURNAL_MAX_BYTES, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Open the journal for appending, writing the header of a new one."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._file.write(MAGIC)
+            self._size = len(MAGIC)
+
+    def rotate(self):
+        """Move the journal to path.1 and start a new one."""
+        self._file.close()
+        os.replace(self.path, self.path + ".1")
+        self.open()
+
+    def append(self, kind, event, timestamp=None):
+        """Append an event of kind to the journal."""
+        payload = dumps(event)
+        record = RECORD.pack(len(payload), zlib.crc32(payload),
+                             self.clock() if timestamp is None else timestamp,
+                             KIND_CODES[kind]) + payload
+        with self._lock:
+            if self._file is None:
+                self.open()
+            if self._size > len(MAGIC) and self._size + len(record) > self.max_bytes:
+                self.rotate()
+            self._file.write(record)
+            # A crash loses at most the record being written.
+            self._file.flush()
+            self._size += len(record)
+
+    def record_tick(self, drone, new_drone, inputs, effects):
+        """Append the events of a tick, the drone loop never fails because of the journal."""
+        try:
+            timestamp = self.clock()
+            for kind, event in tick_events(drone, new_drone, inputs, effects):
+                self.append(kind, event, timestamp)
+        except Exception as e:
+            LOGGER.warning("record_tick failed: %s", e)
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_journal(path):
+    """Yield the events of the journal at path, oldest first."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError("%s is not a drone journal" % (path,))
+            offset = len(MAGIC)
+            while offset + RECORD.size <= size:
+                length, crc, timestamp, code = RECORD.unpack_from(data, offset)
+                start = offset + RECORD.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc or code >= len(KINDS):
+                    LOGGER.warning("Torn record at offset %d of %s", offset, path)
+                    return
+                yield gen_Event(KINDS[code], timestamp, loads(payload))
+                offset = start + length
+
+
+def query(path, kinds=None, drone_id=None, since=None, until=None):
+    """Yield the events of the journal at path and its rotated part matching the filters."""
+    for part in (path + ".1", path):
+        for entry in read_journal(part):
+            if kinds and entry["Kind"] not in kinds:
+                continue
+            if since is not None and entry["Time"] < since:
+                continue
+            if until is not None and entry["Time"] >= until:
+                continue
+            if drone_id is not None and str(entry["Event"].get("DroneID")) != str(drone_id):
+                continue
+            yield entry
+
+
+# Journals of the drones run by this process, by drone server URL.
+JOURNALS = dict()
+_journals_lock = threading.Lock()
+
+
+def get_journal(drone_url):
+    """Return the journal of the drone served at drone_url, None when JOURNAL_PATH is not set."""
+    if not JOURNAL_PATH:
+        return None
+    with _journals_lock:
+        if drone_url not in JOURNALS:
+            JOURNALS[drone_url] = Journal(journal_path(drone_url))
+        return JOURNALS[drone_url]
+
+
+def record_tick(drone_url, drone, new_drone, inputs, effects):
+    """Append the events of a tick to the journal of the drone served at drone_url."""
+    journal = get_journal(drone_url)
+    if journal is not None:
+        journal.record_tick(drone, new_drone, inputs, effects)
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description="Query the drone event journal.")
+    parser.add_argument("path", nargs="?", default=None,
+                        help="journal file, defaults to the journal of --drone-url in JOURNAL_PATH")
+    parser.add_argument("--drone-url", default=DRONE_URL)
+    parser.add_argument("--kind", action="append", choices=KINDS)
+    parser.add_argument("--drone", default=None, help="only the events of this DroneID")
+    parser.add_argument("--since", type=float, default=None, help="unix time")
+    parser.add_argument("--until", type=float, default=None, help="unix time")
+    parser.add_argument("--count", action="store_true", help="print the number of events by kind")
+    args = parser.parse_args()
+
+    if args.path is None and not JOURNAL_PATH:
+        parser.error("JOURNAL_PATH is not set, give the journal file")
+    path = args.path or journal_path(args.drone_url)
+    events = query(path, args.kind, args.drone, args.since, args.until)
+    if args.count:
+        print(dict(Counter(entry["Kind"] for entry in events)))
+    else:
+        out = sys.stdout.buffer
+        for entry in events:
+            out.write(dumps(entry) + b"\n")
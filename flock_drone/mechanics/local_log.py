@@ -0,0 +1,135 @@
+"""Structured, level gated local logging of the drone mechanics.
+
+Records of the "flock_drone" loggers are formatted by the calling thread,
+put in a bounded queue and written by a background thread, so a slow stdout
+or log collector never blocks the drone loop. Records below LOCAL_LOG_LEVEL
+are discarded by the logger before being formatted. Fields passed with
+    logger.info("event", extra=fields(key=value))
+are written after the message as key=value pairs, or as JSON objects when
+LOCAL_LOG_FORMAT is "json".
+
+Importing the module starts no thread, the entry points call configure()
+once gevent patched the stdlib, if they run with it. Until then records
+go to the logging defaults, warnings and errors to stderr.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from flock_drone.settings import LOCAL_LOG_LEVEL, LOCAL_LOG_FORMAT, LOCAL_LOG_QUEUE_SIZE
+
+ROOT = "flock_drone"
+
+# Listener of the configured queue handler.
+LISTENER = None
+_lock = threading.Lock()
+
+
+def get_logger(name):
+    """Return the logger of a mechanics module, name being its __name__."""
+    return logging.getLogger("%s.%s" % (ROOT, name.rsplit(".", 1)[-1]))
+
+
+def fields(**kwargs):
+    """Return the extra argument of a logging call with structured fields."""
+    return {"fields": kwargs}
+
+
+class TextFormatter(logging.Formatter):
+    """Format records as "time level logger message key=value ..."."""
+
+    def __init__(self):
+        super(TextFormatter, self).__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        line = super(TextFormatter, self).format(record)
+        for key, value in getattr(record, "fields", {}).items():
+            line += " %s=%s" % (key, json.dumps(value, default=str))
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "Time": record.created,
+            "Level": record.levelname,
+            "Logger": record.name,
+            "Message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["Exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+FORMATTERS = {
+    "text": TextFormatter,
+    "json": JsonFormatter,
+}
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without ever blocking, counting those dropped when the queue is full."""
+
+    def __init__(self, queue_):
+        super(DroppingQueueHandler, self).__init__(queue_)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure(level=LOCAL_LOG_LEVEL, format_=LOCAL_LOG_FORMAT, max_queue=LOCAL_LOG_QUEUE_SIZE,
+              stream=None):
+    """Send the flock_drone records through a queue to stream, replacing a previous setup."""
+    global LISTENER
+    with _lock:
+        _stop()
+        logger = logging.getLogger(ROOT)
+        # Records are formatted before being queued, the fields may be changed afterwards.
+        handler = DroppingQueueHandler(queue.Queue(max_queue))
+        handler.setFormatter(FORMATTERS[format_]())
+        output = logging.StreamHandler(stream or sys.stdout)
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+        LISTENER = logging.handlers.QueueListener(handler.queue, output)
+        LISTENER.start()
+        return handler
+
+
+def _stop():
+    """Write the queued records, stop the listener and remove its handler, the caller holds the lock."""
+    global LISTENER
+    if LISTENER is not None:
+        LISTENER.stop()
+        LISTENER = None
+    logger = logging.getLogger(ROOT)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.propagate = True
+
+
+def shutdown():
+    """Write the queued records and stop the listener."""
+    with _lock:
+        _stop()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,107 @@
+"""Aggregation and sampling of the HttpApiLog records.
+
+Identical (Subject, Predicate, Object) triples are counted over a window of
+HTTP_API_LOG_WINDOW seconds and shipped as one unchanged record per triple.
+The HttpApiLog class of the controller has no field for a count, the counts
+of a window are written to the local logs instead. Predicates listed in
+HTTP_API_LOG_SAMPLING are only kept with the given probability, each kept
+record then counting for 1 / probability records so the counts still
+estimate the traffic. A window is shipped by the first add() after its end,
+or by expired(), which the log shipper polls.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from flock_drone.settings import HTTP_API_LOG_WINDOW, HTTP_API_LOG_SAMPLING
+from flock_drone.mechanics.objects import gen_HttpApiLog
+from flock_drone.mechanics.local_log import get_logger, fields
+
+LOGGER = get_logger(__name__)
+
+
+def gen_AggregatorStats():
+    """Generate empty HttpApiLog aggregator statistics."""
+    stats = {
+        "Received": 0,
+        "SampledOut": 0,
+        "Aggregated": 0,
+        "Shipped": 0,
+    }
+    return stats
+
+
+def summarize(triple):
+    """Generate the record of a triple."""
+    subject, predicate, object_ = triple
+    return gen_HttpApiLog(subject, predicate, object_)
+
+
+class HttpApiLogAggregator(object):
+    """Count HttpApiLog triples over windows, after sampling them by predicate."""
+
+    def __init__(self, window=HTTP_API_LOG_WINDOW, sampling=HTTP_API_LOG_SAMPLING,
+                 clock=time.monotonic, rand=random.random):
+        self.window = window
+        self.sampling = sampling
+        self.clock = clock
+        self.rand = rand
+        self.stats = gen_AggregatorStats()
+        self._counts = OrderedDict()
+        self._window_end = None
+        self._lock = threading.Lock()
+
+    def add(self, http_api_log):
+        """Account for a record, return the records to ship now."""
+        triple = (http_api_log["Subject"], http_api_log["Predicate"], http_api_log["Object"])
+        rate = self.sampling.get(triple[1], 1.0)
+        with self._lock:
+            self.stats["Received"] += 1
+            if rate < 1.0 and self.rand() >= rate:
+                self.stats["SampledOut"] += 1
+                return self._expired()
+            if not self.window:
+                self.stats["Shipped"] += 1
+                return [summarize(triple)]
+            if self._window_end is None:
+                self._window_end = self.clock() + self.window
+            if triple in self._counts:
+                self.stats["Aggregated"] += 1
+            self._counts[triple] = self._counts.get(triple, 0.0) + 1.0 / rate
+            return self._expired()
+
+    def expired(self):
+        """Return the records of the window if it is over, ending it."""
+        with self._lock:
+            return self._expired()
+
+    def _expired(self):
+        """Drain the window if it is over, the caller holds the lock."""
+        if self._window_end is None or self.clock() < self._window_end:
+            return []
+        return self._drain()
+
+    def _drain(self):
+        """Return the records of the window and start a new one, the caller holds the lock."""
+        records = [summarize(triple) for triple in self._counts]
+        for (subject, predicate, object_), count in self._counts.items():
+            LOGGER.debug("HttpApiLog window", extra=fields(
+                Subject=subject, Predicate=predicate, Object=object_, Count=int(round(count))))
+        self._counts = OrderedDict()
+        self._window_end = None
+        self.stats["Shipped"] += len(records)
+        return records
+
+    def flush(self):
+        """Return the records of the current window, ending it."""
+        with self._lock:
+            return self._drain()
@@ -0,0 +1,167 @@
+"""Background shipper of the drone logs to the controller.
+
+Logs are put in a bounded queue and sent by a background thread in batches,
+when LOG_BATCH_SIZE logs are waiting or LOG_FLUSH_INTERVAL seconds after the
+first of them was queued. Logs submitted while the queue is full are dropped,
+counted and reported by the thread in a warning per LOG_FLUSH_INTERVAL at most. The controller takes one log per request, batches are sent one
+after the other on the kept alive connections of the transport. Every
+LOG_FLUSH_INTERVAL seconds at most the thread also queues the logs returned
+by poll, e.g. the HttpApiLog aggregation windows which are over.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import queue
+import threading
+import time
+from flock_drone.settings import LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+def gen_ShipperStats():
+    """Generate empty log shipper statistics."""
+    stats = {
+        "Queued": 0,
+        "Sent": 0,
+        "Failed": 0,
+        "Dropped": 0,
+        "Batches": 0,
+    }
+    return stats
+
+
+class LogShipper(object):
+    """Send logs submitted by kind through senders[kind] from a background thread.
+
+    poll, if given, returns a list of (kind, log) to submit.
+    """
+
+    def __init__(self, senders, max_queue=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, poll=None):
+        self.senders = senders
+        self.poll = poll
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = dict((kind, gen_ShipperStats()) for kind in senders)
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._reported = dict((kind, 0) for kind in senders)
+
+    def count(self, kind, key, value=1):
+        """Add value to the statistic key of kind."""
+        with self._lock:
+            self.stats[kind][key] += value
+
+    def start(self):
+        """Start the background thread, once."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="log-shipper", daemon=True)
+                self._thread.start()
+
+    def submit(self, kind, log):
+        """Queue a log for sending, return False if it was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait((kind, log))
+        except queue.Full:
+            self.count(kind, "Dropped")
+            return False
+        self.count(kind, "Queued")
+        return True
+
+    def next_batch(self):
+        """Wait for the next batch of logs, empty if none came within flush_interval."""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if deadline is None:
+                timeout = self.flush_interval
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Put by stop() to wake the thread up.
+                self._queue.task_done()
+                break
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(item)
+        return batch
+
+    def send_batch(self, batch):
+        """Send a batch of logs, oldest first."""
+        for kind, log in batch:
+            try:
+                result = self.senders[kind](log)
+            except Exception as e:
+                LOGGER.warning("send_batch failed: %s", e)
+                result = None
+            self.count(kind, "Sent" if result is not None else "Failed")
+        for kind in set(kind for kind, _ in batch):
+            self.count(kind, "Batches")
+
+    def submit_polled(self):
+        """Submit the logs returned by poll."""
+        if self.poll is None:
+            return
+        try:
+            for kind, log in self.poll():
+                self.submit(kind, log)
+        except Exception as e:
+            LOGGER.warning("submit_polled failed: %s", e)
+
+    def report_dropped(self):
+        """Log the logs dropped since the last report."""
+        with self._lock:
+            dropped = dict((kind, stats["Dropped"] - self._reported[kind])
+                           for kind, stats in self.stats.items())
+            self._reported = dict((kind, stats["Dropped"]) for kind, stats in self.stats.items())
+        for kind, count in dropped.items():
+            if count:
+                LOGGER.warning("Dropped %d %s, the log queue is full", count, kind)
+
+    def run(self):
+        """Send batches until stopped and the queue is empty."""
+        while True:
+            self.report_dropped()
+            self.submit_polled()
+            batch = self.next_batch()
+            if batch:
+                self.send_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+            elif self._stopped.is_set() and self._queue.empty():
+                return
+
+    def flush(self):
+        """Wait until every queued log was sent."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self, timeout=None):
+        """Send the queued logs and stop the background thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            try:
+                # Wake up the thread if it waits for logs.
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self.report_dropped()
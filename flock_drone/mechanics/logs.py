@@ -8,62 +8,102 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-from flock_drone.settings import CENTRAL_SERVER_NAMESPACE, IRI_CS
-from hydra import SCHEMA, Resource
+import atexit
+from flock_drone.settings import CENTRAL_SERVER_NAMESPACE, IRI_CS, LOG_SHIPPING
+from flock_drone.mechanics.objects import gen_DroneLog, gen_HttpApiLog
+from flock_drone.mechanics.budget import non_critical
+from flock_drone.mechanics.log_shipper import LogShipper
+from flock_drone.mechanics.log_aggregator import HttpApiLogAggregator
+from flock_drone.mechanics.resources import get_resource, find_operation
+from hydra import SCHEMA
 from rdflib import Namespace
+from flock_drone.mechanics.local_log import get_logger
 
-CENTRAL_SERVER = Namespace(CENTRAL_SERVER_NAMESPACE)
-RES_CS = Resource.from_iri(IRI_CS)
-
-
-def gen_DroneLog(drone_id, log_string):
-    """Generate a Drone log object from log string."""
-    dronelog = {
-        "@type": "DroneLog",
-        "DroneID": drone_id,
-        "LogString": log_string
-    }
-    return dronelog
-
+LOGGER = get_logger(__name__)
 
-def gen_HttpApiLog(source, action, target):
-    """Generate a Http Api Log object from action and target."""
-    httpapilog = {
-        "@type": "HttpApiLog",
-        "Subject": source,
-        "Predicate": action,
-        "Object": target
-    }
-    return httpapilog
+CENTRAL_SERVER = Namespace(CENTRAL_SERVER_NAMESPACE)
+RES_CS = get_resource(IRI_CS)
 
 
-def send_dronelog(dronelog):
+def post_dronelog(dronelog):
     """Post the drone log to the central server."""
     try:
-        post_dronelog = RES_CS.find_suitable_operation(
-            SCHEMA.AddAction, CENTRAL_SERVER.DroneLog)
-        resp, body = post_dronelog(dronelog)
+        post_dronelog_ = find_operation(
+            RES_CS, SCHEMA.AddAction, CENTRAL_SERVER.DroneLog)
+        resp, body = post_dronelog_(dronelog)
 
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        new_dronelog = Resource.from_iri(resp['location'])
-        print("Drone Log successfully.")
-        return new_dronelog
+        LOGGER.debug("Drone Log posted successfully.")
+        # Only the location, fetching the new log would cost another request.
+        return resp['location']
     except Exception as e:
-        print(e)
+        LOGGER.warning("post_dronelog failed: %s", e)
         return None
 
 
-def send_http_api_log(http_api_log):
+def post_http_api_log(http_api_log):
     """Post the drone http Api Log to the central server."""
     try:
-        post_http_api_log = RES_CS.find_suitable_operation(
-            SCHEMA.AddAction, CENTRAL_SERVER.HttpApiLog)
-        resp, body = post_http_api_log(http_api_log)
+        post_http_api_log_ = find_operation(
+            RES_CS, SCHEMA.AddAction, CENTRAL_SERVER.HttpApiLog)
+        resp, body = post_http_api_log_(http_api_log)
 
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        new_http_api_log = Resource.from_iri(resp['location'])
-        print("Http Api Log posted successfully.")
-        return new_http_api_log
+        LOGGER.debug("Http Api Log posted successfully.")
+        return resp['location']
     except Exception as e:
-        print(e)
+        LOGGER.warning("post_http_api_log failed: %s", e)
         return None
+
+
+def expired_http_api_logs():
+    """Return the records of the HttpApiLog aggregation window if it is over."""
+    return [("HttpApiLog", http_api_log) for http_api_log in AGGREGATOR.expired()]
+
+
+AGGREGATOR = HttpApiLogAggregator()
+SHIPPER = LogShipper({"DroneLog": post_dronelog, "HttpApiLog": post_http_api_log},
+                     poll=expired_http_api_logs)
+
+
+def ship_http_api_log(http_api_log):
+    """Send an aggregated http Api Log, through the log shipper if LOG_SHIPPING is set."""
+    if LOG_SHIPPING:
+        SHIPPER.submit("HttpApiLog", http_api_log)
+        return None
+    return post_http_api_log(http_api_log)
+
+
+def flush_logs():
+    """Send the current aggregation window and every queued log, and log their statistics."""
+    for http_api_log in AGGREGATOR.flush():
+        ship_http_api_log(http_api_log)
+    SHIPPER.stop()
+    if any(stats["Queued"] or stats["Dropped"] for stats in SHIPPER.stats.values()):
+        LOGGER.info("Log shipper stats: %s", SHIPPER.stats)
+    if AGGREGATOR.stats["Received"]:
+        LOGGER.info("HttpApiLog aggregator stats: %s", AGGREGATOR.stats)
+
+
+atexit.register(flush_logs)
+
+
+@non_critical
+def send_dronelog(dronelog):
+    """Send the drone log to the central server, through the log shipper if LOG_SHIPPING is set."""
+    if LOG_SHIPPING:
+        SHIPPER.submit("DroneLog", dronelog)
+        return None
+    return post_dronelog(dronelog)
+
+
+@non_critical
+def send_http_api_log(http_api_log):
+    """Send the http Api Log to the central server, aggregated and sampled by AGGREGATOR."""
+    if LOG_SHIPPING:
+        # The shipper ships the window once it is over.
+        SHIPPER.start()
+    result = None
+    for record in AGGREGATOR.add(http_api_log):
+        result = ship_http_api_log(record)
+    return result
@@ -8,24 +8,58 @@ parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
 superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
-import json
-from hydra import Resource, SCHEMA
+from hydra import SCHEMA
 from rdflib import Namespace
 
 from flock_drone.settings import CENTRAL_SERVER_NAMESPACE, DRONE_NAMESPACE
-from flock_drone.settings import CENTRAL_SERVER_URL
+from flock_drone.settings import CENTRAL_SERVER_URL, DRONE_URL, API_NAME
 from flock_drone.settings import IRI_CS, IRI_DRONE, DRONE_DEFAULT
 import pdb
+import threading
 import time
 
 from flock_drone.mechanics.logs import send_http_api_log, gen_HttpApiLog
+from flock_drone.mechanics.tick_cache import cached, invalidates
+from flock_drone.mechanics.resources import get_resource, find_operation
+from flock_drone.mechanics.codec import decode
+from flock_drone.mechanics.core import UPDATE_DRONE_AT_CONTROLLER
+from flock_drone.mechanics.spool import spool_message, message_sent
+from flock_drone.mechanics.transport import check_response
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
 
 global CENTRAL_SERVER, DRONE, RES_CS, RES_DRONE
 CENTRAL_SERVER = Namespace(CENTRAL_SERVER_NAMESPACE)
 DRONE = Namespace(DRONE_NAMESPACE)
 
-RES_CS = Resource.from_iri(IRI_CS)
-RES_DRONE = Resource.from_iri(IRI_DRONE)
+RES_CS = get_resource(IRI_CS)
+RES_DRONE = get_resource(IRI_DRONE)
+
+# Drone server used by the current thread, or greenlet once gevent has patched threading.
+_endpoint = threading.local()
+
+
+def use_drone_endpoint(drone_url):
+    """Send the drone server requests of the current thread to the server at drone_url."""
+    _endpoint.url = drone_url
+    _endpoint.namespace = Namespace("%s/%s/vocab#" % (drone_url, API_NAME))
+    _endpoint.resource = get_resource("%s/%s" % (drone_url, API_NAME))
+
+
+def get_drone_url():
+    """Return the URL of the drone server used by the current thread."""
+    return getattr(_endpoint, "url", DRONE_URL)
+
+
+def get_drone_namespace():
+    """Return the vocab namespace of the drone server used by the current thread."""
+    return getattr(_endpoint, "namespace", DRONE)
+
+
+def get_drone_resource():
+    """Return the entrypoint resource of the drone server used by the current thread."""
+    return getattr(_endpoint, "resource", RES_DRONE)
 
 
 def get_drone_default():
@@ -33,52 +67,52 @@ def get_drone_default():
     return DRONE_DEFAULT
 
 
+@cached
 def get_drone():
     """Get the drone object from drone server."""
     try:
-        get_drone_ = RES_DRONE.find_suitable_operation(operation_type=None, input_type=None,
-                                                       output_type=DRONE.Drone)
+        get_drone_ = find_operation(
+            get_drone_resource(),
+            operation_type=None, input_type=None, output_type=get_drone_namespace().Drone)
         resp, body = get_drone_()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        drone = json.loads(body.decode('utf-8'))
-        drone.pop("@id", None)
-        drone.pop("@context", None)
+        drone = decode(body)
         return drone
     except Exception as e:
-        print(e)
+        LOGGER.warning("get_drone failed: %s", e)
         return None
 
 
+@cached
 def get_controller_location():
     """Get the controller location from central server."""
     try:
-        get_controller_location_ = RES_CS.find_suitable_operation(operation_type=None,
-                                                                  input_type=None,
-                                                                  output_type=CENTRAL_SERVER.Location)
+        get_controller_location_ = find_operation(RES_CS, operation_type=None,
+                                                  input_type=None,
+                                                  output_type=CENTRAL_SERVER.Location)
         resp, body = get_controller_location_()
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
-        location_obj = json.loads(body.decode('utf-8'))
-        location_obj.pop("@context")
-        location_obj.pop("@type")
+        location_obj = decode(body, strip=("@context", "@type"))
         return location_obj
     except Exception as e:
-        print(e)
-        print("Failed to use controller location, using default")
+        LOGGER.warning("Failed to use controller location, using default: %s", e)
         return "0,0"
 
 
+@invalidates("get_drone")
 def update_drone(drone):
     """Update the drone object on drone server."""
     drone_identifier = drone["DroneID"]
     try:
-        update_drone_ = RES_DRONE.find_suitable_operation(operation_type=SCHEMA.UpdateAction,
-                                                          input_type=DRONE.Drone)
+        update_drone_ = find_operation(
+            get_drone_resource(),
+            operation_type=SCHEMA.UpdateAction, input_type=get_drone_namespace().Drone)
         resp, body = update_drone_(drone)
         assert resp.status in [200, 201], "%s %s" % (resp.status, resp.reason)
 
-        return Resource.from_iri(resp['location'])
+        return get_resource(resp['location'])
     except Exception as e:
-        print(e)
+        LOGGER.warning("update_drone failed: %s", e)
         return None
 
     http_api_log = gen_HttpApiLog("Drone %s" % (
@@ -86,26 +120,32 @@ def update_drone(drone):
     send_http_api_log(http_api_log)
 
 
-def update_drone_at_controller(drone, drone_identifier):
-    """Update the drone object at central controller."""
+def put_drone_at_controller(drone, drone_identifier):
+    """Update the drone object at central controller, raise if the update failed."""
     id_ = "/api/DroneCollection/" + str(drone_identifier)
-    try:
-        print("Updating drone")
-        RES = Resource.from_iri(CENTRAL_SERVER_URL + id_)
-        operation = RES.find_suitable_operation(
-            operation_type=SCHEMA.UpdateAction, input_type=CENTRAL_SERVER.Drone)
-        assert operation is not None
-        resp, body = operation(drone)
-        assert resp.status in [200, 201]
-    except Exception as e:
-        print(e)
-        return None
+    LOGGER.debug("Updating drone")
+    RES = get_resource(CENTRAL_SERVER_URL + id_)
+    operation = find_operation(
+        RES, operation_type=SCHEMA.UpdateAction, input_type=CENTRAL_SERVER.Drone)
+    assert operation is not None
+    resp, body = operation(drone)
+    check_response(resp)
 
     http_api_log = gen_HttpApiLog("Drone %s" % (
         str(drone_identifier)), "POST Drone", "Controller")
     send_http_api_log(http_api_log)
 
 
+def update_drone_at_controller(drone, drone_identifier):
+    """Update the drone object at central controller, spooling it if the update failed."""
+    try:
+        put_drone_at_controller(drone, drone_identifier)
+    except Exception as e:
+        spool_message(get_drone_url(), UPDATE_DRONE_AT_CONTROLLER, (drone, drone_identifier), e)
+        return None
+    message_sent(get_drone_url(), UPDATE_DRONE_AT_CONTROLLER, (drone, drone_identifier))
+
+
 def ordered(obj):
     """Sort json dicts and lists within."""
     if isinstance(obj, dict):
@@ -0,0 +1,66 @@
+"""Generate the objects sent by the drone, without connecting to any server."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+
+def gen_DroneLog(drone_id, log_string):
+    """Generate a Drone log object from log string."""
+    dronelog = {
+        "@type": "DroneLog",
+        "DroneID": drone_id,
+        "LogString": log_string
+    }
+    return dronelog
+
+
+def gen_HttpApiLog(source, action, target):
+    """Generate a Http Api Log object from action and target."""
+    httpapilog = {
+        "@type": "HttpApiLog",
+        "Subject": source,
+        "Predicate": action,
+        "Object": target
+    }
+    return httpapilog
+
+
+def gen_Anomaly(location, id_):
+    """Generate an anomaly object."""
+    anomaly = {
+        "@type": "Anomaly",
+        "Location": location,
+        "DroneID": id_,
+        "Status": "To be Confirmed",
+        "AnomalyID": "-1"
+    }
+
+    return anomaly
+
+
+def gen_Datastream(temperature, position, drone_id):
+    """Generate a datastream objects."""
+    datastream = {
+        "@type": "Datastream",
+        "Temperature": temperature,
+        "Position": position,
+        "DroneID": drone_id,
+    }
+
+    return datastream
+
+
+def gen_TickUpdate(drone, datastream):
+    """Generate a tick update object, the drone and its datastream sent together."""
+    tick_update = {
+        "@type": "TickUpdate",
+        "Drone": drone,
+        "Datastream": datastream,
+    }
+
+    return tick_update
@@ -0,0 +1,150 @@
+"""Serialize-once fan-out of objects to several servers.
+
+A Publisher encodes an object once and sends the encoded body to each of
+its subscribers concurrently, reporting the latency and failure of each
+target separately. DRONE_PUBLISHER sends the drone to the local drone
+server, the controller and the DRONE_MIRRORS with one serialization.
+The drone is posted to the hydrus URLs of the servers, their operations
+are not looked up in the API docs, enable it with PUBLISH_DRONE.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import contextvars
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from flock_drone.settings import CENTRAL_SERVER_URL, API_NAME, DRONE_MIRRORS, PUBLISH_WORKERS
+from flock_drone.mechanics.codec import dumps
+from flock_drone.mechanics.transport import current_transport
+
+HEADERS = {"Content-Type": "application/ld+json"}
+
+# A target of the publisher, request(obj, body, context) returns the (uri, method, body)
+# sent to it, body being obj encoded once for all targets.
+Subscriber = namedtuple("Subscriber", ["name", "request"])
+
+
+def gen_Delivery(target, status=None, latency=0.0, error=None):
+    """Generate the delivery report of a publication to one target."""
+    delivery = {
+        "Target": target,
+        "Status": status,
+        "Latency": latency,
+        "Error": error,
+    }
+    return delivery
+
+
+def gen_TargetStats():
+    """Generate empty statistics of a publisher target."""
+    stats = {
+        "Published": 0,
+        "Failed": 0,
+        "LastLatency": 0.0,
+        "MaxLatency": 0.0,
+        "TotalLatency": 0.0,
+        "LastError": None,
+    }
+    return stats
+
+
+class Publisher(object):
+    """Send an object encoded once to all subscribers concurrently."""
+
+    def __init__(self, subscribers=(), transport=None, encode=dumps, workers=PUBLISH_WORKERS):
+        self.subscribers = list(subscribers)
+        self.transport = transport
+        self.encode = encode
+        self.stats = dict()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, request):
+        """Add a target to the publisher."""
+        self.subscribers.append(Subscriber(name, request))
+
+    def deliver(self, subscriber, obj, body, context):
+        """Send body to one subscriber and return its delivery report."""
+        start = time.monotonic()
+        try:
+            uri, method, target_body = subscriber.request(obj, body, context)
+            transport = self.transport or current_transport()
+            resp, content = transport.request(uri, method, target_body, dict(HEADERS))
+            error = None if resp.status in [200, 201] else "%s %s" % (resp.status, resp.reason)
+            delivery = gen_Delivery(subscriber.name, resp.status, time.monotonic() - start, error)
+        except Exception as e:
+            delivery = gen_Delivery(subscriber.name, None, time.monotonic() - start, str(e))
+        self.record(delivery)
+        return delivery
+
+    def record(self, delivery):
+        """Add a delivery to the statistics of its target."""
+        with self._lock:
+            stats = self.stats.setdefault(delivery["Target"], gen_TargetStats())
+            stats["Published"] += 1
+            stats["LastLatency"] = delivery["Latency"]
+            stats["MaxLatency"] = max(stats["MaxLatency"], delivery["Latency"])
+            stats["TotalLatency"] += delivery["Latency"]
+            if delivery["Error"] is not None:
+                stats["Failed"] += 1
+                stats["LastError"] = delivery["Error"]
+
+    def publish(self, obj, context=None):
+        """Encode obj once and send it to every subscriber, return the deliveries by target.
+
+        context is passed to the subscribers along with obj.
+        """
+        body = self.encode(obj)
+        context = context or dict()
+        # Requests run in the caller context, they see the budget of its tick.
+        futures = [self._executor.submit(contextvars.copy_context().run,
+                                         self.deliver, subscriber, obj, body, context)
+                   for subscriber in self.subscribers]
+        deliveries = [future.result() for future in futures]
+        return dict((delivery["Target"], delivery) for delivery in deliveries)
+
+
+def splice_tick_update(drone_body, datastream_body):
+    """Build a TickUpdate body from the encoded drone and datastream, without re-encoding them."""
+    return (b'{"@type": "TickUpdate", "Drone": ' + drone_body +
+            b', "Datastream": ' + datastream_body + b'}')
+
+
+def local_drone(drone, body, context):
+    """Request updating the drone on its server, in a TickUpdate when there is a datastream."""
+    drone_url = context["DroneURL"]
+    datastream = context.get("Datastream")
+    if datastream is None:
+        return "%s/%s/Drone" % (drone_url, API_NAME), "POST", body
+    return ("%s/%s/TickUpdate" % (drone_url, API_NAME), "POST",
+            splice_tick_update(body, dumps(datastream)))
+
+
+def controller_drone(drone, body, context):
+    """Request updating the drone at the controller."""
+    return ("%s/%s/DroneCollection/%s" % (CENTRAL_SERVER_URL, API_NAME, drone["DroneID"]),
+            "POST", body)
+
+
+def gen_drone_publisher(mirrors=DRONE_MIRRORS):
+    """Build the publisher of the drone to its server, the controller and mirrors.
+
+    Publications need the DroneURL of the drone, and its Datastream if
+    it is sent to its server along with the drone, in their context.
+    """
+    publisher = Publisher([Subscriber("Local", local_drone),
+                           Subscriber("Controller", controller_drone)])
+    for mirror in mirrors:
+        publisher.subscribe(mirror, lambda drone, body, context, mirror=mirror: (mirror, "POST", body))
+    return publisher
+
+
+DRONE_PUBLISHER = gen_drone_publisher()
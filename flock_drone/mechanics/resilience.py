@@ -0,0 +1,210 @@
+"""Retries with backoff and circuit breakers for the requests to the controller.
+
+ResilientTransport wraps the transport of the controller requests. Failed
+requests are retried after a jittered exponential backoff, and each endpoint
+(the collection the request is made to) has a circuit breaker which opens
+after BREAKER_THRESHOLD consecutive failures. While it is open requests fail
+fast with CircuitOpenError, after BREAKER_RESET seconds one trial request is
+let through and closes the breaker again if it succeeds. A request counts as
+one failure for its breaker once all its attempts failed.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import http.client
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from flock_drone.settings import (RETRY_ATTEMPTS, RETRY_BACKOFF, RETRY_BACKOFF_MAX,
+                                  BREAKER_THRESHOLD, BREAKER_RESET, CONTROLLER_TIMEOUT)
+from flock_drone.mechanics.transport import Transport
+from flock_drone.mechanics.connections import PooledHttp, RETRY_METHODS
+from flock_drone.mechanics.budget import budget_exhausted
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "Closed", "Open", "HalfOpen"
+
+# Errors raised before the request could reach the server.
+CONNECT_ERRORS = (ConnectionRefusedError, http.client.CannotSendRequest)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request to an endpoint whose breaker is open."""
+    pass
+
+
+def gen_BreakerStats():
+    """Generate an empty circuit breaker statistics object."""
+    stats = {
+        "State": CLOSED,
+        "ConsecutiveFailures": 0,
+        "Failures": 0,
+        "Successes": 0,
+        "Retries": 0,
+        "Rejected": 0,
+        "Opened": 0,
+    }
+    return stats
+
+
+# Most severe state first.
+SEVERITY = [OPEN, HALF_OPEN, CLOSED]
+
+
+def aggregate_BreakerStats(stats_list):
+    """Combine the statistics of the breakers of an endpoint, adding counts and keeping the most severe state."""
+    stats = gen_BreakerStats()
+    for item in stats_list:
+        for key in ["Failures", "Successes", "Retries", "Rejected", "Opened"]:
+            stats[key] += item[key]
+        stats["ConsecutiveFailures"] = max(stats["ConsecutiveFailures"], item["ConsecutiveFailures"])
+        stats["State"] = min(stats["State"], item["State"], key=SEVERITY.index)
+    return stats
+
+
+class CircuitBreaker(object):
+    """Breaker of one endpoint."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset=BREAKER_RESET, clock=time.monotonic,
+                 name=None):
+        self.name = name
+        self.threshold = threshold
+        self.reset = reset
+        self.clock = clock
+        self.stats = gen_BreakerStats()
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Check if a request may be made, moving an expired open breaker to half open."""
+        with self._lock:
+            state = self.stats["State"]
+            if state == OPEN and self.clock() - self._opened_at >= self.reset:
+                self.stats["State"] = state = HALF_OPEN
+                self._trial = False
+            if state == CLOSED or (state == HALF_OPEN and not self._trial):
+                # Only one trial request at a time while half open.
+                self._trial = state == HALF_OPEN
+                return True
+            self.stats["Rejected"] += 1
+            return False
+
+    def success(self):
+        """Record a successful request, closing the breaker."""
+        with self._lock:
+            self.stats["Successes"] += 1
+            self.stats["ConsecutiveFailures"] = 0
+            if self.stats["State"] != CLOSED:
+                LOGGER.info("Circuit closed for %s: %s", self.name, self.stats)
+            self.stats["State"] = CLOSED
+            self._trial = False
+
+    def failure(self):
+        """Record a failed request, opening the breaker past the threshold."""
+        with self._lock:
+            self.stats["Failures"] += 1
+            self.stats["ConsecutiveFailures"] += 1
+            if (self.stats["State"] == HALF_OPEN or
+                    self.stats["ConsecutiveFailures"] >= self.threshold):
+                if self.stats["State"] != OPEN:
+                    self.stats["Opened"] += 1
+                    LOGGER.warning("Circuit open for %s: %s", self.name, self.stats)
+                self.stats["State"] = OPEN
+                self._opened_at = self.clock()
+            self._trial = False
+
+    def retried(self):
+        """Record a retried request."""
+        with self._lock:
+            self.stats["Retries"] += 1
+
+
+def backoff_delay(attempt, base=RETRY_BACKOFF, cap=RETRY_BACKOFF_MAX):
+    """Return the delay before retry attempt (from 0), with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def endpoint(uri):
+    """Return the endpoint of uri, the URL up to the collection the request is made to."""
+    parts = urlsplit(uri)
+    path = parts.path.rstrip("/").split("/")
+    # /api/Datastream/12 and /api/Datastream are the same endpoint.
+    return "%s://%s%s" % (parts.scheme, parts.netloc, "/".join(path[:3]))
+
+
+class ResilientTransport(Transport):
+    """Retry failed requests of transport and fail fast on endpoints with an open breaker."""
+
+    def __init__(self, transport, attempts=RETRY_ATTEMPTS, sleep=time.sleep):
+        self.transport = transport
+        self.attempts = attempts
+        self.sleep = sleep
+        self.breakers = dict()
+        self._lock = threading.Lock()
+
+    def breaker(self, uri):
+        """Return the breaker of the endpoint of uri."""
+        key = endpoint(uri)
+        with self._lock:
+            if key not in self.breakers:
+                self.breakers[key] = CircuitBreaker(name=key)
+            return self.breakers[key]
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        breaker = self.breaker(uri)
+        if not breaker.allow():
+            raise CircuitOpenError("Circuit open for %s" % endpoint(uri))
+        attempt = 0
+        while True:
+            try:
+                response, content = self.transport.request(uri, method, body, headers, **kwargs)
+            except Exception as e:
+                retry = isinstance(e, CONNECT_ERRORS) or method in RETRY_METHODS
+                if not retry or not self.retry(breaker, attempt):
+                    breaker.failure()
+                    raise
+            else:
+                if response.status < 500:
+                    breaker.success()
+                    return response, content
+                if method not in RETRY_METHODS or not self.retry(breaker, attempt):
+                    breaker.failure()
+                    return response, content
+            attempt += 1
+
+    def retry(self, breaker, attempt):
+        """Wait before retry attempt, return False when no retry is left."""
+        if attempt + 1 >= self.attempts or budget_exhausted():
+            return False
+        breaker.retried()
+        self.sleep(backoff_delay(attempt))
+        return True
+
+    def close(self):
+        """Release the resources held by the transport."""
+        self.transport.close()
+
+    def metrics(self):
+        """Return a copy of the breaker statistics by endpoint."""
+        with self._lock:
+            return dict((key, dict(breaker.stats)) for key, breaker in self.breakers.items())
+
+
+# Transport of the requests to the controller
+CONTROLLER_HTTP = ResilientTransport(PooledHttp(timeout=CONTROLLER_TIMEOUT))
+
+
+def breaker_metrics():
+    """Return the breaker statistics of the controller endpoints."""
+    return CONTROLLER_HTTP.metrics()
@@ -0,0 +1,68 @@
+"""Shared pool of hydra resources and of the operations found on them.
+
+Resource.from_iri() fetches and parses the resource and its API documentation,
+find_suitable_operation() searches the documentation. Both are done once per
+IRI and per (operation type, input type, output type) until invalidated.
+The resources, and so their operations, make their requests through the
+transport set by TRANSPORT, see mechanics/transport.py.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import threading
+from hydra import Resource
+from flock_drone.mechanics.transport import current_transport, use_transport
+
+_resources = dict()
+_operations = dict()
+_lock = threading.Lock()
+
+
+def set_transport(transport):
+    """Make the requests of the pooled resources through transport, dropping the pool."""
+    invalidate()
+    use_transport(transport)
+
+
+def get_resource(iri):
+    """Return the pooled resource at iri, fetching it the first time."""
+    resource = _resources.get(iri)
+    if resource is None:
+        resource = Resource.from_iri(iri, http=current_transport())
+        with _lock:
+            resource = _resources.setdefault(iri, resource)
+    return resource
+
+
+def find_operation(resource, operation_type=None, input_type=None, output_type=None):
+    """Return the memoized operation of resource for the given types, None if there is none."""
+    key = (str(resource.identifier), operation_type, input_type, output_type)
+    operation = _operations.get(key)
+    if operation is None:
+        operation = resource.find_suitable_operation(
+            operation_type=operation_type, input_type=input_type, output_type=output_type)
+        if operation is not None:
+            with _lock:
+                operation = _operations.setdefault(key, operation)
+    return operation
+
+
+def invalidate(iri=None):
+    """Drop the resource at iri and its operations, or everything if iri is None."""
+    with _lock:
+        if iri is None:
+            _resources.clear()
+            _operations.clear()
+            return
+        resource = _resources.pop(iri, None)
+        identifiers = set([iri])
+        if resource is not None:
+            identifiers.add(str(resource.identifier))
+        for key in [key for key in _operations if key[0] in identifiers]:
+            _operations.pop(key, None)
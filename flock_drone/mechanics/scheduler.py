@@ -0,0 +1,131 @@
+"""Fixed rate scheduler for the drone main loop."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import math
+import random
+import threading
+from flock_drone.mechanics.clock import WallClock
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+def gen_TickStats():
+    """Generate an empty tick statistics object."""
+    stats = {
+        "Ticks": 0,
+        "Overruns": 0,
+        "Skipped": 0,
+        "Missed": 0,
+        "LastDuration": 0.0,
+        "MaxDuration": 0.0,
+        "LastLateness": 0.0,
+        "MaxLateness": 0.0,
+    }
+    return stats
+
+
+def aggregate_TickStats(stats_list):
+    """Combine the statistics of several schedulers, adding counts and keeping maximums."""
+    stats = gen_TickStats()
+    for item in stats_list:
+        for key in ["Ticks", "Overruns", "Skipped", "Missed"]:
+            stats[key] += item[key]
+        for key in ["MaxDuration", "MaxLateness"]:
+            stats[key] = max(stats[key], item[key])
+    stats.pop("LastDuration")
+    stats.pop("LastLateness")
+    return stats
+
+
+class TickScheduler(object):
+    """Run tick every interval seconds on one long lived worker thread.
+
+    Deadlines are fixed at start + k * interval, so the period does not drift
+    by the time each tick takes. A tick never overlaps another one, a tick
+    started while one is running is skipped and deadlines missed by a tick
+    overrunning the interval are dropped, both are counted in stats.
+    Times are read from clock, which may run in simulated time.
+
+    The first deadline is phase seconds after the start, and each tick starts
+    up to jitter seconds after its deadline, without moving later deadlines.
+    """
+
+    def __init__(self, tick, interval, name="drone-tick", clock=None, phase=0.0, jitter=0.0):
+        self.tick = tick
+        self.interval = float(interval)
+        self.name = name
+        self.clock = clock or WallClock()
+        self.phase = float(phase)
+        self.jitter = float(jitter)
+        self.stats = gen_TickStats()
+        self._running = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def run_once(self, deadline=None):
+        """Run a single tick unless one is already running, return False if skipped."""
+        if not self._running.acquire(blocking=False):
+            self.stats["Skipped"] += 1
+            return False
+        try:
+            start = self.clock.now()
+            if deadline is not None:
+                lateness = max(0.0, start - deadline)
+                self.stats["LastLateness"] = lateness
+                self.stats["MaxLateness"] = max(self.stats["MaxLateness"], lateness)
+            try:
+                self.tick()
+            except Exception as e:
+                LOGGER.warning("run_once failed: %s", e)
+            duration = self.clock.now() - start
+            self.stats["Ticks"] += 1
+            self.stats["LastDuration"] = duration
+            self.stats["MaxDuration"] = max(self.stats["MaxDuration"], duration)
+            if duration > self.interval:
+                self.stats["Overruns"] += 1
+            return True
+        finally:
+            self._running.release()
+
+    def run(self, until=None):
+        """Run ticks on fixed rate deadlines in the current thread until stopped.
+
+        If until is given, stop once the clock reaches it.
+        """
+        deadline = self.clock.now() + self.phase
+        while not self._stopped.is_set():
+            if until is not None and deadline >= until:
+                break
+            start = deadline + random.uniform(0, self.jitter) if self.jitter else deadline
+            if self.clock.wait(start - self.clock.now(), self._stopped):
+                break
+            self.run_once(start)
+            deadline += self.interval
+            now = self.clock.now()
+            if now > deadline:
+                # The tick overran, skip the deadlines already missed.
+                missed = int(math.ceil((now - deadline) / self.interval))
+                self.stats["Missed"] += missed
+                deadline += missed * self.interval
+
+    def start(self):
+        """Start the worker thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self.run, name=self.name)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        """Stop the worker thread after the running tick has finished."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,160 @@
+"""Run the main loop of a large fleet split into one shard of drones per core.
+
+Each shard is a process running its drones as greenlets (mechanics/greenlets.py)
+and reporting its tick and controller breaker statistics to the parent, which
+aggregates them.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import argparse
+import multiprocessing
+import queue
+import time
+from flock_drone.settings import TICK_JITTER
+from flock_drone.mechanics.scheduler import aggregate_TickStats
+from flock_drone.mechanics.stagger import tick_phase, rate_smoothness
+from flock_drone.mechanics.local_log import configure
+
+# Same loop time as simulate.py, which can't be imported before gevent patching.
+LOOP_TIME = 15
+
+# Seconds between two statistics reports of a shard.
+REPORT_INTERVAL = 60
+
+
+def partition(drone_urls, shards):
+    """Split drone_urls into at most shards lists of nearly equal size."""
+    shards = max(1, min(shards, len(drone_urls)))
+    return [drone_urls[i::shards] for i in range(shards)]
+
+
+def gen_ShardReport(shard, drones, alive, stats, breakers=None):
+    """Generate the statistics report of a shard."""
+    report = {
+        "Shard": shard,
+        "Drones": drones,
+        "Alive": alive,
+        "Stats": stats,
+        "Breakers": breakers or dict(),
+        "Time": time.time(),
+    }
+    return report
+
+
+def run_shard(shard, drone_urls, reports, init=False, report_interval=REPORT_INTERVAL):
+    """Run the drones of a shard and report their statistics every report_interval."""
+    # Patch the stdlib with gevent in the worker process only.
+    from flock_drone.mechanics import greenlets as runner
+    from flock_drone.mechanics.resilience import breaker_metrics
+    import gevent
+
+    # The log listener thread is only started once threading is patched.
+    configure()
+
+    greenlets, schedulers = runner.spawn_drones(drone_urls, init)
+    while True:
+        done = gevent.joinall(greenlets, timeout=report_interval)
+        alive = sum(1 for greenlet in greenlets if not greenlet.dead)
+        stats = aggregate_TickStats([scheduler.stats for scheduler in schedulers])
+        reports.put(gen_ShardReport(shard, len(drone_urls), alive, stats, breaker_metrics()))
+        if len(done) == len(greenlets):
+            return
+
+
+def aggregate_reports(reports, processes, report_interval=REPORT_INTERVAL):
+    """Aggregate the latest report of every shard with the health of its process."""
+    # Only the parent aggregates, workers import resilience once gevent patched them.
+    from flock_drone.mechanics.resilience import aggregate_BreakerStats
+
+    now = time.time()
+    health = dict()
+    for shard, process in enumerate(processes):
+        report = reports.get(shard)
+        if not process.is_alive():
+            health[shard] = "Dead"
+        elif report is None or now - report["Time"] > 2 * report_interval:
+            health[shard] = "Silent"
+        else:
+            health[shard] = "Healthy"
+
+    latest = list(reports.values())
+    breakers = dict()
+    for report in latest:
+        for key, stats in report["Breakers"].items():
+            breakers.setdefault(key, []).append(stats)
+    summary = {
+        "Shards": len(processes),
+        "Health": health,
+        "Drones": sum(report["Drones"] for report in latest),
+        "Alive": sum(report["Alive"] for report in latest),
+        "Stats": aggregate_TickStats([report["Stats"] for report in latest]),
+        "Breakers": dict((key, aggregate_BreakerStats(stats_list))
+                         for key, stats_list in breakers.items()),
+    }
+    return summary
+
+
+def collect_reports(reports_queue, reports, timeout):
+    """Keep the latest report of each shard received within timeout seconds."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            report = reports_queue.get(timeout=max(0.0, deadline - time.time()))
+        except queue.Empty:
+            return reports
+        reports[report["Shard"]] = report
+
+
+def run_sharded(drone_urls, processes=None, init=False, report_interval=REPORT_INTERVAL):
+    """Run drone_urls split over processes worker processes, one per core by default."""
+    # spawn keeps the parent free of gevent patching and gives clean workers.
+    context = multiprocessing.get_context("spawn")
+    reports_queue = context.Queue()
+    shards = partition(drone_urls, processes or multiprocessing.cpu_count())
+
+    workers = [context.Process(target=run_shard, name="drone-shard-%d" % (shard,),
+                               args=(shard, urls, reports_queue, init, report_interval))
+               for shard, urls in enumerate(shards)]
+    for worker in workers:
+        worker.start()
+
+    reports = dict()
+    while any(worker.is_alive() for worker in workers):
+        collect_reports(reports_queue, reports, report_interval)
+        print(aggregate_reports(reports, workers, report_interval))
+
+    collect_reports(reports_queue, reports, 0)
+    return aggregate_reports(reports, workers, report_interval)
+
+
+if __name__ == "__main__":
+    configure()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("drone_urls", nargs="*", help="drone server URLs")
+    parser.add_argument("--host", default="http://localhost",
+                        help="host of the drone servers given with --ports")
+    parser.add_argument("--ports", default=None,
+                        help="range of drone server ports, e.g. 8081-8180")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of shards, defaults to the number of cores")
+    parser.add_argument("--init", action="store_true",
+                        help="initialize each drone before running its loop")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    args = parser.parse_args()
+
+    drone_urls = list(args.drone_urls)
+    if args.ports is not None:
+        first, last = (int(port) for port in args.ports.split("-"))
+        drone_urls += ["%s:%d" % (args.host, port) for port in range(first, last + 1)]
+
+    print("Running %d drone main loops." % (len(drone_urls),))
+    phases = [tick_phase(drone_url, LOOP_TIME) for drone_url in drone_urls]
+    print("Controller request rate:", rate_smoothness(phases, LOOP_TIME, jitter=TICK_JITTER))
+    run_sharded(drone_urls, args.processes, args.init, args.report_interval)
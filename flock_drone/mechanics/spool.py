@@ -0,0 +1,236 @@
+"""Disk-backed spool of the messages the controller could not be sent.
+
+Messages are stored in a directory of SPOOL_DIR per drone, named after its
+drone server, e.g. SPOOL_DIR/localhost_8081, as a spool has a single
+writer. Each message is one <sequence>-<kind>.json file, replayed in order once the controller answers again, at most
+SPOOL_REPLAY_BATCH per tick so that a fleet coming back from an outage does
+not flood it. SPOOL_POLICY says what to keep of each kind:
+    "latest"  only the last message of each drone, or anomaly, is kept,
+    "drop"    evicted first, oldest first, when the spool exceeds SPOOL_MAX_BYTES,
+    "keep"    evicted last.
+A message only evicts messages of its own or a lower priority, it is
+dropped if that doesn't free enough space.
+Messages the controller rejects, with a RequestError of a 4xx status, are
+never spooled, and dropped when replayed.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from flock_drone.settings import SPOOL_DIR, SPOOL_MAX_BYTES, SPOOL_POLICY, SPOOL_REPLAY_BATCH
+from flock_drone.mechanics.codec import dumps, loads
+from flock_drone.mechanics.journal import drone_key
+from flock_drone.mechanics.transport import RequestError
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
+
+FILE_NAME = re.compile(r"^(\d{20})-(\w+)\.json$")
+
+LATEST, DROP, KEEP = "latest", "drop", "keep"
+# Eviction order of the policies.
+EVICTION = [DROP, LATEST, KEEP]
+
+
+def gen_SpoolStats():
+    """Generate empty spool statistics."""
+    stats = {
+        "Spooled": 0,
+        "Coalesced": 0,
+        "Evicted": 0,
+        "Dropped": 0,
+        "Replayed": 0,
+        "Rejected": 0,
+    }
+    return stats
+
+
+def rejected(e):
+    """Check if a request failed because the controller rejected it, with a 4xx status."""
+    return isinstance(e, RequestError) and 400 <= e.status < 500
+
+
+def message_key(kind, args):
+    """Return the key of a message, messages of a "latest" kind with the same key coalesce.
+
+    Messages are keyed by the drone and, for anomalies, the anomaly they are about.
+    """
+    obj = args[0] if args else None
+    if not isinstance(obj, dict):
+        obj = dict()
+    return "%s/%s/%s" % (kind, obj.get("DroneID"), obj.get("AnomalyID"))
+
+
+class Spool(object):
+    """Ordered messages (kind, args) stored in directory."""
+
+    def __init__(self, directory, max_bytes=SPOOL_MAX_BYTES, policy=SPOOL_POLICY):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.stats = gen_SpoolStats()
+        # Sequence -> (kind, key, size) of the spooled messages, oldest first.
+        self._index = OrderedDict()
+        self._size = 0
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Index the messages left in the directory by a previous run."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            match = FILE_NAME.match(name)
+            if match is None:
+                continue
+            sequence, kind = int(match.group(1)), match.group(2)
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    data = f.read()
+                key = message_key(kind, loads(data)["Args"])
+            except (OSError, ValueError, KeyError) as e:
+                LOGGER.warning("Ignoring spooled message %s: %s", name, e)
+                continue
+            self._index[sequence] = (kind, key, len(data))
+            self._size += len(data)
+            self._sequence = sequence + 1
+
+    def __len__(self):
+        return len(self._index)
+
+    def path(self, sequence, kind):
+        """Return the path of a message file."""
+        return os.path.join(self.directory, "%020d-%s.json" % (sequence, kind))
+
+    def write(self, path, data):
+        """Replace the file at path by data atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def remove(self, sequence):
+        """Remove a message from the spool."""
+        kind, key, size = self._index.pop(sequence)
+        self._size -= size
+        try:
+            os.remove(self.path(sequence, kind))
+        except FileNotFoundError:
+            pass
+
+    def put(self, kind, args):
+        """Spool a message, return False if it doesn't fit in the spool."""
+        data = dumps({"Kind": kind, "Args": list(args)})
+        policy = self.policy.get(kind, DROP)
+        key = message_key(kind, args)
+        with self._lock:
+            self.discard(kind, args)
+            self.evict(self.max_bytes - len(data), EVICTION[:EVICTION.index(policy) + 1])
+            if self._size + len(data) > self.max_bytes:
+                self.stats["Dropped"] += 1
+                return False
+            sequence = self._sequence
+            self._sequence += 1
+            self.write(self.path(sequence, kind), data)
+            self._index[sequence] = (kind, key, len(data))
+            self._size += len(data)
+            self.stats["Spooled"] += 1
+        return True
+
+    def discard(self, kind, args):
+        """Remove the messages a newer message of kind sent to the controller replaces."""
+        if self.policy.get(kind, DROP) != LATEST or not self._index:
+            return
+        key = message_key(kind, args)
+        with self._lock:
+            for sequence, (kind_, key_, size) in list(self._index.items()):
+                if key_ == key:
+                    self.remove(sequence)
+                    self.stats["Coalesced"] += 1
+
+    def evict(self, max_bytes, policies=EVICTION):
+        """Remove messages of policies, in that order and oldest first, until max_bytes are used at most."""
+        for policy in policies:
+            for sequence, (kind, key, size) in list(self._index.items()):
+                if self._size <= max_bytes:
+                    return
+                if self.policy.get(kind, DROP) == policy:
+                    self.remove(sequence)
+                    self.stats["Evicted"] += 1
+
+    def replay(self, senders, limit=SPOOL_REPLAY_BATCH):
+        """Send up to limit messages with senders[kind](*args), oldest first.
+
+        Replay stops at the first message which fails, it is retried first
+        next time. Return the number of messages sent.
+        """
+        sent = 0
+        with self._lock:
+            while self._index and sent < limit:
+                sequence, (kind, key, size) = next(iter(self._index.items()))
+                try:
+                    with open(self.path(sequence, kind), "rb") as f:
+                        args = loads(f.read())["Args"]
+                except (OSError, ValueError, KeyError) as e:
+                    LOGGER.warning("Dropping unreadable spooled message %d: %s", sequence, e)
+                    self.remove(sequence)
+                    continue
+                try:
+                    senders[kind](*args)
+                except Exception as e:
+                    if not rejected(e):
+                        LOGGER.debug("Replay stopped, controller still unreachable: %s", e)
+                        break
+                    LOGGER.warning("Controller rejected spooled %s: %s", kind, e)
+                    self.stats["Rejected"] += 1
+                else:
+                    self.stats["Replayed"] += 1
+                    sent += 1
+                self.remove(sequence)
+        return sent
+
+
+# Spools of the drones run by this process, by drone server URL.
+SPOOLS = dict()
+_spools_lock = threading.Lock()
+
+
+def get_spool(drone_url):
+    """Return the spool of the drone served at drone_url, None when SPOOL_DIR is not set."""
+    if not SPOOL_DIR:
+        return None
+    with _spools_lock:
+        if drone_url not in SPOOLS:
+            SPOOLS[drone_url] = Spool(os.path.join(SPOOL_DIR, drone_key(drone_url)))
+        return SPOOLS[drone_url]
+
+
+def spool_message(drone_url, kind, args, error):
+    """Spool a message of the drone at drone_url the controller could not be sent because of error."""
+    if rejected(error):
+        LOGGER.warning("Controller rejected %s: %s", kind, error)
+        return False
+    spool = get_spool(drone_url)
+    if spool is None:
+        LOGGER.warning("%s failed: %s", kind, error)
+        return False
+    LOGGER.warning("%s failed, spooled: %s", kind, error)
+    return spool.put(kind, args)
+
+
+def message_sent(drone_url, kind, args):
+    """Drop the spooled messages of the drone at drone_url replaced by a message sent to the controller."""
+    spool = get_spool(drone_url)
+    if spool is not None:
+        spool.discard(kind, args)
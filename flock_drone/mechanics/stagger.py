@@ -0,0 +1,63 @@
+"""Spread the ticks of a fleet over the loop period instead of running them together."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import hashlib
+import math
+from flock_drone.settings import STAGGER_TICKS
+
+
+def phase_offset(key, period):
+    """Return a deterministic offset in [0, period) for the drone identified by key.
+
+    The offset only depends on key, so drones started in different processes
+    or machines spread over the period without coordinating.
+    """
+    digest = hashlib.md5(str(key).encode("utf-8")).digest()
+    fraction = int.from_bytes(digest[:8], "big") / float(2 ** 64)
+    return fraction * period
+
+
+def tick_phase(key, period):
+    """Return the phase of the drone identified by key, 0 unless STAGGER_TICKS is set."""
+    return phase_offset(key, period) if STAGGER_TICKS else 0.0
+
+
+def rate_smoothness(phases, period, bins=15, jitter=0.0):
+    """Report how evenly ticks starting at phases load the controller over period.
+
+    The period is split in bins, PeakToMean is the busiest bin over the mean
+    and CoefficientOfVariation the standard deviation of the bins over the
+    mean, both are 1 and 0 for a perfectly smooth request rate.
+    """
+    counts = [0.0] * bins
+    width = float(period) / bins
+    for phase in phases:
+        if jitter:
+            # Spread each tick uniformly over [phase, phase + jitter).
+            start, end = phase, phase + jitter
+            position = start
+            while position < end:
+                index = int(position // width)
+                next_edge = min(end, (index + 1) * width)
+                counts[index % bins] += (next_edge - position) / jitter
+                position = next_edge
+        else:
+            counts[int((phase % period) // width) % bins] += 1
+
+    mean = sum(counts) / bins
+    if not mean:
+        return {"Bins": bins, "PeakToMean": 0.0, "CoefficientOfVariation": 0.0}
+    variance = sum((c - mean) ** 2 for c in counts) / bins
+    report = {
+        "Bins": bins,
+        "PeakToMean": max(counts) / mean,
+        "CoefficientOfVariation": math.sqrt(variance) / mean,
+    }
+    return report
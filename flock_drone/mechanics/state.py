@@ -9,6 +9,9 @@ superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
 sys.path.insert(0, superParentDir)
 
 from flock_drone.mechanics.main import get_drone, update_drone
+from flock_drone.mechanics.local_log import get_logger
+
+LOGGER = get_logger(__name__)
 
 
 def gen_State(drone_id, battery, direction, position, status, speed):
@@ -35,9 +38,9 @@ def update_state(state):
         # Update the drone state
         drone["State"] = state
         update_drone(drone)
-        print("Drone state updated successfully.")
+        LOGGER.debug("Drone state updated successfully.")
     else:
-        print("ERROR: DroneID %s not valid." % (state["DroneID"]))
+        LOGGER.error("DroneID %s not valid.", state["DroneID"])
 
 
 def get_state():
@@ -0,0 +1,72 @@
+"""Tick scoped cache for reads from the drone and central servers.
+
+Inside a tick_cache() block each decorated read is made at most once for the
+same arguments, writes decorated with invalidates() drop the reads they change.
+Outside of a block the reads always go to the server.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import contextvars
+import copy
+import functools
+from contextlib import contextmanager
+
+# Cache of the running tick, context local so it follows asyncio tasks and greenlets.
+_cache = contextvars.ContextVar("tick_cache", default=None)
+
+
+@contextmanager
+def tick_cache():
+    """Cache the decorated reads made inside the block."""
+    token = _cache.set(dict())
+    try:
+        yield _cache.get()
+    finally:
+        _cache.reset(token)
+
+
+def cached(func):
+    """Cache the result of the read func for the running tick, failed reads are not cached."""
+    @functools.wraps(func)
+    def wrapper(*args):
+        cache = _cache.get()
+        if cache is None:
+            return func(*args)
+
+        key = (func.__name__,) + args
+        if key not in cache:
+            value = func(*args)
+            if value is None:
+                return None
+            cache[key] = value
+        # Callers update the objects they get, keep the cached one untouched.
+        return copy.deepcopy(cache[key])
+    return wrapper
+
+
+def invalidate(*names):
+    """Drop the cached results of the reads called names."""
+    cache = _cache.get()
+    if cache is not None:
+        for key in [key for key in cache if key[0] in names]:
+            cache.pop(key, None)
+
+
+def invalidates(*names):
+    """Decorate a write to drop the cached results of the reads called names."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            try:
+                return func(*args)
+            finally:
+                invalidate(*names)
+        return wrapper
+    return decorator
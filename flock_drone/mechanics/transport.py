@@ -0,0 +1,322 @@
+"""Transports the mechanics requests are made through.
+
+A transport has the request() interface of httplib2.Http, the client hydra-py
+makes its requests with, and is given to the pooled resources of
+mechanics/resources.py. Available transports:
+
+- PooledHttp (mechanics/connections.py) sends requests over keep-alive HTTP.
+- WsgiTransport calls a WSGI app, the local hydrus app, in the same process.
+- RecordedTransport replays recorded responses, for tests.
+- RoutingTransport sends each request to a transport chosen by URL prefix.
+- RedirectingTransport follows the redirects of GET and HEAD requests, like httplib2.
+- CompressedTransport compresses the requests and responses of a transport.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import io
+import threading
+from urllib.parse import urlsplit, urljoin
+from flock_drone.settings import TRANSPORT, DRONE_URL, UNIX_SOCKET, CENTRAL_SERVER_URL
+from flock_drone.settings import ACCEPT_ENCODING, COMPRESS_REQUESTS, COMPRESS_MIN_SIZE, DOC_CACHE_DIR
+from flock_drone.compression import ENCODINGS, compress, decompress
+
+
+class Response(dict):
+    """Response headers with lower case names, status and reason, like httplib2.Response."""
+
+    def __init__(self, status, reason, headers):
+        super(Response, self).__init__((name.lower(), value) for name, value in headers)
+        self.status = status
+        self.reason = reason
+        self["status"] = str(status)
+
+
+class RequestError(Exception):
+    """A request answered with an unexpected status."""
+
+    def __init__(self, status, message=None):
+        super(RequestError, self).__init__(message or str(status))
+        self.status = status
+
+
+class RedirectLimit(RequestError):
+    """A request redirected more times than allowed."""
+    pass
+
+
+def check_response(resp, expected=(200, 201)):
+    """Raise RequestError unless resp has one of the expected statuses."""
+    if resp.status not in expected:
+        raise RequestError(resp.status, "%s %s" % (resp.status, resp.reason))
+
+
+class Transport(object):
+    """Base transport, request() returns (Response, content bytes)."""
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the resources held by the transport."""
+        pass
+
+
+def encode_body(body):
+    """Return a request body as bytes."""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return body or b""
+
+
+class WsgiTransport(Transport):
+    """Call a WSGI app directly, without sockets or HTTP parsing."""
+
+    def __init__(self, app, context=None):
+        self.app = app
+        # Context manager which set up app, exited by close().
+        self.context = context
+
+    def environ(self, uri, method, body, headers):
+        """Build the WSGI environ of a request."""
+        parts = urlsplit(uri)
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        environ = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": parts.path or "/",
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": host,
+            "SERVER_PORT": str(port),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": parts.scheme or "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "HTTP_HOST": parts.netloc,
+        }
+        for name, value in headers.items():
+            key = name.upper().replace("-", "_")
+            if key == "CONTENT_TYPE":
+                environ[key] = value
+            elif key != "CONTENT_LENGTH":
+                environ["HTTP_" + key] = value
+        return environ
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        body = encode_body(body)
+        environ = self.environ(uri, method, body, dict(headers or {}))
+        started = dict()
+
+        def start_response(status, response_headers, exc_info=None):
+            started["status"] = status
+            started["headers"] = response_headers
+
+        result = self.app(environ, start_response)
+        try:
+            content = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        code, _, reason = started["status"].partition(" ")
+        return Response(int(code), reason, started["headers"]), content
+
+    def close(self):
+        """Tear down the app set up by context."""
+        if self.context is not None:
+            self.context.__exit__(None, None, None)
+            self.context = None
+
+
+class RecordedTransport(Transport):
+    """Replay recorded responses, recording them from transport when one is given.
+
+    Recordings map (method, uri) to a list of (status, headers, content)
+    replayed in order, the last one being repeated. Requests are kept in
+    requests as (method, uri, body).
+    """
+
+    def __init__(self, recordings=None, transport=None):
+        self.recordings = recordings if recordings is not None else dict()
+        self.transport = transport
+        self.requests = list()
+
+    def record(self, method, uri, status=200, headers=None, content=b""):
+        """Add a response to the recordings."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.recordings.setdefault((method, uri), list()).append(
+            (status, list((headers or {}).items()), content))
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        self.requests.append((method, uri, body))
+        if self.transport is not None:
+            response, content = self.transport.request(uri, method, body, headers)
+            self.record(method, uri, response.status,
+                        dict((k, v) for k, v in response.items() if k != "status"), content)
+            return response, content
+
+        responses = self.recordings.get((method, uri))
+        if not responses:
+            return Response(404, "Not Found", []), b""
+        status, response_headers, content = responses.pop(0) if len(responses) > 1 else responses[0]
+        return Response(status, "", response_headers), content
+
+
+class RoutingTransport(Transport):
+    """Send each request to the transport of the longest matching URL prefix."""
+
+    def __init__(self, routes, default):
+        self.routes = sorted(routes.items(), key=lambda route: len(route[0]), reverse=True)
+        self.default = default
+
+    def route(self, uri):
+        """Return the transport of uri."""
+        for prefix, transport in self.routes:
+            if uri.startswith(prefix):
+                return transport
+        return self.default
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        return self.route(uri).request(uri, method, body, headers, **kwargs)
+
+    def close(self):
+        """Release the resources held by the transports."""
+        for _, transport in self.routes:
+            transport.close()
+        self.default.close()
+
+
+# Redirects followed for REDIRECT_METHODS, at most MAX_REDIRECTS per request, like httplib2.
+REDIRECT_STATUSES = (300, 301, 302, 303, 307, 308)
+REDIRECT_METHODS = ("GET", "HEAD")
+MAX_REDIRECTS = 5
+
+
+class RedirectingTransport(Transport):
+    """Follow the redirects of the GET and HEAD requests of transport.
+
+    e.g. IRI_DRONE, .../api, is redirected to the entrypoint at .../api/.
+    The final response has the URL it was fetched from as content-location.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=MAX_REDIRECTS, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        location = uri
+        for _ in range(redirections + 1):
+            response, content = self.transport.request(location, method, body, headers, **kwargs)
+            if (method not in REDIRECT_METHODS or response.status not in REDIRECT_STATUSES or
+                    "location" not in response):
+                if location != uri:
+                    response["content-location"] = location
+                return response, content
+            location = urljoin(location, response["location"])
+        raise RedirectLimit(response.status, "%s redirected more than %d times" % (uri, redirections))
+
+    def close(self):
+        """Release the resources held by the transport."""
+        self.transport.close()
+
+
+class CompressedTransport(Transport):
+    """Accept compressed responses of transport and gzip its large request bodies."""
+
+    def __init__(self, transport, accept_encoding=ACCEPT_ENCODING,
+                 compress_requests=COMPRESS_REQUESTS, min_size=COMPRESS_MIN_SIZE):
+        self.transport = transport
+        self.accept_encoding = accept_encoding
+        self.compress_requests = compress_requests
+        self.min_size = min_size
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Make a request and return (response, content) like httplib2.Http.request."""
+        headers = dict(headers or {})
+        if self.accept_encoding:
+            headers.setdefault("Accept-Encoding", self.accept_encoding)
+        if body is not None and self.compress_requests:
+            body = encode_body(body)
+            if len(body) >= self.min_size:
+                body = compress(body, "gzip")
+                headers["Content-Encoding"] = "gzip"
+
+        response, content = self.transport.request(uri, method, body, headers, **kwargs)
+        encoding = response.get("content-encoding", "").strip().lower()
+        if encoding in ENCODINGS:
+            content = decompress(content, encoding)
+            # Same as httplib2, which keeps the original header as -content-encoding.
+            response["-content-encoding"] = response.pop("content-encoding")
+            response["content-length"] = str(len(content))
+        return response, content
+
+    def close(self):
+        """Release the resources held by the transport."""
+        self.transport.close()
+
+
+def get_transport(mode=TRANSPORT):
+    """Build the transport for mode, "http", "wsgi" or "unix".
+
+    In "wsgi" mode requests to DRONE_URL are served by the hydrus app of
+    flock_drone/main.py inside this process, on the same database as the
+    server, in "unix" mode they are sent to the drone server listening at
+    UNIX_SOCKET. Requests to CENTRAL_SERVER_URL are retried and go through
+    circuit breakers, see mechanics/resilience.py. Other requests go over HTTP.
+    Redirects are followed whatever the route.
+    Requests leaving the process are compressed as set by ACCEPT_ENCODING and
+    COMPRESS_REQUESTS. API docs are cached in DOC_CACHE_DIR, see
+    mechanics/doc_cache.py.
+    """
+    from flock_drone.mechanics.connections import HTTP, UnixHttp
+    from flock_drone.mechanics.resilience import CONTROLLER_HTTP
+    routes = {CENTRAL_SERVER_URL: CompressedTransport(CONTROLLER_HTTP)}
+    if mode == "unix":
+        routes[DRONE_URL] = CompressedTransport(UnixHttp(UNIX_SOCKET))
+    elif mode == "wsgi":
+        from flock_drone.main import hydrus_app
+        context = hydrus_app(reset=False)
+        app = context.__enter__()
+        routes[DRONE_URL] = WsgiTransport(app, context)
+    transport = RedirectingTransport(RoutingTransport(routes, CompressedTransport(HTTP)))
+    if DOC_CACHE_DIR is not None:
+        from flock_drone.mechanics.doc_cache import DocCacheTransport
+        transport = DocCacheTransport(transport, DOC_CACHE_DIR)
+    return transport
+
+
+_transport = None
+_lock = threading.Lock()
+
+
+def current_transport():
+    """Return the transport of the mechanics requests, building it the first time."""
+    global _transport
+    if _transport is None:
+        with _lock:
+            if _transport is None:
+                _transport = get_transport()
+    return _transport
+
+
+def use_transport(transport):
+    """Make the mechanics requests through transport from now on."""
+    global _transport
+    with _lock:
+        _transport = transport
@@ -0,0 +1,145 @@
+"""Compare the request latency of the drone server over TCP and over its Unix socket.
+
+Start the drone server with UNIX_SOCKET set and SERVE_TCP on, then run
+    python flock_drone/mechanics/transport_bench.py --socket <UNIX_SOCKET>
+--echo benchmarks both transports against a minimal local server instead,
+which measures the transport overhead alone.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import argparse
+import json
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from flock_drone.settings import DRONE_URL, API_NAME, UNIX_SOCKET
+from flock_drone.mechanics.connections import PooledHttp, UnixHttp
+from flock_drone.mechanics.objects import gen_Datastream
+
+HEADERS = {"Content-Type": "application/ld+json"}
+
+
+def gen_requests(base_url):
+    """Generate the benchmarked requests as (name, uri, method, body)."""
+    datastream = gen_Datastream("20", "0,0", "-1000")
+    requests = [
+        ("GET /%s/Drone" % API_NAME, "%s/%s/Drone" % (base_url, API_NAME), "GET", None),
+        ("POST /%s/Datastream" % API_NAME, "%s/%s/Datastream" % (base_url, API_NAME), "POST",
+         json.dumps(datastream)),
+    ]
+    return requests
+
+
+def measure(transport, uri, method, body, count, warmup=20):
+    """Return the sorted latencies in seconds of count requests."""
+    for _ in range(warmup):
+        transport.request(uri, method, body, HEADERS)
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        transport.request(uri, method, body, HEADERS)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def summarize(latencies):
+    """Return mean, median and 99th percentile latencies in microseconds."""
+    summary = {
+        "Mean": 1e6 * sum(latencies) / len(latencies),
+        "P50": 1e6 * latencies[len(latencies) // 2],
+        "P99": 1e6 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+    return summary
+
+
+def benchmark(base_url, socket_path, count):
+    """Benchmark the requests over TCP and the Unix socket, return the summaries."""
+    transports = [("tcp", PooledHttp()), ("unix", UnixHttp(socket_path))]
+    results = []
+    for name, uri, method, body in gen_requests(base_url):
+        for transport_name, transport in transports:
+            summary = summarize(measure(transport, uri, method, body, count))
+            summary.update({"Request": name, "Transport": transport_name})
+            results.append(summary)
+    for _, transport in transports:
+        transport.close()
+    return results
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Answer every request with a small JSON body over HTTP/1.1."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super(EchoHandler, self).setup()
+        if self.connection.family != socket.AF_UNIX:
+            # Headers and body are written separately, don't wait for delayed ACKs.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def respond(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"@type": "Drone", "DroneID": "-1000"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/ld+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixEchoServer(socketserver.ThreadingUnixStreamServer):
+    """Echo server on a Unix socket."""
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super(UnixEchoServer, self).get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+
+def start_echo_servers(socket_path):
+    """Start echo servers on a free TCP port and at socket_path, return the TCP base URL."""
+    tcp = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    tcp.daemon_threads = True
+    unix = UnixEchoServer(socket_path, EchoHandler)
+    for server in (tcp, unix):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return "http://127.0.0.1:%d" % tcp.server_port
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DRONE_URL, help="TCP base URL of the drone server")
+    parser.add_argument("--socket", default=UNIX_SOCKET, help="Unix socket of the drone server")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--echo", action="store_true",
+                        help="benchmark against local echo servers")
+    args = parser.parse_args()
+
+    url, path = args.url, args.socket
+    if args.echo:
+        path = os.path.join(tempfile.mkdtemp(), "echo.sock")
+        url = start_echo_servers(path)
+    if path is None:
+        parser.error("--socket is required when UNIX_SOCKET is not set")
+
+    print("%-22s %-9s %10s %10s %10s" % ("Request", "Transport", "Mean us", "P50 us", "P99 us"))
+    for result in benchmark(url, path, args.requests):
+        print("%-22s %-9s %10.1f %10.1f %10.1f" % (result["Request"], result["Transport"],
+                                                   result["Mean"], result["P50"], result["P99"]))
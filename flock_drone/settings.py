@@ -11,6 +11,12 @@ HYDRUS_SERVER_URL = "http://localhost:8081/"
 PORT = 8081
 API_NAME = "api"
 
+# Path of a Unix domain socket the drone server also listens on, None to only serve TCP.
+# SERVE_TCP = False serves the drone API on the Unix socket only.
+global UNIX_SOCKET, SERVE_TCP
+UNIX_SOCKET = None
+SERVE_TCP = True
+
 
 ## Drone configuration
 global CENTRAL_SERVER_NAMESPACE, DRONE_NAMESPACE
@@ -25,6 +31,136 @@ global IRI_CS, IRI_DRONE
 IRI_CS = "http://localhost:8080/api"
 IRI_DRONE = "http://localhost:8081/api"
 
+# Simulated seconds per real second for the drone main loop.
+# Distances are always computed from simulated seconds, 0 runs as fast as possible.
+global SIMULATION_SPEEDUP
+SIMULATION_SPEEDUP = 1
+
+# Run the requests of each tick concurrently with asyncio, on IO_WORKERS threads.
+global CONCURRENT_IO, IO_WORKERS
+CONCURRENT_IO = False
+IO_WORKERS = 8
+
+# Seconds each tick may spend on requests before logs and datastreams are shed, None for no limit.
+# Shed requests are either "defer"red to later ticks, up to DEFERRED_LIMIT of them, or "drop"ped.
+global TICK_BUDGET, TICK_BUDGET_POLICY, DEFERRED_LIMIT
+TICK_BUDGET = 10
+TICK_BUDGET_POLICY = "defer"
+DEFERRED_LIMIT = 1000
+
+# Start each drone loop at a deterministic offset within the loop time, so drones started
+# together don't hit the controller together. Each tick also starts up to TICK_JITTER seconds late.
+global STAGGER_TICKS, TICK_JITTER
+STAGGER_TICKS = True
+TICK_JITTER = 0
+
+# Maximum number of idle keep-alive connections the mechanics keep open to each host.
+global HTTP_POOL_SIZE
+HTTP_POOL_SIZE = 4
+
+# Transport of the mechanics requests, "http", "wsgi" to call the local hydrus app
+# in the mechanics process instead of going through its HTTP server, or "unix" to
+# reach the local drone server through UNIX_SOCKET.
+global TRANSPORT
+TRANSPORT = "http"
+
+# Controller requests time out after CONTROLLER_TIMEOUT seconds and are made up to
+# RETRY_ATTEMPTS times, waiting a random time below RETRY_BACKOFF * 2 ** attempt
+# (at most RETRY_BACKOFF_MAX) seconds between attempts. After BREAKER_THRESHOLD
+# consecutive failed requests, retries included, requests to the same endpoint fail fast for BREAKER_RESET seconds.
+global CONTROLLER_TIMEOUT, RETRY_ATTEMPTS, RETRY_BACKOFF, RETRY_BACKOFF_MAX
+global BREAKER_THRESHOLD, BREAKER_RESET
+CONTROLLER_TIMEOUT = 5
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+RETRY_BACKOFF_MAX = 2
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30
+
+# The mechanics accept gzip and deflate responses (ACCEPT_ENCODING, None to disable), and
+# gzip request bodies of at least COMPRESS_MIN_SIZE bytes when COMPRESS_REQUESTS is set.
+# The drone server compresses responses of at least COMPRESS_MIN_SIZE bytes when
+# COMPRESS_RESPONSES is set, and always accepts compressed request bodies.
+global ACCEPT_ENCODING, COMPRESS_REQUESTS, COMPRESS_RESPONSES, COMPRESS_MIN_SIZE, COMPRESS_LEVEL
+ACCEPT_ENCODING = "gzip, deflate"
+COMPRESS_REQUESTS = False
+COMPRESS_RESPONSES = True
+COMPRESS_MIN_SIZE = 512
+COMPRESS_LEVEL = 6
+
+# JSON backend of the mechanics, "json", "orjson" or "auto" to use orjson when installed.
+global JSON_CODEC
+JSON_CODEC = "auto"
+
+# Send the drone and datastream updates of a tick to the drone server in one TickUpdate request.
+# Off by default, the drone server must serve the TickUpdate endpoint of flock_drone/main.py.
+global TICK_UPDATE
+TICK_UPDATE = False
+
+# Encode the drone once per tick and send it to the drone server, the controller and the
+# DRONE_MIRRORS (URLs the drone is POSTed to) concurrently, on up to PUBLISH_WORKERS threads.
+# The publisher posts to the hydrus URLs of the drone and the controller instead of
+# finding the operations in their API docs, so it is off by default.
+global PUBLISH_DRONE, DRONE_MIRRORS, PUBLISH_WORKERS
+PUBLISH_DRONE = False
+DRONE_MIRRORS = []
+PUBLISH_WORKERS = 4
+
+# Directory where the entrypoints, API docs and contexts fetched by the mechanics are cached,
+# revalidated on each fetch and used when their server is unreachable, e.g.
+# os.path.join(tempfile.gettempdir(), 'flock_drone', 'doc_cache'). None (the default) disables the cache.
+global DOC_CACHE_DIR
+DOC_CACHE_DIR = None
+
+# Send the logs from a background thread, in batches of up to LOG_BATCH_SIZE logs at most
+# LOG_FLUSH_INTERVAL seconds after they were queued. Logs are dropped while LOG_QUEUE_SIZE are queued.
+# Off by default, logs are then sent by the drone loop as they are made.
+global LOG_SHIPPING, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL
+LOG_SHIPPING = False
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_INTERVAL = 1.0
+
+# Identical HttpApiLog (Subject, Predicate, Object) triples are counted over windows of
+# HTTP_API_LOG_WINDOW seconds and sent once, their counts are only logged locally, 0 (the default)
+# sends each record. HTTP_API_LOG_SAMPLING maps predicates to the fraction of their records kept,
+# e.g. {"PUT DroneLog": 0.1}, counts are scaled back up.
+global HTTP_API_LOG_WINDOW, HTTP_API_LOG_SAMPLING
+HTTP_API_LOG_WINDOW = 0
+HTTP_API_LOG_SAMPLING = {}
+
+# Level of the local logs of the mechanics, their format, "text" or "json", and the number of
+# records waiting to be written to stdout, beyond which new records are dropped.
+global LOCAL_LOG_LEVEL, LOCAL_LOG_FORMAT, LOCAL_LOG_QUEUE_SIZE
+LOCAL_LOG_LEVEL = "INFO"
+LOCAL_LOG_FORMAT = "text"
+LOCAL_LOG_QUEUE_SIZE = 10000
+
+# Local journal of the tick events, suffixed with the drone server of each drone, e.g.
+# events-localhost_8081.fdj, and moved to <path>.1 once it reaches JOURNAL_MAX_BYTES.
+# e.g. os.path.join(tempfile.gettempdir(), 'flock_drone', 'events.fdj'), None (the default)
+# disables the journal.
+global JOURNAL_PATH, JOURNAL_MAX_BYTES
+JOURNAL_PATH = None
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024
+
+# Directory of the controller messages which could not be sent, in a subdirectory per drone
+# server, e.g. SPOOL_DIR/localhost_8081. They are replayed in order, at most
+# SPOOL_REPLAY_BATCH per tick, once the controller answers again. e.g.
+# os.path.join(tempfile.gettempdir(), 'flock_drone', 'spool'), None (the default) disables the spool.
+# SPOOL_POLICY: "latest" keeps only the last message of each drone or anomaly, "drop" messages are evicted
+# first and "keep" ones last when the spool exceeds SPOOL_MAX_BYTES.
+global SPOOL_DIR, SPOOL_MAX_BYTES, SPOOL_POLICY, SPOOL_REPLAY_BATCH
+SPOOL_DIR = None
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+SPOOL_POLICY = {
+    "UpdateDroneAtController": "latest",
+    "SendAnomaly": "keep",
+    "UpdateAnomalyAtController": "latest",
+    "SendDatastream": "drop",
+}
+SPOOL_REPLAY_BATCH = 20
+
 # Default drone object with DroneID -1000 for initialization.
 # Speed and MaxSpeeds are in Km/h"""
 DRONE_DEFAULT = {
@@ -0,0 +1,87 @@
+"""Tests for the asyncio execution of the effects of a tick."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+from flock_drone.mechanics import aio, core
+from flock_drone.mechanics.core import Effect
+
+
+class TestAio(unittest.TestCase):
+    """Test for the asyncio effects executor."""
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def handler(self, kind, delay=0.0):
+        async def handle(*args):
+            await asyncio.sleep(delay)
+            with self.lock:
+                self.calls.append((kind,) + args)
+        return handle
+
+    def execute(self, effects_, handlers):
+        with mock.patch.dict(aio.HANDLERS, handlers), \
+                mock.patch.object(aio, "replay_spool", self.handler("Replay")), \
+                mock.patch.object(aio.effects, "merge_updates", lambda effects_: effects_):
+            asyncio.run(aio.execute_effects(effects_))
+
+    def test_stage_order(self):
+        """Test stages run in effects.STAGES order, whatever the order of the effects."""
+        handlers = {
+            core.UPDATE_DRONE: self.handler(core.UPDATE_DRONE, 0.02),
+            core.UPDATE_ANOMALY_LOCALLY: self.handler(core.UPDATE_ANOMALY_LOCALLY, 0.02),
+            core.UPDATE_ANOMALY_AT_CONTROLLER: self.handler(core.UPDATE_ANOMALY_AT_CONTROLLER),
+            core.DRONE_LOG: self.handler(core.DRONE_LOG),
+        }
+        self.execute([Effect(core.DRONE_LOG, ("log",)),
+                      Effect(core.UPDATE_ANOMALY_AT_CONTROLLER, ("anomaly",)),
+                      Effect(core.UPDATE_ANOMALY_LOCALLY, ("anomaly",)),
+                      Effect(core.UPDATE_DRONE, ("drone",))], handlers)
+        self.assertEqual([call[0] for call in self.calls],
+                         ["Replay", core.UPDATE_DRONE, core.UPDATE_ANOMALY_LOCALLY,
+                          core.UPDATE_ANOMALY_AT_CONTROLLER, core.DRONE_LOG])
+
+    def test_stage_concurrent(self):
+        """Test the drone and datastream updates of a tick take as long as the slowest one."""
+        handlers = {
+            core.UPDATE_DRONE: self.handler(core.UPDATE_DRONE, 0.05),
+            core.UPDATE_DRONE_AT_CONTROLLER: self.handler(core.UPDATE_DRONE_AT_CONTROLLER, 0.15),
+            core.SEND_DATASTREAM: self.handler(core.SEND_DATASTREAM, 0.1),
+            core.UPDATE_DATASTREAM: self.handler(core.UPDATE_DATASTREAM, 0.1),
+        }
+        start = time.monotonic()
+        self.execute([Effect(kind, (kind,)) for kind in handlers], handlers)
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertLess(elapsed, 0.25)
+        self.assertEqual(len(self.calls), 5)
+
+    def test_batch_concurrent(self):
+        """Test the effects of a batch run concurrently and all run if one fails."""
+        async def fail(*args):
+            raise ValueError("failed")
+        handlers = {
+            core.DRONE_LOG: self.handler(core.DRONE_LOG, 0.05),
+            core.HTTP_API_LOG: fail,
+        }
+        start = time.monotonic()
+        self.execute([Effect(core.DRONE_LOG, (i,)) for i in range(5)] +
+                     [Effect(core.HTTP_API_LOG, ("log",))], handlers)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(len(self.calls), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
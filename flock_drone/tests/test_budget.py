@@ -0,0 +1,79 @@
+"""Tests for the tick budget and the shedding of non critical requests."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from unittest import mock
+from flock_drone.mechanics import budget
+from flock_drone.mechanics.budget import tick_budget, non_critical, flush_deferred, budget_exhausted
+
+
+class TestBudget(unittest.TestCase):
+    """Test for the tick budget."""
+
+    def setUp(self):
+        budget._deferred.clear()
+        budget.SHED_STATS.clear()
+        self.sent = []
+
+        @non_critical
+        def send(value):
+            self.sent.append(value)
+            return value
+        self.send = send
+
+    def test_within_budget(self):
+        """Test requests run while the budget lasts."""
+        with tick_budget(10, "drone-a"):
+            self.assertFalse(budget_exhausted())
+            self.assertEqual(self.send(1), 1)
+        self.assertEqual(self.sent, [1])
+
+    def test_defer_and_replay(self):
+        """Test requests made without budget are deferred and replayed by the same drone only."""
+        with tick_budget(0, "drone-a"):
+            self.assertIsNone(self.send(1))
+            self.assertIsNone(self.send(2))
+        with tick_budget(10, "drone-b"):
+            flush_deferred()
+        self.assertEqual(self.sent, [])
+        with tick_budget(10, "drone-a"):
+            flush_deferred()
+        self.assertEqual(self.sent, [1, 2])
+        self.assertEqual(budget.SHED_STATS["send"],
+                         {"Deferred": 2, "Dropped": 0, "Replayed": 2})
+
+    def test_replay_within_budget(self):
+        """Test nothing is replayed by a tick whose budget is spent."""
+        with tick_budget(0, "drone-a"):
+            self.send(1)
+            flush_deferred()
+        self.assertEqual(self.sent, [])
+
+    def test_drop(self):
+        """Test requests are dropped with the drop policy."""
+        with mock.patch.object(budget, "TICK_BUDGET_POLICY", "drop"), tick_budget(0, "drone-a"):
+            self.send(1)
+        self.assertEqual(budget._deferred, {})
+        self.assertEqual(budget.SHED_STATS["send"]["Dropped"], 1)
+
+    def test_limit(self):
+        """Test the oldest deferred requests are dropped beyond DEFERRED_LIMIT."""
+        with mock.patch.object(budget, "DEFERRED_LIMIT", 2):
+            with tick_budget(0, "drone-a"):
+                for value in range(3):
+                    self.send(value)
+            with tick_budget(10, "drone-a"):
+                flush_deferred()
+        self.assertEqual(self.sent, [1, 2])
+        self.assertEqual(budget.SHED_STATS["send"]["Dropped"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+"""Tests for the JSON codec of the mechanics."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from flock_drone.mechanics.codec import decode, dumps, orjson
+
+
+class TestCodec(unittest.TestCase):
+    """Test for the codec backends."""
+
+    def test_decode(self):
+        """Test every backend parses bodies and strips the envelope of the top level only."""
+        body = (b'{"@context": "/api/contexts/Drone.jsonld", "@id": "/api/Drone", '
+                b'"@type": "Drone", "State": {"@id": "/api/State/1", "Battery": "100"}}')
+        expected = {"@type": "Drone", "State": {"@id": "/api/State/1", "Battery": "100"}}
+        backends = ["json"] + (["orjson"] if orjson is not None else [])
+        for backend in backends:
+            self.assertEqual(decode(body, backend=backend), expected)
+            self.assertEqual(decode(body.decode("utf-8"), backend=backend), expected)
+            self.assertEqual(decode(dumps(expected, backend), backend=backend), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Tests for the keep-alive HTTP connection pool."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import http.client
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from flock_drone.mechanics.connections import PooledHttp, UnixHttp
+from flock_drone.mechanics.transport import RedirectingTransport, RedirectLimit
+from flock_drone.mechanics.transport_bench import UnixEchoServer, EchoHandler
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answer every request with its method and path over HTTP/1.1."""
+    protocol_version = "HTTP/1.1"
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.path in ("/api", "/loop"):
+            # The entrypoint is at /api/, like hydrus, /loop redirects to itself.
+            self.send_response(301)
+            self.send_header("Location", "/api/" if self.path == "/api" else "/loop")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/api/Closed":
+            # Close the connection once the request was received, without answering.
+            self.close_connection = True
+            return
+        body = ("%s %s" % (self.command, self.path)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Location", self.path)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledHttp(unittest.TestCase):
+    """Test for the pooled HTTP client."""
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_port
+        self.http = PooledHttp(pool_size=2)
+
+    def tearDown(self):
+        self.http.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuse(self):
+        """Test sequential requests share one connection."""
+        for i in range(5):
+            resp, content = self.http.request(self.url + "/api/Drone", "POST", body="{}")
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp["location"], "/api/Drone")
+            self.assertEqual(content, b"POST /api/Drone")
+        self.assertEqual(self.http.stats["Connections"], 1)
+        self.assertEqual(self.http.stats["Reused"], 4)
+
+    def test_stale_connection(self):
+        """Test a request on a connection closed by the server is retried once."""
+        self.http.request(self.url + "/api/Drone")
+        # Close the idle connection behind the pool's back.
+        self.http._pools[("http", self.url[7:])].queue[0].sock.shutdown(socket.SHUT_RDWR)
+        resp, content = self.http.request(self.url + "/api/Drone")
+        self.assertEqual(content, b"GET /api/Drone")
+        self.assertEqual(self.http.stats["Connections"], 2)
+
+    def test_stale_connection_sent(self):
+        """Test a request which reached the server is only sent again if its method allows it."""
+        self.http.request(self.url + "/api/Drone")
+        with self.assertRaises(http.client.RemoteDisconnected):
+            self.http.request(self.url + "/api/Closed", "PUT", body="{}")
+        self.assertEqual(self.http.stats["Retried"], 0)
+        self.http.request(self.url + "/api/Drone")
+        with self.assertRaises(http.client.RemoteDisconnected):
+            self.http.request(self.url + "/api/Closed")
+        self.assertEqual(self.http.stats["Retried"], 1)
+
+    def test_redirect(self):
+        """Test GET requests follow redirects, up to a limit, and other requests don't."""
+        transport = RedirectingTransport(self.http)
+        resp, content = transport.request(self.url + "/api")
+        self.assertEqual((resp.status, content), (200, b"GET /api/"))
+        self.assertEqual(resp["content-location"], self.url + "/api/")
+        resp, content = transport.request(self.url + "/api", "POST", body="{}")
+        self.assertEqual(resp.status, 301)
+        with self.assertRaises(RedirectLimit):
+            transport.request(self.url + "/loop", redirections=3)
+        # The redirected requests reuse the connection.
+        self.assertEqual(self.http.stats["Connections"], 1)
+
+    def test_unix_socket(self):
+        """Test requests are sent to the server listening at the Unix socket."""
+        path = os.path.join(tempfile.mkdtemp(), "drone.sock")
+        server = UnixEchoServer(path, EchoHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        http = UnixHttp(path)
+        try:
+            for i in range(3):
+                resp, content = http.request("http://localhost:8081/api/Drone")
+                self.assertEqual(resp.status, 200)
+            self.assertEqual(http.stats["Connections"], 1)
+        finally:
+            http.close()
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
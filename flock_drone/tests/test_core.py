@@ -0,0 +1,82 @@
+"""Tests for the drone state transitions and the effects they return."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import copy
+import unittest
+from flock_drone.settings import DRONE_DEFAULT
+from flock_drone.mechanics import core
+from flock_drone.mechanics.distance import gen_square_path, gen_pos_limits_from_square_path
+from flock_drone.mechanics.objects import gen_Anomaly
+
+CONTROLLER_LOC = (0.0, 0.0)
+DRONE_BOUNDS = gen_pos_limits_from_square_path(gen_square_path(CONTROLLER_LOC, 10))
+
+
+def gen_inputs(command_ids=(), command=None, anomaly=None):
+    """Generate tick inputs around the default controller location."""
+    return core.gen_TickInputs(list(command_ids), command, anomaly,
+                               CONTROLLER_LOC, DRONE_BOUNDS, 15)
+
+
+class TestStep(unittest.TestCase):
+    """Test for the drone step function."""
+
+    def setUp(self):
+        self.drone = copy.deepcopy(DRONE_DEFAULT)
+        self.drone["DroneID"] = "7"
+
+    def kinds(self, effects):
+        return [effect.kind for effect in effects]
+
+    def test_step_is_pure(self):
+        """Test step leaves its input alone and always updates the drone."""
+        before = copy.deepcopy(self.drone)
+        drone, effects = core.step(self.drone, gen_inputs())
+        self.assertEqual(self.drone, before)
+        self.assertEqual(drone["State"]["Battery"], 99)
+        self.assertIn(core.UPDATE_DRONE, self.kinds(effects))
+        self.assertIn(core.UPDATE_DRONE_AT_CONTROLLER, self.kinds(effects))
+        self.assertIn(core.SEND_DATASTREAM, self.kinds(effects))
+
+    def test_command(self):
+        """Test the latest command is executed, logged and all commands deleted."""
+        command = {"DroneID": "7", "State": {"Status": "Off"}}
+        drone, effects = core.step(self.drone, gen_inputs(["3", "4"], command))
+        self.assertEqual(drone["State"]["Status"], "Off")
+        self.assertIn(core.Effect(core.DELETE_COMMANDS, (["3", "4"],)), effects)
+        logs = [e.args[0]["LogString"] for e in effects if e.kind == core.DRONE_LOG]
+        self.assertEqual(logs, ["executing command with id 4",
+                                "changed status to Off after command execution."])
+        self.assertNotIn(core.SEND_DATASTREAM, self.kinds(effects))
+
+    def test_low_battery(self):
+        """Test the drone goes inactive at 20% battery and logs it."""
+        self.drone["State"].update({"Battery": "20", "Position": "0.05,0", "Direction": "S"})
+        drone, effects = core.step(self.drone, gen_inputs())
+        self.assertEqual(drone["State"]["Status"], "Inactive")
+        logs = [e.args[0]["LogString"] for e in effects if e.kind == core.DRONE_LOG]
+        self.assertEqual(logs, ["battery Low 18, changing to Inactive state"])
+
+    def test_confirm_anomaly(self):
+        """Test a drone at a confirming anomaly updates it and returns to active."""
+        anomaly = gen_Anomaly("0,0", "7")
+        anomaly["Status"] = "Confirming"
+        anomaly["AnomalyID"] = "12"
+        drone, effects = core.step(self.drone, gen_inputs(anomaly=anomaly))
+        self.assertEqual(drone["State"]["Status"], "Active")
+        self.assertEqual(anomaly["Status"], "Confirming")
+        updates = [e for e in effects if e.kind == core.UPDATE_ANOMALY_AT_CONTROLLER]
+        self.assertEqual(len(updates), 1)
+        self.assertIn(updates[0].args[0]["Status"], ["Positive", "Negative"])
+        self.assertEqual(updates[0].args[1], "12")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the on-disk API doc cache."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import tempfile
+import unittest
+from flock_drone.mechanics.transport import Transport, Response
+from flock_drone.mechanics.doc_cache import DocCacheTransport
+
+VOCAB = "http://localhost:8080/api/vocab"
+DOC = b'{"@id": "http://localhost:8080/api/vocab", "supportedClass": []}'
+
+
+class Controller(Transport):
+    """Controller serving the API doc with an ETag, or down."""
+
+    def __init__(self):
+        self.down = False
+        self.headers = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if self.down:
+            raise ConnectionRefusedError("Connection refused")
+        self.headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return Response(304, "Not Modified", []), b""
+        return Response(200, "OK", [("ETag", '"v1"')]), DOC
+
+
+class TestDocCache(unittest.TestCase):
+    """Test for the API doc cache transport."""
+
+    def test_revalidate_and_cold_start(self):
+        """Test cached docs are revalidated and served while the controller is down."""
+        directory = tempfile.mkdtemp()
+        controller = Controller()
+        self.assertEqual(DocCacheTransport(controller, directory).request(VOCAB)[1], DOC)
+
+        # A restarted drone revalidates the doc instead of downloading it.
+        transport = DocCacheTransport(controller, directory)
+        resp, content = transport.request(VOCAB)
+        self.assertEqual((resp.status, content), (200, DOC))
+        self.assertEqual(controller.headers[-1]["If-None-Match"], '"v1"')
+        self.assertEqual(transport.stats["Revalidated"], 1)
+
+        controller.down = True
+        resp, content = DocCacheTransport(controller, directory).request(VOCAB)
+        self.assertEqual(content, DOC)
+        with self.assertRaises(ConnectionRefusedError):
+            transport.request("http://localhost:8080/api/Datastream")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests for the vectorized fleet engine against the per drone mechanics."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import copy
+import unittest
+import numpy as np
+from flock_drone.settings import DRONE_DEFAULT
+from flock_drone.mechanics import distance
+from flock_drone.mechanics import fleet
+from flock_drone.mechanics.fleet import Fleet
+
+CONTROLLER_LOC = (0.0, 0.0)
+DRONE_BOUNDS = distance.gen_pos_limits_from_square_path(
+    distance.gen_square_path(CONTROLLER_LOC, 10))
+
+
+def gen_drone(position="0,0", battery="100", status="Active", direction="N"):
+    """Generate a drone object with the given state."""
+    drone = copy.deepcopy(DRONE_DEFAULT)
+    drone["State"].update({"Position": position, "Battery": battery,
+                           "Status": status, "Direction": direction})
+    return drone
+
+
+class TestFleet(unittest.TestCase):
+    """Test for the fleet engine."""
+
+    def test_new_coordinates(self):
+        """Test vectorized movement matches distance.get_new_coordinates."""
+        positions = np.array([[10.0, 20.0]] * 4)
+        directions = np.array([fleet.NORTH, fleet.EAST, fleet.SOUTH, fleet.WEST])
+        moved = fleet.get_new_coordinates(positions, np.full(4, 0.5), directions)
+        for i, direction in enumerate(fleet.DIRECTIONS):
+            expected = distance.get_new_coordinates((10.0, 20.0), 0.5, direction)
+            np.testing.assert_allclose(moved[i], expected)
+
+    def test_deg2num(self):
+        """Test vectorized tile indexes match distance.deg2num."""
+        lat = np.array([0.01, -0.02, 0.05])
+        lon = np.array([0.03, 0.04, -0.06])
+        xtile, ytile = fleet.deg2num(lat, lon, 17)
+        for i in range(len(lat)):
+            self.assertEqual((xtile[i], ytile[i]), distance.deg2num(lat[i], lon[i], 17))
+
+    def test_battery(self):
+        """Test battery discharge, charge and status changes."""
+        drones = [gen_drone(battery="100"), gen_drone(battery="20"),
+                  gen_drone(battery="4", status="Inactive"),
+                  gen_drone(battery="96", status="Charging"),
+                  gen_drone(battery="50", status="Off")]
+        fleet_ = Fleet(drones, DRONE_BOUNDS, seed=0)
+        fleet_.handle_battery()
+        states = [drone["State"] for drone in fleet_.to_drones()]
+        self.assertEqual([s["Battery"] for s in states], [99, 18, 3.75, 100, 50])
+        self.assertEqual([s["Status"] for s in states],
+                         ["Active", "Inactive", "Off", "Active", "Off"])
+
+    def test_position_stays_in_bounds(self):
+        """Test drones never leave the drone bounds."""
+        drones = [gen_drone(direction=d) for d in fleet.DIRECTIONS] * 25
+        fleet_ = Fleet(drones, DRONE_BOUNDS, seed=1)
+        for _ in range(200):
+            fleet_.handle_position(15)
+        self.assertTrue(fleet.is_valid_location(fleet_.positions, DRONE_BOUNDS).all())
+        self.assertFalse((fleet_.positions == 0).all())
+
+    def test_low_battery(self):
+        """Test inactive drones head home and start charging when they reach it."""
+        drones = [gen_drone(position="0.05,0", status="Inactive", battery="10"),
+                  gen_drone(position="0,0", status="Inactive", battery="10")]
+        fleet_ = Fleet(drones, DRONE_BOUNDS, seed=0)
+        fleet_.handle_low_battery(CONTROLLER_LOC, 15)
+        self.assertEqual(list(fleet_.statuses), [fleet.INACTIVE, fleet.CHARGING])
+        self.assertEqual(fleet_.directions[0], fleet.SOUTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
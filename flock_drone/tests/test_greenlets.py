@@ -0,0 +1,72 @@
+"""Tests for the drone server endpoint of the greenlets running drone loops."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from unittest import mock
+import gevent
+import gevent.local
+from flock_drone.settings import DRONE_URL
+from flock_drone.mechanics import resources
+
+
+class Resource(object):
+    """Resource which is never fetched."""
+
+    def __init__(self, iri):
+        self.identifier = iri
+
+    @classmethod
+    def from_iri(cls, iri, http=None):
+        return cls(iri)
+
+
+# mechanics.main gets the resources of the servers when imported.
+with mock.patch.object(resources, "Resource", Resource):
+    from flock_drone.mechanics import main
+
+
+class TestGreenlets(unittest.TestCase):
+    """Test for the greenlet local drone server endpoint."""
+
+    def setUp(self):
+        # What threading.local is once gevent patched the stdlib.
+        for patcher in (mock.patch.object(main, "_endpoint", gevent.local.local()),
+                        mock.patch.object(resources, "Resource", Resource)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(resources.invalidate)
+
+    def run_drone(self, drone_url):
+        """Use the drone server at drone_url, let the other greenlets run, return the endpoint."""
+        main.use_drone_endpoint(drone_url)
+        gevent.sleep(0)
+        return (main.get_drone_url(), str(main.get_drone_namespace()),
+                main.get_drone_resource().identifier)
+
+    def test_use_drone_endpoint(self):
+        """Test each greenlet keeps its own drone server."""
+        drone_urls = ["http://localhost:%d" % (port,) for port in range(8081, 8085)]
+        greenlets = [gevent.spawn(self.run_drone, drone_url) for drone_url in drone_urls]
+        gevent.joinall(greenlets, raise_error=True)
+        self.assertEqual([greenlet.value for greenlet in greenlets],
+                         [(drone_url, "%s/api/vocab#" % (drone_url,), "%s/api" % (drone_url,))
+                          for drone_url in drone_urls])
+
+    def test_default_endpoint(self):
+        """Test greenlets which set no drone server use the one of the settings."""
+        main.use_drone_endpoint("http://localhost:8082")
+        greenlet = gevent.spawn(main.get_drone_url)
+        greenlet.join()
+        self.assertEqual(greenlet.value, DRONE_URL)
+        self.assertEqual(main.get_drone_url(), "http://localhost:8082")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Tests for the headless fleet simulation."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+import numpy as np
+from flock_drone.mechanics import fleet
+from flock_drone.mechanics.headless import gen_fleet, run, LOOP_TIME
+
+HOME = (0.0, 0.0)
+
+
+class TestHeadless(unittest.TestCase):
+    """Test for the headless simulation on a simulated clock."""
+
+    def test_run(self):
+        """Test a few simulated minutes of a small fleet."""
+        fleet_ = gen_fleet(20, HOME, seed=0)
+        summary = run(fleet_, 10 * 60, HOME)
+
+        self.assertIn(summary["Ticks"], (40, 41))
+        self.assertEqual(summary["SimulatedTime"], summary["Ticks"] * LOOP_TIME)
+        self.assertLess(summary["WallTime"], 10)
+        self.assertEqual(summary["Statuses"], {"Active": 20, "Inactive": 0, "Confirming": 0,
+                                               "Charging": 0, "Off": 0})
+        # Active drones use 1% of battery per tick.
+        np.testing.assert_array_equal(fleet_.batteries, 100 - summary["Ticks"])
+        self.assertTrue(fleet.is_valid_location(fleet_.positions, fleet_.bounds).all())
+        self.assertTrue((np.abs(fleet_.positions - HOME).sum(axis=1) > 0).all())
+
+    def test_run_low_battery(self):
+        """Test drones stay in bounds and in battery range once their battery runs low."""
+        fleet_ = gen_fleet(20, HOME, seed=1)
+        summary = run(fleet_, 2 * 3600, HOME)
+
+        self.assertEqual(sum(summary["Statuses"].values()), 20)
+        # 480 ticks drain a full battery several times over.
+        self.assertEqual(summary["Ticks"] * LOOP_TIME, summary["SimulatedTime"])
+        self.assertTrue(((fleet_.batteries >= 0) & (fleet_.batteries <= 100)).all())
+        self.assertTrue(fleet.is_valid_location(fleet_.positions, fleet_.bounds).all())
+        self.assertGreaterEqual(summary["Anomalies"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
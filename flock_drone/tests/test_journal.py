@@ -0,0 +1,89 @@
+"""Tests for the local event journal."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import copy
+import shutil
+import tempfile
+import unittest
+from flock_drone.settings import DRONE_DEFAULT
+from flock_drone.mechanics.core import Effect, SEND_DATASTREAM, UPDATE_DRONE
+from flock_drone.mechanics.objects import gen_Datastream
+from flock_drone.mechanics.journal import (Journal, read_journal, query, tick_events, journal_path,
+                                           COMMAND, STATE, DATASTREAM)
+
+
+class TestJournal(unittest.TestCase):
+    """Test for the tick event journal."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "events.fdj")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Test events are read back in order and filtered."""
+        journal = Journal(self.path)
+        journal.append(STATE, {"DroneID": "1", "From": "Active", "To": "Inactive"}, 10.0)
+        journal.append(DATASTREAM, {"DroneID": "2", "Temperature": "40"}, 20.0)
+        journal.append(DATASTREAM, {"DroneID": "1", "Temperature": "41"}, 30.0)
+        journal.close()
+        self.assertEqual([entry["Time"] for entry in read_journal(self.path)], [10.0, 20.0, 30.0])
+        events = list(query(self.path, kinds=[DATASTREAM], drone_id=1, since=15.0))
+        self.assertEqual(events, [{"Kind": DATASTREAM, "Time": 30.0,
+                                   "Event": {"DroneID": "1", "Temperature": "41"}}])
+
+    def test_torn_record(self):
+        """Test reading stops at a record cut by a crash."""
+        journal = Journal(self.path)
+        journal.append(STATE, {"DroneID": "1"}, 1.0)
+        journal.append(STATE, {"DroneID": "1"}, 2.0)
+        journal.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(len(list(read_journal(self.path))), 1)
+
+    def test_rotation(self):
+        """Test the journal is rotated and both parts are queried."""
+        journal = Journal(self.path, max_bytes=100)
+        for i in range(4):
+            journal.append(STATE, {"DroneID": "1", "Index": i}, float(i))
+        journal.close()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertLessEqual(os.path.getsize(self.path), 100)
+        self.assertEqual([entry["Event"]["Index"] for entry in read_journal(self.path + ".1")],
+                         [0, 1])
+        self.assertEqual([entry["Event"]["Index"] for entry in query(self.path)], [0, 1, 2, 3])
+
+    def test_journal_path(self):
+        """Test each drone server gets its own journal."""
+        path = os.path.join(self.directory, "events.fdj")
+        self.assertEqual(journal_path("http://localhost:8081", path),
+                         os.path.join(self.directory, "events-localhost_8081.fdj"))
+        self.assertNotEqual(journal_path("http://localhost:8081", path),
+                            journal_path("http://localhost:8082", path))
+
+    def test_tick_events(self):
+        """Test the events of a tick from step() inputs and results."""
+        drone = copy.deepcopy(DRONE_DEFAULT)
+        new_drone = copy.deepcopy(drone)
+        new_drone["State"]["Status"] = "Off"
+        command = {"DroneID": drone["DroneID"], "State": {"Status": "Off"}}
+        datastream = gen_Datastream("40", "0,0", drone["DroneID"])
+        inputs = {"CommandIDs": ["1"], "Command": command}
+        effects = [Effect(UPDATE_DRONE, (new_drone,)), Effect(SEND_DATASTREAM, (datastream,))]
+        events = tick_events(drone, new_drone, inputs, effects)
+        self.assertEqual([kind for kind, event in events], [COMMAND, STATE, DATASTREAM])
+        self.assertEqual(events[1][1]["To"], "Off")
+
+
+if __name__ == '__main__':
+    unittest.main()
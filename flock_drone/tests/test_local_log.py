@@ -0,0 +1,74 @@
+"""Tests for the local structured logging."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import io
+import json
+import logging
+import queue
+import subprocess
+import unittest
+from flock_drone.mechanics import local_log
+from flock_drone.mechanics.local_log import get_logger, fields, configure, DroppingQueueHandler
+
+
+class TestLocalLog(unittest.TestCase):
+    """Test for the local logs of the mechanics."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = get_logger("flock_drone.mechanics.core")
+
+    def tearDown(self):
+        local_log.shutdown()
+
+    def written(self):
+        local_log.LISTENER.stop()
+        local_log.LISTENER = None
+        return self.stream.getvalue().splitlines()
+
+    def test_text(self):
+        """Test records are gated by level and written with their fields."""
+        configure(level="INFO", format_="text", stream=self.stream)
+        self.logger.debug("Anomaly grid test", extra=fields(Test=35))
+        self.logger.info("New anomaly created", extra=fields(Location="1,2"))
+        lines = self.written()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith('INFO flock_drone.core New anomaly created Location="1,2"'))
+
+    def test_json(self):
+        """Test records formatted as JSON objects."""
+        configure(level="DEBUG", format_="json", stream=self.stream)
+        anomaly = {"Status": "Confirming"}
+        self.logger.debug("Updating anomaly", extra=fields(Anomaly=anomaly))
+        anomaly["Status"] = "Positive"
+        entry = json.loads(self.written()[0])
+        self.assertEqual(entry["Level"], "DEBUG")
+        self.assertEqual(entry["Message"], "Updating anomaly")
+        self.assertEqual(entry["Anomaly"], {"Status": "Confirming"})
+
+    def test_no_thread_at_import(self):
+        """Test importing the mechanics starts no thread, so that gevent can patch them later."""
+        count = subprocess.check_output([
+            sys.executable, "-c",
+            "import sys, threading; sys.path.insert(0, %r); "
+            "import flock_drone.mechanics.shards; print(threading.active_count())" % (superParentDir,)])
+        self.assertEqual(count.strip(), b"1")
+
+    def test_dropping(self):
+        """Test records are dropped when the queue is full."""
+        handler = DroppingQueueHandler(queue.Queue(1))
+        record = logging.LogRecord("flock_drone", logging.INFO, __file__, 1, "msg", None, None)
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
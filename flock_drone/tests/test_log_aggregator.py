@@ -0,0 +1,64 @@
+"""Tests for the HttpApiLog aggregation and sampling."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from flock_drone.mechanics.log_aggregator import HttpApiLogAggregator
+from flock_drone.mechanics.objects import gen_HttpApiLog
+
+
+class TestLogAggregator(unittest.TestCase):
+    """Test for the HttpApiLog aggregator."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.log = gen_HttpApiLog("Drone 1", "PUT DroneLog", "Controller")
+        self.other = gen_HttpApiLog("Drone 1", "POST Drone", "Controller")
+
+    def test_window(self):
+        """Test identical triples of a window are shipped once, unchanged, with their count logged."""
+        aggregator = HttpApiLogAggregator(window=60, sampling={}, clock=lambda: self.now)
+        for i in range(12):
+            self.assertEqual(aggregator.add(self.log), [])
+            self.now += 1
+        aggregator.add(self.other)
+        self.now = 61
+        with self.assertLogs("flock_drone.log_aggregator", "DEBUG") as logs:
+            records = aggregator.add(self.log)
+        self.assertEqual(records, [self.log, self.other])
+        self.assertEqual([record.fields["Count"] for record in logs.records], [13, 1])
+        self.assertEqual(aggregator.stats["Aggregated"], 12)
+        self.assertEqual(aggregator.flush(), [])
+
+    def test_expired(self):
+        """Test a window is only returned by expired() once it is over."""
+        aggregator = HttpApiLogAggregator(window=60, sampling={}, clock=lambda: self.now)
+        self.assertEqual(aggregator.expired(), [])
+        aggregator.add(self.log)
+        self.now = 59
+        self.assertEqual(aggregator.expired(), [])
+        self.now = 60
+        self.assertEqual(aggregator.expired(), [self.log])
+        self.assertEqual(aggregator.expired(), [])
+
+    def test_sampling(self):
+        """Test sampled out records are dropped and kept ones scaled up."""
+        draws = iter([0.5, 0.05, 0.9, 0.01])
+        aggregator = HttpApiLogAggregator(window=60, sampling={"PUT DroneLog": 0.1},
+                                          clock=lambda: self.now, rand=lambda: next(draws))
+        for i in range(4):
+            aggregator.add(self.log)
+        with self.assertLogs("flock_drone.log_aggregator", "DEBUG") as logs:
+            self.assertEqual(aggregator.flush(), [self.log])
+        self.assertEqual(logs.records[0].fields["Count"], 20)
+        self.assertEqual(aggregator.stats["SampledOut"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
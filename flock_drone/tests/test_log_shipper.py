@@ -0,0 +1,74 @@
+"""Tests for the background log shipper."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import threading
+import unittest
+from flock_drone.mechanics.log_shipper import LogShipper
+from flock_drone.mechanics.objects import gen_DroneLog
+
+
+class TestLogShipper(unittest.TestCase):
+    """Test for the log shipper."""
+
+    def test_batches(self):
+        """Test logs are sent in order, in batches of at most batch_size."""
+        sent = []
+        shipper = LogShipper({"DroneLog": lambda log: sent.append(log) or "location"},
+                             batch_size=4, flush_interval=0.05)
+        logs = [gen_DroneLog("1", str(i)) for i in range(10)]
+        for log in logs:
+            self.assertTrue(shipper.submit("DroneLog", log))
+        shipper.flush()
+        shipper.stop()
+        self.assertEqual(sent, logs)
+        self.assertEqual(shipper.stats["DroneLog"]["Sent"], 10)
+        self.assertGreaterEqual(shipper.stats["DroneLog"]["Batches"], 3)
+
+    def test_poll(self):
+        """Test the logs returned by poll are sent without any log being submitted."""
+        sent = threading.Event()
+        polled = [[("HttpApiLog", {"Predicate": "PUT DroneLog (x12)"})]]
+        shipper = LogShipper({"HttpApiLog": lambda log: sent.set() or "location"},
+                             flush_interval=0.01, poll=lambda: polled.pop() if polled else [])
+        shipper.start()
+        self.assertTrue(sent.wait(5))
+        shipper.stop()
+        self.assertEqual(shipper.stats["HttpApiLog"]["Sent"], 1)
+
+    def test_drop_when_full(self):
+        """Test logs submitted while the queue is full are dropped and counted."""
+        blocked = threading.Event()
+        shipper = LogShipper({"HttpApiLog": lambda log: blocked.wait()},
+                             max_queue=2, batch_size=1, flush_interval=0.05)
+        results = [shipper.submit("HttpApiLog", {"Predicate": str(i)}) for i in range(10)]
+        blocked.set()
+        shipper.stop()
+        self.assertFalse(all(results))
+        self.assertEqual(shipper.stats["HttpApiLog"]["Dropped"], results.count(False))
+        self.assertEqual(shipper.stats["HttpApiLog"]["Queued"], results.count(True))
+
+    def test_report_dropped(self):
+        """Test every dropped log is reported once."""
+        blocked = threading.Event()
+        shipper = LogShipper({"DroneLog": lambda log: blocked.wait()},
+                             max_queue=2, batch_size=1, flush_interval=0.01)
+        with self.assertLogs("flock_drone.log_shipper", "WARNING") as logs:
+            for i in range(10):
+                shipper.submit("DroneLog", gen_DroneLog("1", str(i)))
+            blocked.set()
+            shipper.stop()
+        reported = sum(int(line.split("Dropped ")[1].split()[0]) for line in logs.output)
+        self.assertEqual(reported, shipper.stats["DroneLog"]["Dropped"])
+        with self.assertNoLogs("flock_drone.log_shipper", "WARNING"):
+            shipper.report_dropped()
+
+
+if __name__ == '__main__':
+    unittest.main()
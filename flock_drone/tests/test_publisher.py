@@ -0,0 +1,60 @@
+"""Tests for the serialize-once fan-out publisher."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import json
+import unittest
+from flock_drone.settings import DRONE_DEFAULT
+from flock_drone.mechanics.codec import dumps
+from flock_drone.mechanics.objects import gen_Datastream
+from flock_drone.mechanics.transport import RecordedTransport
+from flock_drone.mechanics.publisher import gen_drone_publisher
+
+DRONE_URL = "http://localhost:8081"
+MIRROR = "http://localhost:9000/api/Drone"
+CONTROLLER = "http://localhost:8080/api/DroneCollection/-1000"
+
+
+class TestPublisher(unittest.TestCase):
+    """Test for the drone publisher."""
+
+    def setUp(self):
+        self.encoded = []
+
+        def encode(obj):
+            self.encoded.append(obj)
+            return dumps(obj)
+
+        self.transport = RecordedTransport()
+        self.transport.record("POST", DRONE_URL + "/api/TickUpdate")
+        self.transport.record("POST", MIRROR)
+        self.publisher = gen_drone_publisher([MIRROR])
+        self.publisher.transport = self.transport
+        self.publisher.encode = encode
+
+    def test_fan_out(self):
+        """Test the drone is encoded once and each target reported separately."""
+        datastream = gen_Datastream("20", "0,0", "-1000")
+        deliveries = self.publisher.publish(
+            DRONE_DEFAULT, {"DroneURL": DRONE_URL, "Datastream": datastream})
+
+        self.assertEqual(self.encoded, [DRONE_DEFAULT])
+        self.assertEqual(sorted(deliveries), sorted(["Local", "Controller", MIRROR]))
+        self.assertIsNone(deliveries["Local"]["Error"])
+        self.assertEqual(deliveries["Controller"]["Status"], 404)
+        self.assertEqual(self.publisher.stats["Controller"]["Failed"], 1)
+
+        bodies = dict((uri, body) for method, uri, body in self.transport.requests)
+        self.assertEqual(json.loads(bodies[DRONE_URL + "/api/TickUpdate"].decode("utf-8")),
+                         {"@type": "TickUpdate", "Drone": DRONE_DEFAULT, "Datastream": datastream})
+        self.assertIs(bodies[MIRROR], bodies[CONTROLLER])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for the controller request retries and circuit breakers."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from flock_drone.mechanics.transport import RecordedTransport
+from flock_drone.mechanics.resilience import (ResilientTransport, CircuitBreaker, CircuitOpenError,
+                                              OPEN, HALF_OPEN, CLOSED, gen_BreakerStats,
+                                              aggregate_BreakerStats)
+
+DATASTREAM = "http://localhost:8080/api/Datastream"
+
+
+class TestResilience(unittest.TestCase):
+    """Test for the retries and the circuit breaker."""
+
+    def test_retry(self):
+        """Test an idempotent request is retried until it succeeds, an add is not."""
+        controller = RecordedTransport()
+        controller.record("POST", DATASTREAM + "/1", 503)
+        controller.record("POST", DATASTREAM + "/1", 200)
+        controller.record("PUT", DATASTREAM, 503)
+        transport = ResilientTransport(controller, attempts=3, sleep=lambda seconds: None)
+
+        resp, content = transport.request(DATASTREAM + "/1", "POST", "{}")
+        self.assertEqual(resp.status, 200)
+        resp, content = transport.request(DATASTREAM, "PUT", "{}")
+        self.assertEqual(resp.status, 503)
+        self.assertEqual(len(controller.requests), 3)
+        self.assertEqual(transport.metrics()["http://localhost:8080/api/Datastream"]["Retries"], 1)
+
+    def test_breaker(self):
+        """Test the breaker opens, fails fast, and closes after a successful trial."""
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=2, reset=30, clock=lambda: now[0])
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.stats["State"], OPEN)
+        self.assertFalse(breaker.allow())
+
+        now[0] = 31
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.stats["State"], HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.stats["State"], CLOSED)
+        self.assertEqual(breaker.stats["Rejected"], 2)
+
+    def test_fail_fast(self):
+        """Test requests to an endpoint with an open breaker are not made."""
+        controller = RecordedTransport()
+        controller.record("PUT", DATASTREAM, 500)
+        transport = ResilientTransport(controller, attempts=1)
+        for i in range(5):
+            transport.request(DATASTREAM, "PUT", "{}")
+        with self.assertRaises(CircuitOpenError):
+            transport.request(DATASTREAM, "PUT", "{}")
+        self.assertEqual(len(controller.requests), 5)
+
+    def test_failure_per_request(self):
+        """Test a request counts as one failure once its retries are exhausted."""
+        controller = RecordedTransport()
+        controller.record("POST", DATASTREAM + "/1", 503)
+        transport = ResilientTransport(controller, attempts=3, sleep=lambda seconds: None)
+        transport.request(DATASTREAM + "/1", "POST", "{}")
+        transport.request(DATASTREAM + "/1", "POST", "{}")
+        stats = transport.metrics()[DATASTREAM]
+        self.assertEqual(len(controller.requests), 6)
+        self.assertEqual((stats["Failures"], stats["Retries"], stats["State"]), (2, 4, CLOSED))
+
+    def test_half_open_retry(self):
+        """Test the trial request of a half open breaker is retried before the breaker opens again."""
+        controller = RecordedTransport()
+        controller.record("POST", DATASTREAM + "/1", 503)
+        controller.record("POST", DATASTREAM + "/1", 200)
+        transport = ResilientTransport(controller, attempts=3, sleep=lambda seconds: None)
+        breaker = transport.breaker(DATASTREAM)
+        breaker.stats["State"] = HALF_OPEN
+        resp, content = transport.request(DATASTREAM + "/1", "POST", "{}")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(breaker.stats["State"], CLOSED)
+        self.assertEqual(breaker.stats["Failures"], 0)
+
+    def test_aggregate(self):
+        """Test breaker statistics are added and the most severe state kept."""
+        closed, half_open = gen_BreakerStats(), gen_BreakerStats()
+        closed.update({"Failures": 2, "Successes": 10})
+        half_open.update({"State": HALF_OPEN, "Failures": 5, "ConsecutiveFailures": 5, "Opened": 1})
+        stats = aggregate_BreakerStats([closed, half_open])
+        self.assertEqual(stats["State"], HALF_OPEN)
+        self.assertEqual((stats["Failures"], stats["Successes"], stats["Opened"]), (7, 10, 1))
+        self.assertEqual(stats["ConsecutiveFailures"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
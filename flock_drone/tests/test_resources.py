@@ -0,0 +1,87 @@
+"""Tests for the pool of hydra resources and operations."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from unittest import mock
+from flock_drone.mechanics import resources
+
+
+class Resource(object):
+    """Resource counting the lookups of its operations."""
+
+    fetched = []
+
+    def __init__(self, iri):
+        self.identifier = iri
+        self.lookups = 0
+
+    @classmethod
+    def from_iri(cls, iri, http=None):
+        cls.fetched.append(iri)
+        return cls(iri)
+
+    def find_suitable_operation(self, operation_type=None, input_type=None, output_type=None):
+        self.lookups += 1
+        if operation_type is None and input_type is None and output_type is None:
+            return None
+        return (self.identifier, operation_type, input_type, output_type)
+
+
+class TestResources(unittest.TestCase):
+    """Test for the memoized resources and operations."""
+
+    def setUp(self):
+        Resource.fetched = []
+        patcher = mock.patch.object(resources, "Resource", Resource)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        resources.invalidate()
+        self.addCleanup(resources.invalidate)
+
+    def test_get_resource(self):
+        """Test a resource is fetched once per IRI."""
+        drone = resources.get_resource("http://localhost:8081/api")
+        self.assertIs(resources.get_resource("http://localhost:8081/api"), drone)
+        resources.get_resource("http://localhost:8080/api")
+        self.assertEqual(Resource.fetched, ["http://localhost:8081/api", "http://localhost:8080/api"])
+
+    def test_find_operation(self):
+        """Test operations are looked up once per types, missing ones every time."""
+        drone = resources.get_resource("http://localhost:8081/api")
+        operation = resources.find_operation(drone, "UpdateAction", "Drone")
+        self.assertIs(resources.find_operation(drone, "UpdateAction", "Drone"), operation)
+        self.assertEqual(drone.lookups, 1)
+        resources.find_operation(drone, "UpdateAction", "Datastream")
+        self.assertEqual(drone.lookups, 2)
+        self.assertIsNone(resources.find_operation(drone))
+        self.assertIsNone(resources.find_operation(drone))
+        self.assertEqual(drone.lookups, 4)
+
+    def test_invalidate(self):
+        """Test invalidating an IRI only drops its resource and operations."""
+        drone = resources.get_resource("http://localhost:8081/api")
+        controller = resources.get_resource("http://localhost:8080/api")
+        resources.find_operation(drone, "UpdateAction", "Drone")
+        resources.find_operation(controller, "AddAction", "Datastream")
+
+        resources.invalidate("http://localhost:8081/api")
+        self.assertIsNot(resources.get_resource("http://localhost:8081/api"), drone)
+        self.assertIs(resources.get_resource("http://localhost:8080/api"), controller)
+        resources.find_operation(drone, "UpdateAction", "Drone")
+        resources.find_operation(controller, "AddAction", "Datastream")
+        self.assertEqual((drone.lookups, controller.lookups), (2, 1))
+
+        resources.invalidate()
+        self.assertIsNot(resources.get_resource("http://localhost:8080/api"), controller)
+        self.assertEqual(len(Resource.fetched), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
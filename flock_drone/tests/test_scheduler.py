@@ -0,0 +1,73 @@
+"""Tests for the fixed rate tick scheduler."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import threading
+import time
+import unittest
+from flock_drone.mechanics.scheduler import TickScheduler
+from flock_drone.mechanics.clock import SimClock
+
+
+class TestTickScheduler(unittest.TestCase):
+    """Test for the tick scheduler."""
+
+    def test_fixed_rate(self):
+        """Test ticks keep their deadlines and run on one thread."""
+        starts, threads = [], set()
+
+        def tick():
+            starts.append(time.monotonic())
+            threads.add(threading.get_ident())
+            time.sleep(0.01)
+
+        scheduler = TickScheduler(tick, 0.05)
+        scheduler.start()
+        time.sleep(0.32)
+        scheduler.stop()
+        self.assertGreaterEqual(len(starts), 6)
+        self.assertEqual(len(threads), 1)
+        # No drift, the n-th tick starts n intervals after the first one.
+        self.assertLess(abs(starts[-1] - starts[0] - 0.05 * (len(starts) - 1)), 0.03)
+
+    def test_overrun(self):
+        """Test overrunning ticks are counted and missed deadlines dropped."""
+        scheduler = TickScheduler(lambda: time.sleep(0.12), 0.05)
+        scheduler.start()
+        time.sleep(0.3)
+        scheduler.stop()
+        self.assertGreaterEqual(scheduler.stats["Overruns"], 2)
+        self.assertGreaterEqual(scheduler.stats["Missed"], 2)
+
+    def test_single_flight(self):
+        """Test a tick is skipped while another one is running."""
+        release = threading.Event()
+        scheduler = TickScheduler(release.wait, 1)
+        worker = threading.Thread(target=scheduler.run_once)
+        worker.start()
+        time.sleep(0.05)
+        self.assertFalse(scheduler.run_once())
+        release.set()
+        worker.join()
+        self.assertEqual(scheduler.stats["Skipped"], 1)
+        self.assertEqual(scheduler.stats["Ticks"], 1)
+
+    def test_simulated_clock(self):
+        """Test an hour of 15 second ticks runs at once on a simulated clock."""
+        clock = SimClock()
+        times = []
+        scheduler = TickScheduler(lambda: times.append(clock.now()), 15, clock=clock)
+        start = time.monotonic()
+        scheduler.run(until=3600)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(times, [15.0 * i for i in range(240)])
+
+
+if __name__ == '__main__':
+    unittest.main()
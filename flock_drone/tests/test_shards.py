@@ -0,0 +1,81 @@
+"""Tests for the sharded fleet runner."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import time
+import unittest
+from flock_drone.mechanics.scheduler import gen_TickStats
+from flock_drone.mechanics.resilience import gen_BreakerStats, OPEN, CLOSED
+from flock_drone.mechanics.shards import partition, aggregate_reports, gen_ShardReport
+
+DATASTREAM = "http://localhost:8080/api/Datastream"
+DRONE = "http://localhost:8080/api/Drone"
+
+
+class Process(object):
+    """Process which is alive or not."""
+
+    def __init__(self, alive=True):
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+
+def gen_stats(ticks, max_duration):
+    """Generate tick statistics with ticks and max_duration."""
+    stats = gen_TickStats()
+    stats.update({"Ticks": ticks, "MaxDuration": max_duration})
+    return stats
+
+
+class TestShards(unittest.TestCase):
+    """Test for the shard partition and the report aggregation."""
+
+    def test_partition(self):
+        """Test every drone is in one shard and shards differ by one drone at most."""
+        drone_urls = ["http://localhost:%d" % (port,) for port in range(8081, 8091)]
+        shards = partition(drone_urls, 3)
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sorted(sum(shards, [])), sorted(drone_urls))
+        self.assertEqual([len(shard) for shard in shards], [4, 3, 3])
+
+    def test_partition_few_drones(self):
+        """Test there are no empty shards and always one shard."""
+        self.assertEqual(partition(["a", "b"], 8), [["a"], ["b"]])
+        self.assertEqual(partition(["a", "b"], 0), [["a", "b"]])
+
+    def test_aggregate_reports(self):
+        """Test reports are summed and shards are told healthy, silent or dead."""
+        open_, closed = gen_BreakerStats(), gen_BreakerStats()
+        open_.update({"State": OPEN, "Failures": 5, "Opened": 1})
+        closed.update({"Failures": 1, "Successes": 20})
+        reports = {
+            0: gen_ShardReport(0, 4, 4, gen_stats(10, 1.5), {DATASTREAM: open_}),
+            1: gen_ShardReport(1, 3, 2, gen_stats(5, 2.5), {DATASTREAM: closed, DRONE: closed}),
+            2: gen_ShardReport(2, 3, 0, gen_stats(1, 0.5)),
+        }
+        reports[1]["Time"] = time.time() - 3 * 60
+        processes = [Process(), Process(), Process(alive=False), Process()]
+        summary = aggregate_reports(reports, processes, report_interval=60)
+
+        self.assertEqual(summary["Shards"], 4)
+        self.assertEqual(summary["Health"], {0: "Healthy", 1: "Silent", 2: "Dead", 3: "Silent"})
+        self.assertEqual(summary["Drones"], 10)
+        self.assertEqual(summary["Alive"], 6)
+        self.assertEqual(summary["Stats"]["Ticks"], 16)
+        self.assertEqual(summary["Stats"]["MaxDuration"], 2.5)
+        self.assertEqual(sorted(summary["Breakers"]), [DATASTREAM, DRONE])
+        self.assertEqual(summary["Breakers"][DATASTREAM]["State"], OPEN)
+        self.assertEqual(summary["Breakers"][DATASTREAM]["Failures"], 6)
+        self.assertEqual(summary["Breakers"][DRONE]["State"], CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Tests for the spool of the controller messages."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from flock_drone.mechanics import spool as spool_module
+from flock_drone.mechanics.codec import dumps
+from flock_drone.mechanics.spool import Spool, get_spool, spool_message
+from flock_drone.mechanics.transport import RequestError, check_response, Response
+
+POLICY = {
+    "UpdateDroneAtController": "latest",
+    "SendAnomaly": "keep",
+    "SendDatastream": "drop",
+}
+
+
+def gen_message(drone_id, value):
+    return {"DroneID": drone_id, "Value": value}
+
+
+class TestSpool(unittest.TestCase):
+    """Test for the disk-backed spool."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sent = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def sender(self, kind, error=None):
+        def send(message, *args):
+            if error is not None:
+                raise error
+            self.sent.append((kind, message["Value"]))
+        return send
+
+    def senders(self, error=None):
+        return dict((kind, self.sender(kind, error)) for kind in POLICY)
+
+    def test_replay(self):
+        """Test messages are replayed in order, after a restart, and kept on failure."""
+        spool = Spool(self.directory, policy=POLICY)
+        spool.put("SendDatastream", (gen_message("1", 1),))
+        spool.put("SendAnomaly", (gen_message("1", 2), "1"))
+        spool.put("SendDatastream", (gen_message("1", 3),))
+
+        self.assertEqual(spool.replay(self.senders(ConnectionRefusedError())), 0)
+        spool = Spool(self.directory, policy=POLICY)
+        self.assertEqual(len(spool), 3)
+        self.assertEqual(spool.replay(self.senders(), limit=2), 2)
+        self.assertEqual(spool.replay(self.senders()), 1)
+        self.assertEqual(self.sent, [("SendDatastream", 1), ("SendAnomaly", 2), ("SendDatastream", 3)])
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_rejected(self):
+        """Test messages rejected by the controller are dropped."""
+        spool = Spool(self.directory, policy=POLICY)
+        spool.put("SendDatastream", (gen_message("1", 1),))
+        self.assertEqual(spool.replay(self.senders(RequestError(400, "400 Bad Request"))), 0)
+        self.assertEqual(len(spool), 0)
+        self.assertEqual(spool.stats["Rejected"], 1)
+
+    def test_latest(self):
+        """Test only the last drone update of each drone is kept."""
+        spool = Spool(self.directory, policy=POLICY)
+        spool.put("UpdateDroneAtController", (gen_message("1", 1), "1"))
+        spool.put("UpdateDroneAtController", (gen_message("2", 2), "2"))
+        spool.put("UpdateDroneAtController", (gen_message("1", 3), "1"))
+        spool.replay(self.senders())
+        self.assertEqual(self.sent, [("UpdateDroneAtController", 2), ("UpdateDroneAtController", 3)])
+
+    def test_latest_anomaly(self):
+        """Test the updates of different anomalies of a drone don't replace each other."""
+        spool = Spool(self.directory, policy=dict(POLICY, UpdateAnomalyAtController="latest"))
+        for anomaly_id, value in [("1", 1), ("2", 2), ("1", 3)]:
+            anomaly = dict(gen_message("1", value), AnomalyID=anomaly_id)
+            spool.put("UpdateAnomalyAtController", (anomaly, anomaly_id, "1"))
+        self.assertEqual(len(spool), 2)
+
+    def test_eviction(self):
+        """Test datastreams are evicted first and never evict anomalies."""
+        size = len(dumps({"Kind": "SendAnomaly", "Args": [gen_message("1", 0), "1"]}))
+        spool = Spool(self.directory, max_bytes=3 * size, policy=POLICY)
+        spool.put("SendDatastream", (gen_message("1", 0),))
+        spool.put("SendAnomaly", (gen_message("1", 1), "1"))
+        spool.put("SendAnomaly", (gen_message("1", 2), "1"))
+        self.assertTrue(spool.put("SendAnomaly", (gen_message("1", 3), "1")))
+        self.assertFalse(spool.put("SendDatastream", (gen_message("1", 4),)))
+        spool.replay(self.senders())
+        self.assertEqual(self.sent, [("SendAnomaly", 1), ("SendAnomaly", 2), ("SendAnomaly", 3)])
+        self.assertEqual(spool.stats["Evicted"], 1)
+        self.assertEqual(spool.stats["Dropped"], 1)
+
+    def test_spool_message(self):
+        """Test messages rejected with a 4xx status are not spooled, server and connection errors are."""
+        drone_url = "http://localhost:8081"
+        message = gen_message("1", 1)
+        with mock.patch.object(spool_module, "SPOOL_DIR", self.directory), \
+                mock.patch.dict(spool_module.SPOOLS, clear=True):
+            with self.assertRaises(RequestError) as context:
+                check_response(Response(404, "Not Found", []))
+            self.assertFalse(spool_message(drone_url, "SendDatastream", (message,), context.exception))
+            self.assertEqual(len(get_spool(drone_url)), 0)
+
+            self.assertTrue(spool_message(drone_url, "SendDatastream", (message,),
+                                          RequestError(503, "503 Service Unavailable")))
+            self.assertTrue(spool_message(drone_url, "SendDatastream", (message,),
+                                          ConnectionRefusedError()))
+            self.assertEqual(len(get_spool(drone_url)), 2)
+
+    def test_per_drone(self):
+        """Test each drone server gets its own spool directory."""
+        with mock.patch.object(spool_module, "SPOOL_DIR", self.directory), \
+                mock.patch.dict(spool_module.SPOOLS, clear=True):
+            first = get_spool("http://localhost:8081")
+            second = get_spool("http://localhost:8082")
+            self.assertIs(get_spool("http://localhost:8081"), first)
+            first.put("SendDatastream", (gen_message("1", 1),))
+            second.put("SendDatastream", (gen_message("2", 2),))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["localhost_8081", "localhost_8082"])
+        self.assertEqual(len(Spool(os.path.join(self.directory, "localhost_8081"))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
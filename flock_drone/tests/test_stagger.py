@@ -0,0 +1,54 @@
+"""Tests for the staggering of the drone ticks."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from flock_drone.mechanics.stagger import phase_offset, rate_smoothness
+
+DRONE_URLS = ["http://localhost:%d" % (port,) for port in range(8081, 9081)]
+
+
+class TestStagger(unittest.TestCase):
+    """Test for the tick phases and the request rate report."""
+
+    def test_phase_offset(self):
+        """Test offsets only depend on the key and fall in [0, period)."""
+        offsets = [phase_offset(drone_url, 15) for drone_url in DRONE_URLS]
+        self.assertEqual(offsets, [phase_offset(drone_url, 15) for drone_url in DRONE_URLS])
+        self.assertTrue(all(0 <= offset < 15 for offset in offsets))
+        self.assertEqual(phase_offset(1, 15), phase_offset("1", 15))
+        self.assertNotEqual(phase_offset(DRONE_URLS[0], 15), phase_offset(DRONE_URLS[1], 15))
+        # The same fraction of the period whatever the period.
+        self.assertAlmostEqual(phase_offset(DRONE_URLS[0], 30), 2 * offsets[0])
+
+    def test_phase_spread(self):
+        """Test the offsets of a fleet spread over the period."""
+        phases = [phase_offset(drone_url, 15) for drone_url in DRONE_URLS]
+        self.assertLess(rate_smoothness(phases, 15)["PeakToMean"], 1.5)
+
+    def test_rate_smoothness(self):
+        """Test ticks together peak at one bin and evenly spaced ticks are smooth."""
+        together = rate_smoothness([0.0] * 15, 15)
+        self.assertEqual(together["PeakToMean"], 15)
+        self.assertAlmostEqual(together["CoefficientOfVariation"], 14 ** 0.5)
+        smooth = rate_smoothness([i + 0.5 for i in range(15)], 15)
+        self.assertEqual((smooth["PeakToMean"], smooth["CoefficientOfVariation"]), (1.0, 0.0))
+        self.assertEqual(rate_smoothness([], 15)["PeakToMean"], 0.0)
+
+    def test_rate_smoothness_jitter(self):
+        """Test jitter spreads a tick over the bins it covers, wrapping around the period."""
+        report = rate_smoothness([14.0], 15, bins=15, jitter=2.0)
+        # Half a tick in the last bin and half in the first, out of 1 / 15 per bin.
+        self.assertAlmostEqual(report["PeakToMean"], 7.5)
+        smooth = rate_smoothness([0.0], 15, bins=15, jitter=15.0)
+        self.assertAlmostEqual(smooth["CoefficientOfVariation"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Tests for the tick scoped read cache."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import unittest
+from flock_drone.mechanics.tick_cache import tick_cache, cached, invalidates
+
+
+class TestTickCache(unittest.TestCase):
+    """Test for the tick cache decorators."""
+
+    def setUp(self):
+        self.server = {"Battery": 100}
+        self.reads = 0
+
+        @cached
+        def get_drone():
+            self.reads += 1
+            return dict(self.server)
+
+        @invalidates("get_drone")
+        def update_drone(drone):
+            self.server.update(drone)
+
+        self.get_drone = get_drone
+        self.update_drone = update_drone
+
+    def test_read_once_per_tick(self):
+        """Test a read is made once inside a tick and every time outside of it."""
+        with tick_cache():
+            self.get_drone()["Battery"] = 0
+            self.assertEqual(self.get_drone(), {"Battery": 100})
+        self.assertEqual(self.reads, 1)
+        self.get_drone()
+        self.get_drone()
+        self.assertEqual(self.reads, 3)
+
+    def test_write_invalidates(self):
+        """Test a write drops the cached read."""
+        with tick_cache():
+            self.get_drone()
+            self.update_drone({"Battery": 99})
+            self.assertEqual(self.get_drone(), {"Battery": 99})
+        self.assertEqual(self.reads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for the composite TickUpdate endpoint."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import json
+import unittest
+from flock_drone.tick_update import TickUpdateMiddleware
+from flock_drone.mechanics.transport import WsgiTransport
+from flock_drone.mechanics.objects import gen_TickUpdate, gen_Datastream
+from flock_drone.settings import DRONE_DEFAULT
+
+TICK_UPDATE = "http://localhost:8081/api/TickUpdate"
+
+
+class Session(object):
+    """Session keeping the calls made to it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def flush(self):
+        self.calls.append("flush")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+class ScopedSession(object):
+    """scoped_session with a Session per scope, the scope of the current request."""
+
+    def __init__(self):
+        self.scope = "request"
+        self.sessions = dict()
+        self.removed = []
+
+    def __call__(self):
+        if self.scope not in self.sessions:
+            self.sessions[self.scope] = Session()
+        return self.sessions[self.scope]
+
+    def commit(self):
+        self().commit()
+
+    def remove(self):
+        self.removed.append(self.scope)
+
+
+class TestTickUpdate(unittest.TestCase):
+    """Test for the TickUpdate middleware."""
+
+    def setUp(self):
+        self.session = ScopedSession()
+        self.updated = []
+        self.fail = None
+
+        def hydrus(environ, start_response):
+            """Commit each update like hydrus, failing the path in self.fail."""
+            body = environ["wsgi.input"].read(int(environ["CONTENT_LENGTH"]))
+            if environ["PATH_INFO"] == self.fail:
+                start_response("400 Bad Request", [])
+                return [b"Invalid"]
+            self.updated.append((environ["PATH_INFO"], json.loads(body.decode("utf-8"))))
+            self.session.commit()
+            # A request served concurrently commits its own session.
+            self.session.scope = "other"
+            self.session.commit()
+            self.session.scope = "request"
+            start_response("200 OK", [])
+            return [b"{}"]
+
+        self.transport = WsgiTransport(TickUpdateMiddleware(hydrus, self.session))
+        self.datastream = gen_Datastream("20", "0,0", "-1000")
+
+    def post(self, tick_update):
+        return self.transport.request(TICK_UPDATE, "POST", json.dumps(tick_update))
+
+    def test_single_transaction(self):
+        """Test both updates are applied and committed once."""
+        resp, content = self.post(gen_TickUpdate(DRONE_DEFAULT, self.datastream))
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(self.updated, [("/api/Drone", DRONE_DEFAULT),
+                                        ("/api/Datastream", self.datastream)])
+        self.assertEqual(self.session.sessions["request"].calls, ["flush", "flush", "commit"])
+        self.assertEqual(self.session.sessions["other"].calls, ["commit", "commit"])
+        self.assertEqual(self.session.removed, ["request"])
+
+    def test_rollback(self):
+        """Test a failed update rolls back the whole TickUpdate."""
+        self.fail = "/api/Datastream"
+        resp, content = self.post(gen_TickUpdate(DRONE_DEFAULT, self.datastream))
+        self.assertEqual(resp.status, 400)
+        self.assertEqual(self.session.sessions["request"].calls, ["flush", "rollback"])
+        self.assertEqual(self.session.sessions["other"].calls, ["commit"])
+        resp, content = self.post({"@type": "TickUpdate"})
+        self.assertEqual(resp.status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for the mechanics transports."""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+# this will return parent directory.
+superParentDir = os.path.abspath(os.path.join(parentDir, os.pardir))
+sys.path.insert(0, superParentDir)
+
+import json
+import unittest
+from flock_drone.compression import GzipMiddleware
+from flock_drone.mechanics.transport import (WsgiTransport, RecordedTransport, RoutingTransport,
+                                             CompressedTransport, RedirectingTransport)
+
+
+def echo_app(environ, start_response):
+    """WSGI app answering with the request it got."""
+    body = environ["wsgi.input"].read(int(environ["CONTENT_LENGTH"] or 0))
+    echo = {
+        "method": environ["REQUEST_METHOD"],
+        "path": environ["PATH_INFO"],
+        "type": environ.get("CONTENT_TYPE"),
+        "body": body.decode("utf-8"),
+    }
+    start_response("201 Created", [("Content-Type", "application/ld+json"),
+                                   ("Location", "http://localhost:8081/api/Datastream/1")])
+    return [json.dumps(echo).encode("utf-8")]
+
+
+class TestTransport(unittest.TestCase):
+    """Test for the WSGI, recorded and routing transports."""
+
+    def test_wsgi(self):
+        """Test a request is passed to the WSGI app and its response returned."""
+        transport = WsgiTransport(echo_app)
+        resp, content = transport.request("http://localhost:8081/api/Datastream", "PUT",
+                                          body='{"Temperature": "20"}',
+                                          headers={"Content-Type": "application/ld+json"})
+        self.assertEqual(resp.status, 201)
+        self.assertEqual(resp["location"], "http://localhost:8081/api/Datastream/1")
+        self.assertEqual(json.loads(content.decode("utf-8")), {
+            "method": "PUT", "path": "/api/Datastream",
+            "type": "application/ld+json", "body": '{"Temperature": "20"}'})
+
+    def test_redirect(self):
+        """Test redirects are followed across the routes of a routing transport."""
+        drone = RecordedTransport()
+        drone.record("GET", "http://localhost:8081/api", 301, {"Location": "/api/"})
+        app = WsgiTransport(echo_app)
+        transport = RedirectingTransport(RoutingTransport({"http://localhost:8081/api/": app}, drone))
+        resp, content = transport.request("http://localhost:8081/api")
+        self.assertEqual(json.loads(content.decode("utf-8"))["path"], "/api/")
+        self.assertEqual(resp["content-location"], "http://localhost:8081/api/")
+
+    def test_record_and_route(self):
+        """Test recorded responses are replayed and requests routed by prefix."""
+        recorder = RecordedTransport(transport=WsgiTransport(echo_app))
+        recorder.request("http://localhost:8081/api/Drone", "POST", body="{}")
+        replay = RecordedTransport(recorder.recordings)
+        controller = RecordedTransport()
+        controller.record("GET", "http://localhost:8080/api/Location", content='{"Location": "0,0"}')
+        transport = RoutingTransport({"http://localhost:8081": replay}, controller)
+
+        resp, content = transport.request("http://localhost:8081/api/Drone", "POST", body="{}")
+        self.assertEqual(resp.status, 201)
+        self.assertIn(b'"path": "/api/Drone"', content)
+        resp, content = transport.request("http://localhost:8080/api/Location")
+        self.assertEqual(content, b'{"Location": "0,0"}')
+        resp, content = transport.request("http://localhost:8080/api/Anomaly")
+        self.assertEqual(resp.status, 404)
+        self.assertEqual(len(controller.requests), 2)
+
+    def test_compression(self):
+        """Test compressed bodies are decoded by the server and the client."""
+        server = WsgiTransport(GzipMiddleware(echo_app, min_size=64))
+        recorder = RecordedTransport(transport=server)
+        transport = CompressedTransport(recorder, compress_requests=True, min_size=64)
+        datastream = '{"Temperature": "%s"}' % ("2" * 100)
+        resp, content = transport.request("http://localhost:8080/api/Datastream", "PUT",
+                                          body=datastream)
+        self.assertEqual(json.loads(content.decode("utf-8"))["body"], datastream)
+        self.assertEqual(resp["-content-encoding"], "gzip")
+        # Both bodies were sent compressed.
+        method, uri, body = recorder.requests[0]
+        self.assertLess(len(body), len(datastream))
+        status, headers, raw = recorder.recordings[(method, uri)][0]
+        self.assertLess(len(raw), len(content))
+
+
+if __name__ == '__main__':
+    unittest.main()
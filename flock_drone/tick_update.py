@@ -0,0 +1,132 @@
+"""Composite TickUpdate endpoint of the drone server.
+
+POST /api/TickUpdate carries the Drone and the Datastream written by the
+mechanics each tick. TickUpdateMiddleware applies them through the hydrus
+app as POST /api/Drone and POST /api/Datastream, in one database
+transaction: the commits hydrus makes for each update are turned into
+flushes and the session is committed once both succeeded, or rolled back.
+
+The session given to hydrus is a scoped_session, each request has its own
+session so the transaction of a TickUpdate only holds its own updates.
+"""
+import os
+import sys
+curDir = os.path.dirname(__file__)
+# this will return parent directory.
+parentDir = os.path.abspath(os.path.join(curDir, os.pardir))
+sys.path.insert(0, parentDir)
+
+import io
+import json
+from contextlib import contextmanager
+from flock_drone.settings import API_NAME
+
+# Parts of a TickUpdate, applied in this order.
+PARTS = ("Drone", "Datastream")
+
+
+@contextmanager
+def single_transaction(session):
+    """Commit session once at the end of the block, rolling it back on errors.
+
+    session must only be used by the current request, as its commits in the
+    block are turned into flushes.
+    """
+    session.commit = session.flush
+    try:
+        yield
+    except Exception:
+        del session.commit
+        session.rollback()
+        raise
+    del session.commit
+    session.commit()
+
+
+class TickUpdateMiddleware(object):
+    """Serve POST /api/TickUpdate in front of the hydrus app."""
+
+    def __init__(self, app, session, api_name=API_NAME):
+        """session is the scoped_session of the hydrus app."""
+        self.app = app
+        self.session = session
+        self.path = "/%s/TickUpdate" % api_name
+        self.api_name = api_name
+
+    def subrequest(self, environ, name, obj):
+        """POST obj to the endpoint name of the hydrus app, return its status and body."""
+        body = json.dumps(obj).encode("utf-8")
+        sub_environ = dict(environ)
+        sub_environ.update({
+            "PATH_INFO": "/%s/%s" % (self.api_name, name),
+            "QUERY_STRING": "",
+            "CONTENT_TYPE": "application/ld+json",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        })
+        started = dict()
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = status
+
+        result = self.app(sub_environ, start_response)
+        try:
+            content = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return started["status"], content
+
+    def respond(self, start_response, status, title, description):
+        """Answer with a hydrus like Status object."""
+        body = json.dumps({
+            "@type": "Status",
+            "statusCode": int(status.split(" ")[0]),
+            "title": title,
+            "description": description,
+        }).encode("utf-8")
+        start_response(status, [("Content-Type", "application/ld+json"),
+                                ("Content-Length", str(len(body)))])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        try:
+            return self.handle(environ, start_response)
+        finally:
+            # Sessions are scoped to the request, close this one.
+            self.session.remove()
+
+    def handle(self, environ, start_response):
+        """Serve a TickUpdate, pass other requests to the hydrus app."""
+        if (environ.get("PATH_INFO", "").rstrip("/") != self.path or
+                environ.get("REQUEST_METHOD") != "POST"):
+            return self.app(environ, start_response)
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            tick_update = json.loads(environ["wsgi.input"].read(length).decode("utf-8"))
+            parts = [(name, tick_update[name]) for name in PARTS if tick_update.get(name)]
+        except (ValueError, TypeError, AttributeError) as e:
+            return self.respond(start_response, "400 Bad Request", "Invalid TickUpdate", str(e))
+        if not parts:
+            return self.respond(start_response, "400 Bad Request", "Invalid TickUpdate",
+                                "A TickUpdate needs a Drone or a Datastream")
+
+        failed = None
+        try:
+            with single_transaction(self.session()):
+                for name, obj in parts:
+                    status, content = self.subrequest(environ, name, obj)
+                    if not status.startswith(("200", "201")):
+                        failed = (status, name, content)
+                        raise RuntimeError("%s update failed" % name)
+        except Exception as e:
+            if failed is None:
+                return self.respond(start_response, "500 Internal Server Error",
+                                    "TickUpdate failed", str(e))
+            status, name, content = failed
+            return self.respond(start_response, status, "%s not updated" % name,
+                                content.decode("utf-8", "replace"))
+
+        return self.respond(start_response, "200 OK", "TickUpdate applied",
+                            " and ".join(name for name, _ in parts) + " updated")